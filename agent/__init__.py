@@ -1,2 +1,12 @@
-from .agent import Player
-from .state import WorldModel
+# Importación perezosa: `from agent.roles import RoleManager` no debe arrastrar el FSM
+# (numpy, planificadores...) hasta que alguien use Player.
+def __getattr__(name):
+    if name == "Player":
+        from .agent import Player
+        return Player
+    if name == "WorldModel":
+        from .state import WorldModel
+        return WorldModel
+    raise AttributeError(f"module 'agent' has no attribute {name!r}")
+
+__all__ = ["Player", "WorldModel"]
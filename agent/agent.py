@@ -1,17 +1,31 @@
-import re
 from agent.state import WorldModel
 from agent.fsm import AgentFSM
 from agent.roles import RoleManager
-from perception.parse import parse_see
+from perception.sexp import MessageParser
 
 class Player:
-    def __init__(self, side, unum, role_manager):
+    def __init__(self, side, unum, role_manager, inference=None, team_name=None):
         self.side = side
         self.unum = unum
         self.world_model = WorldModel()
         self.world_model.self_side = side 
         self.role_manager = role_manager
-        self.fsm = AgentFSM(unum, role_manager)
+        self.fsm = AgentFSM(unum, role_manager, inference=inference)
+        # Los flags no los usa el WorldModel: el see se analiza sin ellos
+        self.parser = MessageParser(team_name, flags=False)
     
-    def handle_message(self, msg):
-        pass
\ No newline at end of file
+    def handle_message(self, data):
+        # Actualiza el world model con un mensaje crudo (bytes) y devuelve su tipo
+        kind = self.parser.parse(data)
+        wm = self.world_model
+        if kind == "see":
+            wm.update_from_see(self.parser.see)
+        elif kind == "hear":
+            hear = self.parser.hear
+            if hear["sender"] == "referee" and hear["message"]:
+                wm.play_mode = hear["message"]
+        elif kind == "sense_body":
+            sense = self.parser.sense
+            wm.update_from_sense_body(stamina=sense.get("stamina"), speed=sense.get("speed"),
+                                      speed_dir=sense.get("speed_dir"))
+        return kind
@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+BALL_DECAY = 0.94       # ball_decay de rcssserver: v(t+1) = 0.94 * v(t)
+BALL_SPEED_MAX = 3.0    # m/ciclo
+KICKABLE = 0.7          # kickable_margin + radios de jugador y balón (aprox.)
+PLAYER_DECAY = 0.4      # player_decay: la velocidad de sense_body ya viene decaída
+RAD2DEG = 180.0 / math.pi
+DEG2RAD = math.pi / 180.0
+
+
+class BallEstimator:
+    # Filtro alfa-beta del balón en coordenadas relativas al jugador (x, y del parser),
+    # con el modelo de rozamiento del servidor entre observaciones. Coste constante por
+    # see; las observaciones quedan en un buffer circular numpy de tamaño fijo
+    # [time, x, y]. El marco se mueve con el jugador: turn() compensa los giros enviados
+    # y move() el desplazamiento medido en sense_body, así vel es la del propio balón.
+
+    def __init__(self, history=5, alpha=0.7, beta=0.4, horizon=50, max_age=20):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_age = max_age
+        self.history = np.zeros((history, 3))
+        self.count = 0
+        self.pos = np.zeros(2)
+        self.vel = np.zeros(2)
+        self.time = None
+        self.last_seen = None
+        # geom[k] = 1 + d + ... + d^(k-1): desplazamiento en k ciclos por unidad de velocidad
+        powers = BALL_DECAY ** np.arange(horizon + 1)
+        self._decay = powers
+        self._geom = (1.0 - powers) / (1.0 - BALL_DECAY)
+        self._steps = np.arange(1, horizon + 1, dtype=float)
+        self._traj = np.empty((horizon, 2))
+
+    def reset(self):
+        self.count = 0
+        self.time = self.last_seen = None
+        self.vel[:] = 0.0
+
+    @property
+    def valid(self):
+        return self.time is not None
+
+    def age(self, t):
+        return None if self.last_seen is None else t - self.last_seen
+
+    def _advance(self, k):
+        # Lleva pos/vel k ciclos hacia delante (en sitio)
+        if k <= 0:
+            return
+        k = min(k, len(self._geom) - 1)
+        self.pos += self.vel * self._geom[k]
+        self.vel *= self._decay[k]
+
+    def update(self, t, x, y):
+        h = self.history
+        row = h[self.count % len(h)]
+        row[0], row[1], row[2] = t, x, y
+        self.count += 1
+        if self.time is None or t - self.last_seen > self.max_age:
+            self.pos[0], self.pos[1] = x, y
+            self.vel[:] = 0.0
+            self.time = self.last_seen = t
+            return
+        dt = t - self.time
+        self._advance(dt)
+        rx, ry = x - self.pos[0], y - self.pos[1]
+        self.pos[0] += self.alpha * rx
+        self.pos[1] += self.alpha * ry
+        if dt > 0:
+            # Innovación repartida por los ciclos transcurridos desde la última estimación
+            gain = self.beta / self._geom[min(dt, len(self._geom) - 1)]
+            self.vel[0] += gain * rx
+            self.vel[1] += gain * ry
+            speed = math.hypot(self.vel[0], self.vel[1])
+            if speed > BALL_SPEED_MAX:
+                self.vel *= BALL_SPEED_MAX / speed
+        self.time = self.last_seen = t
+
+    def predict(self, t):
+        # Posición relativa (x, y) esperada en el ciclo t, sin modificar el estado
+        if self.time is None:
+            return None
+        k = min(max(t - self.time, 0), len(self._geom) - 1)
+        g = self._geom[k]
+        return self.pos[0] + self.vel[0] * g, self.pos[1] + self.vel[1] * g
+
+    def sync(self, t):
+        # Avanza el estado hasta t (ciclos sin ver el balón)
+        if self.time is not None and t > self.time:
+            self._advance(t - self.time)
+            self.time = t
+
+    def turn(self, angle):
+        # El jugador gira angle grados: todo lo relativo rota -angle
+        if self.time is None or not angle:
+            return
+        c, s = math.cos(angle * DEG2RAD), math.sin(angle * DEG2RAD)
+        for v in (self.pos, self.vel):
+            x, y = v[0], v[1]
+            v[0] = c * x + s * y
+            v[1] = c * y - s * x
+
+    def move(self, dx, dy):
+        # El jugador se ha desplazado (dx, dy) en su marco: lo relativo se desplaza al revés
+        if self.time is None:
+            return
+        self.pos[0] -= dx
+        self.pos[1] -= dy
+
+    def trajectory(self, n):
+        # Posiciones (n, 2) para los ciclos 1..n desde la estimación actual (vista sobre
+        # un buffer interno: se sobrescribe en la siguiente llamada)
+        n = min(n, len(self._traj))
+        out = self._traj[:n]
+        np.multiply(self._geom[1:n + 1, None], self.vel, out=out)
+        out += self.pos
+        return out
+
+    def intercept(self, speed=1.0, n=50):
+        """Primer ciclo k en que un jugador en el origen a `speed` m/ciclo alcanza el
+        balón. Devuelve (k, x, y), el último punto del horizonte si no llega, o None sin
+        estimación (el llamante usa el balón visto)."""
+        if self.time is None:
+            return None
+        traj = self.trajectory(n)
+        reach = self._steps[:len(traj)] * speed + KICKABLE
+        hit = np.flatnonzero(np.hypot(traj[:, 0], traj[:, 1]) <= reach)
+        k = int(hit[0]) if hit.size else len(traj) - 1
+        return k + 1, float(traj[k, 0]), float(traj[k, 1])
+
+
+def polar(x, y):
+    return math.hypot(x, y), math.atan2(y, x) * RAD2DEG
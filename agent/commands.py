@@ -0,0 +1,134 @@
+import time
+
+# Comandos de cuerpo: el servidor ejecuta como mucho uno por ciclo
+BODY = (b"dash", b"turn", b"kick", b"tackle", b"catch", b"move")
+
+
+def body_turn(action, min_turn=5.0):
+    # Giro que set_action enviará para esta acción (0.0 si el comando de cuerpo es otro)
+    if action.get("kick") is not None:
+        return 0.0
+    turn = action.get("turn", 0.0)
+    if turn != 0.0 and (abs(turn) >= min_turn or not action.get("dash", 0.0)):
+        return turn
+    return 0.0
+
+
+class CommandBuffer:
+    # Construye los comandos de un ciclo en un único bytearray preasignado y los envía
+    # en un solo datagrama. Un comando de cuerpo (dash/turn/kick/...) por ciclo; turn_neck,
+    # say y change_view pueden ir a la vez.
+
+    def __init__(self, size=512, min_turn=5.0):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.min_turn = min_turn
+        self.body = None
+        self.extra = []
+        self.sends = 0
+        self.send_ns_total = 0
+        self.send_ns_max = 0
+        self.last_send_ns = 0
+        self.last_offset = None
+        # Comandos que no cupieron en el buffer (se avisa en cada uno; no debería pasar)
+        self.dropped = 0
+
+    def reset(self):
+        self.body = None
+        self.extra.clear()
+
+    def set_body(self, cmd):
+        # El primero gana, igual que en el servidor
+        if self.body is None:
+            self.body = cmd
+            return True
+        return False
+
+    def turn(self, angle):
+        return self.set_body(b"(turn %.1f)" % angle)
+
+    def dash(self, power):
+        return self.set_body(b"(dash %.1f)" % power)
+
+    def kick(self, power, direction):
+        return self.set_body(b"(kick %.1f %.1f)" % (power, direction))
+
+    def move(self, x, y):
+        return self.set_body(b"(move %.2f %.2f)" % (x, y))
+
+    def turn_neck(self, angle):
+        self.extra.append(b"(turn_neck %.1f)" % angle)
+
+    def say(self, message):
+        self.extra.append(b"(say %s)" % (message.encode() if isinstance(message, str) else message))
+
+    def change_view(self, width, quality="high"):
+        self.extra.append(b"(change_view %s %s)" % (width.encode(), quality.encode()))
+
+    def add(self, cmd):
+        # Comando ya formateado ("(turn 30)"): se clasifica por su nombre
+        cmd = cmd.encode() if isinstance(cmd, str) else cmd
+        cmd = cmd.strip()
+        name = cmd[1:].split(b" ", 1)[0].rstrip(b")")
+        if name in BODY:
+            return self.set_body(cmd)
+        self.extra.append(cmd)
+        return True
+
+    def set_action(self, action):
+        # Acción del FSM {"turn", "dash", "kick"}: prioridad kick > turn > dash. Un giro
+        # por debajo de min_turn no merece gastar el ciclo y deja pasar el dash.
+        self.reset()
+        kick = action.get("kick")
+        turn = body_turn(action, self.min_turn)
+        dash = action.get("dash", 0.0)
+        if kick is not None:
+            self.kick(*kick)
+        elif turn != 0.0:
+            self.turn(turn)
+        elif dash != 0.0:
+            self.dash(dash)
+        else:
+            self.turn(0)
+
+    def build(self):
+        n = 0
+        buf = self.buf
+        for cmd in ([self.body] if self.body else []) + self.extra:
+            end = n + len(cmd)
+            if end + 1 > len(buf):
+                # No cabe: se descarta este y se sigue probando con los siguientes
+                self.dropped += 1
+                print(f"[commands] Descartado {bytes(cmd[:40])!r}: no cabe en {len(buf)} bytes")
+                continue
+            buf[n:end] = cmd
+            n = end
+        buf[n] = 0x0A
+        return self.view[:n + 1]
+
+    def flush(self, sendto, addr, cycle_start=None):
+        # sendto: socket.sendto o transport.sendto. cycle_start (time.monotonic) permite
+        # medir en qué punto del ciclo sale el datagrama.
+        data = self.build()
+        t0 = time.perf_counter_ns()
+        sendto(data, addr)
+        dt = time.perf_counter_ns() - t0
+        self.sends += 1
+        self.last_send_ns = dt
+        self.send_ns_total += dt
+        if dt > self.send_ns_max:
+            self.send_ns_max = dt
+        if cycle_start is not None:
+            self.last_offset = time.monotonic() - cycle_start
+        self.reset()
+        return len(data)
+
+    def summary(self):
+        st = self.stats()
+        text = f"{st['sends']} envíos, {st['send_us_mean']:.1f} us de media, {st['send_us_max']:.1f} us máx."
+        return text + (f", {st['dropped']} comandos descartados" if st["dropped"] else "")
+
+    def stats(self):
+        mean = self.send_ns_total / self.sends if self.sends else 0.0
+        return {"sends": self.sends, "dropped": self.dropped, "send_us_mean": mean / 1e3, "send_us_max": self.send_ns_max / 1e3,
+                "last_offset_ms": None if self.last_offset is None else self.last_offset * 1e3}
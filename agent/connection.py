@@ -3,6 +3,8 @@
 import socket
 import threading
 
+from agent.commands import CommandBuffer
+
 class AgentConnection:
     def __init__(self, host, port, teamname, unum):
         self.host = host
@@ -13,6 +15,7 @@ class AgentConnection:
         self.sock.settimeout(1.0)
         self.addr = (host, port)
         self.lock = threading.Lock()
+        self.commands = CommandBuffer()
 
     def init_connection(self):
         msg = f"(init {self.teamname} (unum {self.unum}))"
@@ -23,10 +26,13 @@ class AgentConnection:
             self.sock.sendto(msg.encode(), self.addr)
 
     def send_actions(self, actions):
+        # Todos los comandos del ciclo en un datagrama (un solo comando de cuerpo)
         if not actions:
             return
-        for a in actions:
-            self._send(a)
+        with self.lock:
+            for a in actions:
+                self.commands.add(a)
+            self.commands.flush(self.sock.sendto, self.addr)
 
     def receive(self):
         try:
@@ -1,81 +1,249 @@
 import math
 import os
-import torch
-import numpy as np
+import time
 
 from planning.potentials import compute_force
-from planning.astar import AStarPlanner
 import agent.tactics as tactics 
 
-from training.models import Actor
-from training.features import FeatureExtractor
+# Velocidad con la que estimamos que el jugador corre hacia el punto de intercepción
+INTERCEPT_SPEED = 0.8
+# Coste inicial estimado (s) de cada estrategia; después se ajusta con lo medido (EMA)
+COST_PRIOR = {"classic": 0.001, "neural": 0.003, "planner": 0.003}
+# Tiempo que se reserva al final del ciclo para log y envío
+SEND_MARGIN = 0.002
+# Un rival a menos de esta distancia de la línea hacia el objetivo la bloquea
+BLOCK_RADIUS = 2.5
+# Máximo de tiempo (s) de A* por ciclo, aunque quede más: los demás jugadores comparten CPU
+PLANNER_BUDGET = 0.003
 
 class AgentFSM:
-    def __init__(self, unum, role_manager):
+    def __init__(self, unum, role_manager, inference=None, model_path="models/actor_v1.pth"):
         self.unum = unum
         self.role_manager = role_manager
         self.role_name = role_manager.get_role(unum)
         self.state = "Positioning"
-        self.astar = AStarPlanner(cell_size=3.0)
+        self._astar = None
         self.waypoint_path = None
         self.current_wm = None 
         self.use_neural = False
         self.actor = None
-        self.feature_extractor = FeatureExtractor()
-        self.model_path = "models/actor_v1.pth"
+        self.inference = None
+        self.feature_extractor = None
+        # model_path=None: sin pesos propios (p.ej. evaluación offline, que los carga aparte)
+        self.model_path = model_path
+        # agent.metrics.PlayerMetrics si el runtime mide latencias (etapa "infer")
+        self.metrics = None
+        self.costs = dict(COST_PRIOR)
+        self.last_action = None
+        self.last_strategy = None
+        self.strategy_counts = {}
+        self._deadline = None
+        self._planner_dt = 0.0
+        # Inicio (perf_counter) de la clásica cuando la neural cae en ella: lo anterior ya
+        # se ha cargado a costs["neural"]
+        self._fallback_t0 = None
+        # Salida de la red pedida antes de step (neural_request): tupla, False si no llegó
+        # a tiempo, None si no se pidió
+        self.prefetched = None
+        # Coste medido de los pases adelantados de este jugador (tactics.get_best_pass)
+        self.pass_cost = tactics.new_pass_cost()
         
-        if self.role_name != "Goalie" and os.path.exists(self.model_path):
+        if self.role_name != "Goalie" and inference is not None:
+            # Pesos compartidos: el servidor de inferencia hace el forward de todo el equipo
+            self.inference = inference
+            self.inference.register()
+            self.use_neural = True
+        elif self.role_name != "Goalie" and model_path:
+            # Preferimos los pesos exportados a numpy (.npy): así el jugador no importa torch
+            npy_path = os.path.splitext(self.model_path)[0] + ".npy"
             try:
-                self.actor = Actor(obs_size=49)
-                self.actor.load_state_dict(torch.load(self.model_path, map_location="cpu"))
-                self.actor.eval()
-                self.use_neural = True
+                if os.path.exists(npy_path):
+                    from training.numpy_actor import NumpyActor
+                    self.actor = NumpyActor.load(npy_path)
+                    self.use_neural = True
+                elif os.path.exists(self.model_path):
+                    from training.models import load_actor
+                    self.actor = load_actor(self.model_path)
+                    self.use_neural = True
             except Exception as e:
                 print(f"Agent {unum}: Error cargando cerebro: {e}")
 
-    def step(self, world_model):
+        if self.use_neural:
+            import numpy as np
+            from training.features import FeatureExtractor, OBS_SIZE
+            self.feature_extractor = FeatureExtractor()
+            # Observación de cada ciclo escrita siempre en el mismo buffer
+            self._obs = np.empty(OBS_SIZE, dtype=np.float32)
+
+    @property
+    def astar(self):
+        # El planificador (y su rejilla) solo se construye si alguna estrategia lo usa
+        if self._astar is None:
+            from planning.astar import AStarPlanner
+            self._astar = AStarPlanner(cell_size=3.0)
+        return self._astar
+
+    def remaining(self):
+        # Segundos que quedan hasta el plazo del ciclo (None = sin plazo)
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
+    def fits(self, strategy):
+        left = self.remaining()
+        return left is None or left > self.costs[strategy]
+
+    def step(self, world_model, deadline=None):
+        # deadline (time.monotonic): cuándo debe salir el comando de este ciclo, p.ej. la
+        # llegada del see + ciclo; se reservan SEND_MARGIN para log y envío. Se elige la
+        # estrategia más completa cuyo coste estimado cabe en lo que queda; si no cabe ni
+        # la clásica, se repite la última acción (sin chutar).
         self.current_wm = world_model
+        self._deadline = None if deadline is None else deadline - SEND_MARGIN
         play_mode = getattr(world_model, "play_mode", "before_kick_off")
         
         if play_mode.startswith("goal_"):
             return {"turn": 0.0, "dash": 0.0, "kick": None}
         if play_mode == "before_kick_off":
+            if self._astar is None and self.role_name != "Goalie":
+                # Rejilla del A* (y primer update) antes del saque, no en el primer ciclo que haga falta
+                self.astar.plan((0.0, 0.0), (1.0, 0.0), [])
             return {"turn": 0.0, "dash": 0.0, "kick": None}
 
-        if self.role_name == "Goalie":
-            return self.strategy_goalie(world_model.ball, world_model.players_opponents, world_model.players_teammates)
+        t0 = time.perf_counter()
+        if not self.fits("classic"):
+            strategy, action = "cached", self.cached_action()
+        elif self.role_name == "Goalie":
+            strategy = "classic"
+            action = self.strategy_goalie(world_model.ball, world_model.players_opponents, world_model.players_teammates)
+        elif self.use_neural and self.fits("neural") and self.neural_ready():
+            strategy, action = "neural", self.strategy_neural(world_model)
+        else:
+            strategy, action = "classic", self.strategy_field_player_classic(world_model)
+        if strategy != "cached":
+            # strategy_* puede haber cambiado de estrategia por dentro (p.ej. neural sin
+            # respuesta); el coste del planificador se mide aparte en strategy_planner
+            strategy = self.last_strategy or strategy
+            if strategy != "planner":
+                dt = time.perf_counter() - (self._fallback_t0 or t0) - self._planner_dt
+                self.costs[strategy] = 0.9 * self.costs[strategy] + 0.1 * dt
+        self._planner_dt = 0.0
+        self._fallback_t0 = None
+        self.prefetched = None
+        self.strategy_counts[strategy] = self.strategy_counts.get(strategy, 0) + 1
+        self.last_strategy = None
+        self.last_action = action
+        return action
 
-        if self.use_neural:
-            return self.strategy_neural(world_model)
-            
+    def inference_deadline(self):
+        # Hasta cuándo se espera al batch: lo que deja el ciclo para la clásica, 20 ms como mucho
+        left = self.remaining()
+        timeout = 0.02 if left is None else max(0.0, min(0.02, left - self.costs["classic"]))
+        return time.monotonic() + timeout
+
+    def neural_request(self, world_model, deadline=None):
+        # Para runtimes con event loop: (observación, plazo) que pedir al servidor antes de
+        # step, o None si step no va a usar la red. El runtime pide las de todos sus
+        # jugadores juntas sin bloquear el loop y deja la salida en self.prefetched.
+        play_mode = getattr(world_model, "play_mode", "before_kick_off")
+        if (self.inference is None or play_mode.startswith("goal_") or play_mode == "before_kick_off"
+                or not self.neural_ready()):
+            return None
+        self._deadline = None if deadline is None else deadline - SEND_MARGIN
+        if not self.fits("classic") or not self.fits("neural"):
+            return None
+        return self.feature_extractor.get_observation(world_model, self._obs), self.inference_deadline()
+
+    def neural_ready(self):
+        # Con servidor de inferencia los pesos pueden llegar (o cambiar) en caliente
+        # desde un ModelRegistry; mientras no haya ninguno se juega en clásico
+        return self.inference is None or self.inference.actor is not None
+
+    def cached_action(self):
+        # Sin tiempo para decidir: mantener el movimiento del ciclo anterior; repetir un
+        # chut con el balón ya en otro sitio no tiene sentido
+        last = self.last_action
+        if last is None:
+            return {"turn": 0.0, "dash": 0.0, "kick": None}
+        return {"turn": last.get("turn", 0.0), "dash": last.get("dash", 0.0), "kick": None}
+
+    def strategy_summary(self):
+        return ", ".join(f"{k} {v}" for k, v in sorted(self.strategy_counts.items()))
+
+    def search_turn(self, world_model, default):
+        # Sin balón visible: girar hacia donde lo predice el estimador si cae fuera del
+        # cono de visión; si no hay estimación (o debería verse y no se ve), barrido fijo
+        pred = world_model.predicted_ball()
+        if pred is not None and abs(pred["dir"]) > 45.0:
+            return pred["dir"]
+        return default
+
+    def neural_fallback(self, world_model, t0=None):
+        # La neural no ha dado acción: lo que llevaba (p.ej. la espera al batch, desde t0)
+        # cuenta como coste de la neural y solo la clásica de después como coste de la clásica
+        now = time.perf_counter()
+        if t0 is not None:
+            self.costs["neural"] = 0.9 * self.costs["neural"] + 0.1 * (now - t0)
+        self.last_strategy = "classic"
+        self._fallback_t0 = now
         return self.strategy_field_player_classic(world_model)
 
     def strategy_neural(self, world_model):
+        start = time.perf_counter()
         try:
-            obs_np = self.feature_extractor.get_observation(world_model)
+            m = self.metrics
+            if self.inference is not None and self.prefetched is not None:
+                # Ya pedida por el runtime antes de step (la espera fue fuera de step)
+                out = self.prefetched or None
+                if out is None:
+                    return self.neural_fallback(world_model)
+                return self.decode_action(*out)
+
+            obs_np = self.feature_extractor.get_observation(world_model, self._obs)
+            t0 = time.perf_counter_ns() if m else 0
+
+            if self.inference is not None:
+                # No se espera al batch más allá de lo que deja el ciclo para la clásica
+                out = self.inference.infer(obs_np, timeout=max(0.0, self.inference_deadline() - time.monotonic()))
+                if m: m.add("infer", time.perf_counter_ns() - t0)
+                if out is None:
+                    # Fuera de plazo: no esperamos al batch y jugamos en clásico este ciclo
+                    return self.neural_fallback(world_model, start)
+                return self.decode_action(*out)
+
+            if hasattr(self.actor, "forward_batch"):
+                out = self.actor(obs_np)
+                if m: m.add("infer", time.perf_counter_ns() - t0)
+                return self.decode_action(*out)
+
+            import torch
             obs_tensor = torch.FloatTensor(obs_np).unsqueeze(0) 
             
             with torch.no_grad():
                 p_dash, p_turn, p_kick_prob, p_kick_pow, p_kick_ang = self.actor(obs_tensor)
+            if m: m.add("infer", time.perf_counter_ns() - t0)
             
-            action = {"turn": 0.0, "dash": 0.0, "kick": None}
-            
-            dash_val = p_dash.item() * 100.0
-            turn_val = p_turn.item() * 180.0
-            
-            if dash_val > 5.0: action["dash"] = dash_val
-            if abs(turn_val) > 5.0: action["turn"] = turn_val
-            
-            if p_kick_prob.item() > 0.5:
-                k_pow = p_kick_pow.item() * 100.0
-                k_ang = p_kick_ang.item() * 180.0
-                action["kick"] = (k_pow, k_ang)
-            
-            return action
+            return self.decode_action(p_dash.item(), p_turn.item(), p_kick_prob.item(), p_kick_pow.item(), p_kick_ang.item())
             
         except Exception as e:
             print(f"Neural Error: {e}")
-            return self.strategy_field_player_classic(world_model)
+            return self.neural_fallback(world_model, start)
+
+    def decode_action(self, p_dash, p_turn, p_kick_prob, p_kick_pow, p_kick_ang):
+        action = {"turn": 0.0, "dash": 0.0, "kick": None}
+        
+        dash_val = p_dash * 100.0
+        turn_val = p_turn * 180.0
+        
+        if dash_val > 5.0: action["dash"] = dash_val
+        if abs(turn_val) > 5.0: action["turn"] = turn_val
+        
+        if p_kick_prob > 0.5:
+            k_pow = p_kick_pow * 100.0
+            k_ang = p_kick_ang * 180.0
+            action["kick"] = (k_pow, k_ang)
+        
+        return action
 
     def strategy_field_player_classic(self, world_model):
         ball = world_model.ball
@@ -84,7 +252,7 @@ class AgentFSM:
         
         action = {"turn": 0.0, "dash": 0.0, "kick": None}
         if not ball:
-            action["turn"] = 60.0
+            action["turn"] = self.search_turn(world_model, 60.0)
             return action
         
         ball_dist = ball["dist"]
@@ -94,7 +262,7 @@ class AgentFSM:
             if shoot: 
                 action["kick"] = shoot
                 return action
-            pazz = tactics.get_best_pass(world_model, self.unum)
+            pazz = tactics.get_best_pass(world_model, self.unum, cost=self.pass_cost, deadline=self._deadline)
             if pazz: 
                 action["kick"] = pazz
                 return action
@@ -103,19 +271,56 @@ class AgentFSM:
 
         chase_thr = 30.0 if not self.role_manager.should_defend(self.unum) else 20.0
         if ball_dist < chase_thr:
-            target = {"x": ball["x"], "y": ball["y"]}
-            angle, power = compute_force(self.unum, (0,0), target, opponents, teammates, self.role_manager)
-            action["turn"] = angle
-            action["dash"] = power
+            # Vamos al punto donde el balón estará cuando lleguemos, no a donde está
+            hit = world_model.ball_est.intercept(INTERCEPT_SPEED)
+            _, x, y = hit if hit else (0, ball["x"], ball["y"])
+            target = {"x": x, "y": y}
+            steer = None
+            if self.fits("planner") and self.path_blocked(opponents, x, y):
+                steer = self.strategy_planner(opponents, x, y)
+            if steer is None:
+                steer = compute_force(self.unum, (0,0), target, opponents, teammates, self.role_manager)
+            action["turn"], action["dash"] = steer
         else:
             action["turn"] = ball["dir"]
             
         return action
 
+    @staticmethod
+    def path_blocked(opponents, x, y):
+        # ¿Hay un rival cerca del segmento (0,0)-(x,y) y antes del objetivo?
+        length = math.hypot(x, y)
+        if length < 1e-6:
+            return False
+        ux, uy = x / length, y / length
+        for opp in opponents:
+            along = opp["x"] * ux + opp["y"] * uy
+            if 0.0 < along < length and abs(opp["y"] * ux - opp["x"] * uy) < BLOCK_RADIUS:
+                return True
+        return False
+
+    def strategy_planner(self, opponents, x, y):
+        # A* anytime en coordenadas relativas (origen = nosotros) rodeando a los rivales,
+        # cortado al plazo del ciclo: devuelve (giro, potencia) hacia el primer tramo del
+        # mejor camino encontrado, o None si no da tiempo o no hay camino
+        left = self.remaining()
+        t0 = time.perf_counter()
+        budget = PLANNER_BUDGET if left is None else min(PLANNER_BUDGET, left - self.costs["classic"])
+        deadline = t0 + budget
+        path = self.astar.plan((0.0, 0.0), (x, y), [(o["x"], o["y"]) for o in opponents], deadline=deadline)
+        self._planner_dt = time.perf_counter() - t0
+        self.costs["planner"] = 0.9 * self.costs["planner"] + 0.1 * self._planner_dt
+        if not path or len(path) < 2:
+            return None
+        # Primer punto del camino a más de una celda, para no girar por el redondeo de la rejilla
+        wx, wy = next(((px, py) for px, py in path[1:] if math.hypot(px, py) > self.astar.cell_size), path[-1])
+        self.last_strategy = "planner"
+        return math.degrees(math.atan2(wy, wx)), 100.0
+
     def strategy_goalie(self, ball, opponents, teammates):
         action = {"turn": 0.0, "dash": 0.0, "kick": None}
         if not ball:
-            action["turn"] = 45.0
+            action["turn"] = self.search_turn(self.current_wm, 45.0)
             return action
         if ball["dist"] < 2.0:
             action["kick"] = (100.0, 60.0)
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+
+def forward_actor(actor, obs):
+    # obs (N, obs_size) float32 -> (N, 5), con NumpyActor o con el Actor de torch
+    if hasattr(actor, "forward_batch"):
+        return actor.forward_batch(obs)
+    import torch
+    with torch.no_grad():
+        heads = actor(torch.from_numpy(obs))
+    return torch.cat(heads, dim=1).numpy()
+
+
+def warm_actor(actor, obs_size=49):
+    obs_size = getattr(actor, "obs_size", obs_size)
+    return forward_actor(actor, np.zeros((1, obs_size), dtype=np.float32))
+
+
+class _Request:
+    __slots__ = ("obs", "event", "result", "callback")
+
+    def __init__(self, obs, callback=None):
+        self.obs = obs
+        self.event = threading.Event()
+        self.result = None
+        # callback(result) desde el hilo del servidor, p.ej. para despertar un event loop
+        self.callback = callback
+
+
+def _resolve(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+class InferenceServer:
+    # Servicio compartido por todo el equipo: junta las observaciones de un mismo
+    # ciclo, hace un único forward batched y devuelve a cada jugador su acción.
+    def __init__(self, actor, obs_size=49, max_batch=11, window=0.005):
+        self.actor = actor
+        self.obs_size = obs_size
+        self.max_batch = max_batch
+        self.window = window
+        self.expected = 0
+        self.batches = 0
+        self.timeouts = 0
+        self._batch = np.zeros((max_batch, obs_size), dtype=np.float32)
+        self._pending = []
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def load_actor(model_path, obs_size=49):
+        # Si existe la exportación .npy (scripts/export_actor.py) no hace falta torch
+        npy_path = os.path.splitext(model_path)[0] + ".npy"
+        if os.path.exists(npy_path):
+            from training.numpy_actor import NumpyActor
+            return NumpyActor.load(npy_path, obs_size)
+        if not os.path.exists(model_path):
+            return None
+        from training.models import load_actor
+        return load_actor(model_path)
+
+    @classmethod
+    def from_path(cls, model_path, obs_size=49, **kwargs):
+        actor = cls.load_actor(model_path, obs_size)
+        if actor is None:
+            return None
+        return cls(actor, obs_size=obs_size, **kwargs)
+
+    def register(self):
+        with self._cond:
+            self.expected += 1
+
+    def unregister(self):
+        with self._cond:
+            self.expected = max(0, self.expected - 1)
+
+    def set_actor(self, actor):
+        # Cambio de pesos en caliente (ModelRegistry): el hilo del servidor lee self.actor
+        # una vez por batch, así que el batch en curso termina con los pesos anteriores
+        if actor is not None and not hasattr(actor, "forward_batch"):
+            import torch
+            torch.set_num_threads(1)
+        self.actor = actor
+
+    def infer(self, obs, timeout=0.02):
+        # Devuelve (dash, turn, kick_prob, kick_pow, kick_ang) o None si se pasa el plazo
+        # o si todavía no hay pesos cargados.
+        if self.actor is None:
+            return None
+        req = _Request(obs)
+        self.submit([req])
+        if not req.event.wait(timeout):
+            self.cancel(req)
+            return None
+        return req.result
+
+    async def infer_async(self, observations, deadlines):
+        # Para un event loop: las observaciones de varios jugadores entran juntas en el
+        # mismo batch y se esperan sin bloquear el loop. deadlines (time.monotonic) por
+        # observación; devuelve [salida o None] en el mismo orden.
+        if self.actor is None:
+            return [None] * len(observations)
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in observations]
+        reqs = [_Request(obs, lambda result, fut=fut: loop.call_soon_threadsafe(_resolve, fut, result))
+                for obs, fut in zip(observations, futures)]
+        self.submit(reqs)
+        results = []
+        for req, fut, deadline in zip(reqs, futures, deadlines):
+            try:
+                results.append(await asyncio.wait_for(fut, max(0.0, deadline - time.monotonic())))
+            except asyncio.TimeoutError:
+                self.cancel(req)
+                results.append(None)
+        return results
+
+    def submit(self, requests):
+        # Encola las peticiones de una vez: el siguiente batch las ve todas
+        with self._cond:
+            self._pending.extend(requests)
+            self._cond.notify()
+
+    def cancel(self, req):
+        # Petición vencida: si aún no ha entrado en un batch se retira, para que no ocupe
+        # sitio ni cuente como jugador del ciclo siguiente; si ya está en el forward, la
+        # respuesta llegará tarde y se descarta
+        with self._cond:
+            self.timeouts += 1
+            if req in self._pending:
+                self._pending.remove(req)
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def _collect(self):
+        with self._cond:
+            while True:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    return None
+                # El primer jugador del ciclo abre la ventana; al cerrarla se procesa lo que haya.
+                deadline = time.monotonic() + self.window
+                while self._running and len(self._pending) < min(self.expected, self.max_batch):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                # Las peticiones que vencieron durante la ventana ya se han retirado
+                if self._pending:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                    return batch
+
+    def _forward(self, obs):
+        return forward_actor(self.actor, obs)
+
+    def warmup(self):
+        # Primer forward fuera del juego (reserva de buffers, BLAS/torch en frío)
+        if self.actor is None:
+            return 0.0
+        t = time.perf_counter()
+        self._forward(self._batch[:1])
+        return time.perf_counter() - t
+
+    def _run(self):
+        if self.actor is not None and not hasattr(self.actor, "forward_batch"):
+            import torch
+            torch.set_num_threads(1)
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            n = len(batch)
+            for i, req in enumerate(batch):
+                self._batch[i] = req.obs
+            try:
+                out = self._forward(self._batch[:n])
+                for i, req in enumerate(batch):
+                    req.result = tuple(out[i].tolist())
+            except Exception as e:
+                print(f"[inference] Error en forward: {e}")
+            self.batches += 1
+            for req in batch:
+                req.event.set()
+                if req.callback is not None:
+                    try:
+                        req.callback(req.result)
+                    except RuntimeError:
+                        pass  # event loop ya cerrado
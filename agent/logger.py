@@ -1,6 +1,13 @@
 import json
-import time
+import math
 import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
 
 class GameLogger:
     def __init__(self, team_name, unum, log_dir="logs"):
@@ -26,4 +33,242 @@ class GameLogger:
         self.file.flush()
 
     def close(self):
-        if self.file: self.file.close()
\ No newline at end of file
+        if self.file: self.file.close()
+
+# --- Logger binario -------------------------------------------------------
+# Cada tick se escribe en un registro de tamaño fijo dentro de un bloque
+# preasignado; los bloques llenos (o viejos) se pasan a un hilo escritor
+# compartido, que comprime opcionalmente, escribe y rota ficheros.
+
+MAGIC = b"PFGLOG1\n"
+BLOCK_HEADER = struct.Struct("<BII")  # tipo, bytes de payload, n registros / código
+BLOCK_RAW, BLOCK_ZLIB, BLOCK_PLAY_MODE = 0, 1, 2
+MAX_TEAMMATES, MAX_OPPONENTS = 10, 11
+
+RECORD_DTYPE = np.dtype([
+    ("time", "<i4"),
+    ("play_mode", "<u2"),
+    ("kick", "u1"),
+    ("pad", "u1"),
+    ("stamina", "<f4"),
+    ("ball", "<f4", (2,)),                      # dist, dir (NaN si no se ve)
+    ("goals", "<f4", (2, 2)),                   # l, r -> dist, dir
+    ("teammates", "<f4", (MAX_TEAMMATES, 2)),
+    ("opponents", "<f4", (MAX_OPPONENTS, 2)),
+    ("action", "<f4", (4,)),                    # dash, turn, kick_pow, kick_dir
+])
+
+
+class _BackgroundWriter:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            fn, args = self.queue.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[logger] Error escribiendo log: {e}")
+
+    def submit(self, fn, *args):
+        self.queue.put((fn, args))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = _BackgroundWriter()
+        return _writer
+
+
+class BinaryGameLogger:
+    def __init__(self, team_name, unum, log_dir="logs", block_records=512,
+                 flush_interval=5.0, compress=False, max_bytes=64 * 1024 * 1024):
+        self.team_name = team_name
+        self.unum = unum
+        self.log_dir = log_dir
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        os.makedirs(log_dir, exist_ok=True)
+        self.base = f"{log_dir}/{team_name}_{unum}_{int(time.time())}"
+        self.filename = f"{self.base}.glog"
+        self.role = None
+        self.play_modes = {}
+        self.block = np.zeros(block_records, dtype=RECORD_DTYPE)
+        self.n = 0
+        self.last_flush = time.monotonic()
+        # Estado del fichero: solo lo toca el hilo escritor. Los modos de juego le llegan
+        # por la cola y lleva su propia tabla (play_modes es del hilo del juego)
+        self.file = None
+        self.file_modes = {}
+        self.file_bytes = 0
+        self.part = 0
+        self.writer = _get_writer()
+
+    def _mode_code(self, mode):
+        code = self.play_modes.get(mode)
+        if code is None:
+            code = self.play_modes[mode] = len(self.play_modes)
+            self.writer.submit(self._write_play_mode, mode, code)
+        return code
+
+    def log_tick(self, world_model, action):
+        if self.role is None:
+            self.role = getattr(world_model, "self_role", "unknown")
+        rec = self.block[self.n]
+        rec["time"] = world_model.time or 0
+        rec["play_mode"] = self._mode_code(getattr(world_model, "play_mode", "unknown"))
+        rec["stamina"] = getattr(world_model, "stamina", 0) or 0
+        ball = world_model.ball
+        rec["ball"] = (ball["dist"], ball["dir"]) if ball else (np.nan, np.nan)
+        goals = rec["goals"]
+        goals[:] = np.nan
+        for g in world_model.goals:
+            goals[0 if g["side"] == "l" else 1] = (g["dist"], g["dir"])
+        self._fill_players(rec["teammates"], world_model.mates)
+        self._fill_players(rec["opponents"], world_model.opps)
+        kick = action.get("kick")
+        rec["kick"] = kick is not None
+        rec["action"] = (action.get("dash", 0.0), action.get("turn", 0.0),
+                         kick[0] if kick else 0.0, kick[1] if kick else 0.0)
+        self.n += 1
+        if self.n == len(self.block) or time.monotonic() - self.last_flush > self.flush_interval:
+            self.flush()
+
+    def _fill_players(self, out, players):
+        # players: vista (n, 4) [dist, dir, x, y] del WorldModel
+        k = min(len(players), len(out))
+        out[:k] = players[:k, :2]
+        out[k:] = np.nan
+
+    def flush(self):
+        if self.n:
+            self.writer.submit(self._write_block, self.block[:self.n].tobytes(), self.n)
+            self.n = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        done = threading.Event()
+        self.writer.submit(self._close_file, done)
+        done.wait(5.0)
+
+    # --- Lado del hilo escritor ---
+
+    def _open(self):
+        name = self.filename if self.part == 0 else f"{self.base}_{self.part}.glog"
+        self.file = open(name, "wb")
+        header = json.dumps({"team": self.team_name, "unum": self.unum, "role": self.role,
+                             "dtype": RECORD_DTYPE.descr, "created": time.time()}).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.file_bytes = self.file.tell()
+        # Cada parte rotada es autocontenida: se repite la tabla de modos de juego
+        for mode, code in self.file_modes.items():
+            self._write(BLOCK_PLAY_MODE, mode.encode(), code)
+
+    def _write(self, kind, payload, count):
+        self.file.write(BLOCK_HEADER.pack(kind, len(payload), count))
+        self.file.write(payload)
+        self.file_bytes += BLOCK_HEADER.size + len(payload)
+
+    def _write_play_mode(self, mode, code):
+        self.file_modes[mode] = code
+        if self.file is None:
+            self._open()
+        else:
+            self._write(BLOCK_PLAY_MODE, mode.encode(), code)
+
+    def _write_block(self, payload, n):
+        if self.file is not None and self.file_bytes >= self.max_bytes:
+            self.file.close()
+            self.part += 1
+            self.file = None
+        if self.file is None:
+            self._open()
+        if self.compress:
+            self._write(BLOCK_ZLIB, zlib.compress(payload, 1), n)
+        else:
+            self._write(BLOCK_RAW, payload, n)
+        self.file.flush()
+
+    def _close_file(self, done):
+        if self.file:
+            self.file.close()
+            self.file = None
+        done.set()
+
+
+def make_logger(team_name, unum, log_dir="logs", fmt="jsonl", compress=False, **kwargs):
+    if fmt == "binary":
+        return BinaryGameLogger(team_name, unum, log_dir=log_dir, compress=compress, **kwargs)
+    return GameLogger(team_name, unum, log_dir=log_dir)
+
+
+def read_binary_log(path):
+    # Devuelve (header, registros como array estructurado, {código: modo de juego})
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} no es un log binario")
+    pos = len(MAGIC)
+    (hlen,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    header = json.loads(data[pos:pos + hlen])
+    pos += hlen
+    blocks, modes = [], {}
+    while pos + BLOCK_HEADER.size <= len(data):
+        kind, size, count = BLOCK_HEADER.unpack_from(data, pos)
+        pos += BLOCK_HEADER.size
+        payload = data[pos:pos + size]
+        pos += size
+        if len(payload) < size:
+            break  # bloque truncado (partido cortado a mitad de escritura)
+        if kind == BLOCK_PLAY_MODE:
+            modes[count] = payload.decode()
+        elif kind == BLOCK_ZLIB:
+            blocks.append(np.frombuffer(zlib.decompress(payload), dtype=RECORD_DTYPE))
+        else:
+            blocks.append(np.frombuffer(payload, dtype=RECORD_DTYPE))
+    records = np.concatenate(blocks) if blocks else np.zeros(0, dtype=RECORD_DTYPE)
+    return header, records, modes
+
+
+def _polar(dist, direction):
+    rad = math.radians(direction)
+    return {"dist": dist, "dir": direction, "x": dist * math.cos(rad), "y": dist * math.sin(rad)}
+
+
+def iter_log_entries(path):
+    # Entradas con el mismo formato que las líneas de GameLogger (más goals y jugadores)
+    header, records, modes = read_binary_log(path)
+    role = header.get("role") or "unknown"
+    cols = [records[name].tolist() for name in ("time", "play_mode", "kick", "stamina", "ball",
+                                                 "goals", "teammates", "opponents", "action")]
+    for t, mode, kick, stamina, ball, goals, mates, opps, act in zip(*cols):
+        yield {
+            "time": t,
+            "play_mode": modes.get(mode, "unknown"),
+            "stamina": stamina,
+            "role": role,
+            "ball": _polar(*ball) if ball[0] == ball[0] else None,
+            "goals": [{"side": s, "dist": g[0], "dir": g[1]} for s, g in zip("lr", goals) if g[0] == g[0]],
+            "teammates": [_polar(*p) for p in mates if p[0] == p[0]],
+            "opponents": [_polar(*p) for p in opps if p[0] == p[0]],
+            "action": {"turn": act[1], "dash": act[0], "kick": (act[2], act[3]) if kick else None},
+        }
+
+
+def export_jsonl(path, out_path=None):
+    out_path = out_path or os.path.splitext(path)[0] + ".jsonl"
+    with open(out_path, "w") as f:
+        for entry in iter_log_entries(path):
+            f.write(json.dumps(entry) + "\n")
+    return out_path
@@ -0,0 +1,216 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Etapas del ciclo de control: parse (todos los mensajes aplicados en el ciclo), step
+# (AgentFSM.step completo), infer (forward de la red dentro de step), log, send y cycle
+# (desde que llega el see hasta que sale el datagrama)
+STAGES = ("parse", "step", "infer", "log", "send", "cycle")
+# Límite superior de cada cubo en microsegundos; el último cubo (sin límite) es +inf
+BUCKETS_US = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+_BOUNDS_NS = [b * 1000 for b in BUCKETS_US]
+
+now_ns = time.perf_counter_ns
+
+
+class Histogram:
+    __slots__ = ("counts", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_US) + 1)
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        self.counts[bisect.bisect_left(_BOUNDS_NS, ns)] += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other):
+        # Suma otro histograma (p.ej. de otro proceso) a este
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        return self
+
+    def count(self):
+        return sum(self.counts)
+
+    def quantile(self, q):
+        # Límite superior (us) del cubo donde cae el cuantil q
+        n = self.count()
+        if not n:
+            return None
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= q * n:
+                return BUCKETS_US[i] if i < len(BUCKETS_US) else self.max_ns / 1e3
+        return self.max_ns / 1e3
+
+    def to_dict(self):
+        n = self.count()
+        return {"counts": list(self.counts), "count": n, "mean_us": self.total_ns / n / 1e3 if n else 0.0,
+                "max_us": self.max_ns / 1e3, "p50_us": self.quantile(0.5), "p99_us": self.quantile(0.99)}
+
+
+class PlayerMetrics:
+    # Las escribe solo el hilo (o el event loop) del jugador; el exportador las lee sin
+    # bloqueo: como mucho ve un ciclo a medias.
+
+    def __init__(self, idx, cycle=0.1, keep=256):
+        self.idx = idx
+        self.unum = None
+        self.cycle_ns = int(cycle * 1e9)
+        self.stages = {s: Histogram() for s in STAGES}
+        self.decisions = 0
+        self.last_time = None
+        self.late = 0
+        self.idle = 0
+        # (tiempo de servidor, "late" | "idle") de los últimos ciclos perdidos
+        self.missed = deque(maxlen=keep)
+
+    def add(self, stage, ns):
+        self.stages[stage].add(ns)
+
+    def decision(self, server_time, cycle_ns):
+        # Un comando enviado para el see del ciclo server_time, cycle_ns después de recibirlo
+        self.decisions += 1
+        self.stages["cycle"].add(cycle_ns)
+        if cycle_ns > self.cycle_ns:
+            self.late += 1
+            self.missed.append((server_time, "late"))
+        last = self.last_time
+        if last is not None and server_time is not None and server_time > last + 1:
+            # Ciclos de servidor sin comando nuestro entre dos decisiones
+            self.idle += server_time - last - 1
+            for t in range(max(last + 1, server_time - 8), server_time):
+                self.missed.append((t, "idle"))
+        if server_time is not None:
+            self.last_time = server_time
+
+    def to_dict(self):
+        return {"idx": self.idx, "unum": self.unum, "decisions": self.decisions, "late": self.late,
+                "idle": self.idle, "last_time": self.last_time, "missed": list(self.missed),
+                "stages": {s: h.to_dict() for s, h in self.stages.items()}}
+
+
+class MetricsRegistry:
+    def __init__(self, team, cycle=0.1):
+        self.team = team
+        self.cycle = cycle
+        self.players = {}
+        self._lock = threading.Lock()
+
+    def player(self, idx):
+        with self._lock:
+            if idx not in self.players:
+                self.players[idx] = PlayerMetrics(idx, self.cycle)
+            return self.players[idx]
+
+    def snapshot(self):
+        with self._lock:
+            players = list(self.players.values())
+        return {"team": self.team, "pid": os.getpid(), "time": time.time(), "buckets_us": list(BUCKETS_US),
+                "players": [p.to_dict() for p in players]}
+
+    def prometheus(self):
+        # Formato de texto de Prometheus: histogramas acumulados por jugador y etapa
+        with self._lock:
+            players = list(self.players.values())
+        lines = ["# TYPE rc_stage_seconds histogram"]
+        for p in players:
+            base = f'team="{self.team}",player="{p.idx}",unum="{p.unum}"'
+            for stage, h in p.stages.items():
+                acc = 0
+                for bound, c in zip(BUCKETS_US + (None,), h.counts):
+                    acc += c
+                    le = "+Inf" if bound is None else f"{bound / 1e6:g}"
+                    lines.append(f'rc_stage_seconds_bucket{{{base},stage="{stage}",le="{le}"}} {acc}')
+                lines.append(f'rc_stage_seconds_sum{{{base},stage="{stage}"}} {h.total_ns / 1e9:.6f}')
+                lines.append(f'rc_stage_seconds_count{{{base},stage="{stage}"}} {acc}')
+        lines.append("# TYPE rc_missed_cycles_total counter")
+        for p in players:
+            base = f'team="{self.team}",player="{p.idx}",unum="{p.unum}"'
+            lines.append(f'rc_missed_cycles_total{{{base},kind="late"}} {p.late}')
+            lines.append(f'rc_missed_cycles_total{{{base},kind="idle"}} {p.idle}')
+            lines.append(f'rc_decisions_total{{{base}}} {p.decisions}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # Escritura atómica: quien lea el fichero nunca ve un JSON a medias
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """Vuelca el registro cada interval segundos a un fichero JSON y/o lo sirve por HTTP
+    en 127.0.0.1:port (/metrics en texto Prometheus, /metrics.json en JSON)."""
+
+    def __init__(self, registry, path=None, port=None, interval=5.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._threads = []
+        self.server = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._spawn(self._dump_loop)
+        if port:
+            self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+            self.server.daemon_threads = True
+            self._spawn(self.server.serve_forever)
+
+    def _spawn(self, target):
+        t = threading.Thread(target=target, name="metrics", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _dump_loop(self):
+        while not self._stop.wait(self.interval):
+            self._dump()
+
+    def _dump(self):
+        try:
+            self.registry.write(self.path)
+        except OSError as e:
+            print(f"[metrics] Error escribiendo {self.path}: {e}")
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, ctype = json.dumps(registry.snapshot()).encode(), "application/json"
+                elif self.path.startswith("/metrics"):
+                    body, ctype = registry.prometheus().encode(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self._stop.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.path:
+            self._dump()
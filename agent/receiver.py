@@ -0,0 +1,73 @@
+import time
+
+# Mensajes que se leen como mucho en un drain; el resto se queda en el socket para el siguiente
+MAX_BACKLOG = 64
+
+
+class LatestReceiver:
+    # Etapa de recepción: espera el primer datagrama y después vacía la cola del socket
+    # sin bloquear, cada mensaje en un buffer reutilizado. Primero se lee toda la cola y
+    # luego se reproduce en orden de llegada: hear/sense_body se aplican todos; de los see
+    # solo el más reciente, en su sitio, y el resto se cuenta como descartado.
+
+    def __init__(self, sock, bufsize=8192):
+        self.sock = sock
+        self.bufsize = bufsize
+        self.bufs = []
+        self.views = []
+        self.lens = []
+        self.see_time = None
+        self.received = 0
+        self.dropped_see = 0
+        self.max_backlog = 0
+
+    def _slot(self, i):
+        if i == len(self.bufs):
+            buf = bytearray(self.bufsize)
+            self.bufs.append(buf)
+            self.views.append(memoryview(buf))
+            self.lens.append(0)
+        return self.bufs[i]
+
+    def drain(self, handle):
+        """Llama a handle(datos) por cada mensaje aplicado y devuelve True si entre ellos
+        hubo un see. Si no llega nada en el timeout del socket propaga socket.timeout.
+        see_time es el time.monotonic() en que se recibió el see aplicado."""
+        sock = self.sock
+        lens = self.lens
+        lens[0] = sock.recv_into(self._slot(0))
+        received_at = time.monotonic()
+        backlog, last_see = 1, -1
+        # Con timeout, recv_into espera aunque se pase MSG_DONTWAIT: modo no bloqueante
+        # mientras se vacía la cola
+        timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            while True:
+                if self.bufs[backlog - 1][:4] == b"(see":
+                    if last_see >= 0:
+                        self.dropped_see += 1
+                    last_see = backlog - 1
+                    self.see_time = received_at
+                if backlog == MAX_BACKLOG:
+                    break
+                try:
+                    lens[backlog] = sock.recv_into(self._slot(backlog))
+                except (BlockingIOError, InterruptedError):
+                    break
+                received_at = time.monotonic()
+                backlog += 1
+        finally:
+            sock.settimeout(timeout)
+        self.received += backlog
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        views = self.views
+        for i in range(backlog):
+            if i != last_see and views[i][:4] == b"(see":
+                continue
+            handle(views[i][:lens[i]])
+        return last_see >= 0
+
+    def summary(self):
+        return f"{self.received} mensajes, {self.dropped_see} see descartados, cola máx. {self.max_backlog}"
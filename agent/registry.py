@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from agent.inference import InferenceServer, warm_actor
+
+# Pesos versionados junto a MODEL_PATH: <nombre>_v<N>.npy (NumpyActor) o .pth (torch)
+VERSION_RE = re.compile(r"^(?P<stem>.+)_v(?P<version>\d+)\.(?P<ext>npy|pth)$")
+
+
+class ModelRegistry:
+    """Vigila el directorio de MODEL_PATH y publica la versión más nueva de los pesos.
+
+    Un hilo propio revisa el directorio cada interval segundos; una versión nueva se
+    carga, se comprueba (obs_size y un forward de prueba con salida finita) y se calienta
+    fuera del ciclo de juego, y solo entonces se cambia de una vez la referencia current.
+    Los listeners (p.ej. InferenceServer.set_actor) reciben el actor nuevo: todos los
+    jugadores del proceso comparten esos pesos y el cambio se nota en el siguiente
+    batch, nunca a mitad de uno. La versión anterior se conserva para rollback()."""
+
+    def __init__(self, model_path, interval=2.0, obs_size=49, settle=0.5):
+        self.directory = os.path.dirname(model_path) or "."
+        m = VERSION_RE.match(os.path.basename(model_path))
+        self.stem = m.group("stem") if m else os.path.splitext(os.path.basename(model_path))[0]
+        # Un MODEL_PATH sin _v<N> cuenta como versión 0
+        self.base = None if m else model_path
+        self.interval = interval
+        self.obs_size = obs_size
+        # Un fichero modificado hace menos de settle segundos puede estar a medio escribir
+        self.settle = settle
+        self.current = None    # (versión, path, actor)
+        self.previous = None
+        self.listeners = []
+        self.swaps = 0
+        self._rejected = {}    # path -> (mtime, tamaño) de una carga fallida
+        self._retired = set()  # versiones retiradas con rollback
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def actor(self):
+        cur = self.current
+        return cur[2] if cur else None
+
+    @property
+    def version(self):
+        cur = self.current
+        return cur[0] if cur else None
+
+    def candidates(self):
+        # [(versión, path)] de mayor a menor; con .npy y .pth de la misma versión, el .npy
+        found = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in names:
+            m = VERSION_RE.match(name)
+            if not m or m.group("stem") != self.stem:
+                continue
+            version = int(m.group("version"))
+            if version in found and m.group("ext") == "pth":
+                continue
+            found[version] = os.path.join(self.directory, name)
+        if self.base and 0 not in found and os.path.exists(self.base):
+            found[0] = self.base
+        return sorted(found.items(), reverse=True)
+
+    def load(self, path):
+        # Fuera del ciclo: carga, validación y primer forward (buffers, BLAS en frío)
+        actor = InferenceServer.load_actor(path, self.obs_size)
+        if actor is None:
+            raise ValueError(f"{path} no existe")
+        obs_size = getattr(actor, "obs_size", None) or actor.fc1.in_features
+        if obs_size != self.obs_size:
+            raise ValueError(f"{path}: obs_size {obs_size}, se esperaba {self.obs_size}")
+        out = np.asarray(warm_actor(actor, self.obs_size))
+        if out.shape != (1, 5) or not np.isfinite(out).all():
+            raise ValueError(f"{path}: salida de prueba no válida {out.shape}")
+        return actor
+
+    def poll(self):
+        # Una revisión del directorio; True si se ha cambiado de versión
+        current = self.version
+        now = time.time()
+        for version, path in self.candidates():
+            if current is not None and version <= current:
+                return False
+            if version in self._retired:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_mtime, st.st_size)
+            if self._rejected.get(path) == stamp or now - st.st_mtime < self.settle:
+                continue
+            try:
+                actor = self.load(path)
+            except Exception as e:
+                self._rejected[path] = stamp
+                print(f"[models] Descartado {path}: {e}")
+                continue
+            return self._promote((version, path, actor))
+        return False
+
+    def _promote(self, entry):
+        # La carga va sin lock; la decisión se repite con él: un rollback entre medias
+        # puede haber retirado esta versión o dejado otra activa
+        with self._lock:
+            current = self.current
+            if entry[0] in self._retired or (current is not None and entry[0] <= current[0]):
+                return False
+            self._publish(entry)
+        return True
+
+    def _publish(self, entry):
+        # Siempre con self._lock: leer current, cambiarlo y avisar a los listeners es una
+        # sola operación, así dos cambios no se cruzan ni llegan desordenados
+        if self.current and entry[0] != self.current[0]:
+            self.previous = self.current
+        self.current = entry
+        self.swaps += 1
+        for listener in self.listeners:
+            listener(entry[2])
+        print(f"[models] Versión {entry[0]} activa ({entry[1]})")
+
+    def rollback(self):
+        # Vuelve a la versión anterior y no se vuelve a promocionar la retirada
+        with self._lock:
+            prev = self.previous
+            if prev is None:
+                print("[models] No hay versión anterior para rollback")
+                return False
+            self._retired.add(self.current[0])
+            self._publish(prev)
+            self.previous = None
+        return True
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="models", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[models] Error revisando {self.directory}: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
@@ -0,0 +1,63 @@
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    # Tiempos de arranque del equipo: importación de cada módulo pesado, fases de main
+    # (carga y calentamiento del modelo, lanzamiento) y, por jugador, el handshake de
+    # init y la construcción de Player/logger.
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.modules = []
+        self.phases = []
+        self.players = {}
+        self._cond = threading.Condition()
+
+    def import_module(self, name):
+        # Solo cuenta el coste si el módulo no estaba ya cargado (incluye sus dependencias nuevas)
+        loaded = name in sys.modules
+        t = time.perf_counter()
+        module = importlib.import_module(name)
+        if not loaded:
+            self.modules.append((name, time.perf_counter() - t))
+        return module
+
+    @contextmanager
+    def phase(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t))
+
+    def player(self, idx, **times):
+        with self._cond:
+            self.players.setdefault(idx, {}).update(times)
+            self.players[idx]["ready_at"] = time.perf_counter() - self.t0
+            self._cond.notify_all()
+
+    def wait_players(self, n, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self.players) < n:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def report(self):
+        lines = [f"[startup] {time.perf_counter() - self.t0:.3f}s desde el inicio"]
+        for name, dt in self.modules:
+            lines.append(f"[startup]   import {name:<24} {dt * 1e3:8.1f} ms")
+        for name, dt in self.phases:
+            lines.append(f"[startup]   {name:<31} {dt * 1e3:8.1f} ms")
+        for idx in sorted(self.players):
+            p = self.players[idx]
+            parts = [f"{k} {v * 1e3:.1f} ms" for k, v in p.items() if k != "ready_at"]
+            lines.append(f"[startup]   jugador #{idx:<2} listo a {p['ready_at']:.3f}s ({', '.join(parts)})")
+        return "\n".join(lines)
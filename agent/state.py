@@ -1,6 +1,81 @@
-from collections import deque
+import math
+from operator import itemgetter
+
+import numpy as np
+
+from agent.ball import DEG2RAD, PLAYER_DECAY, BallEstimator, polar
+
+# Columnas de la vista numpy de jugadores (float64): una fila por jugador visto
+DIST, DIR, X, Y = range(4)
+MAX_PLAYERS = 22
+PLAYER_DEFAULTS = {"dist": 0.0, "dir": 0.0, "x": 0.0, "y": 0.0, "team": "", "unum": None, "goalie": False}
+
+
+class _PlayerTable:
+    # Capacidad fija: un pool de dicts propios que se sobrescriben en cada see (el
+    # acceso p["dist"] de siempre sigue siendo un dict nativo), ordenados por distancia.
+    # La tabla numpy (n, 4) se rellena solo cuando alguien pide la vista.
+    __slots__ = ("data", "players", "_records", "_data_version", "version")
+
+    def __init__(self, capacity=MAX_PLAYERS):
+        self.data = np.zeros((capacity, 4))
+        self.players = []
+        self._records = [dict(PLAYER_DEFAULTS) for _ in range(capacity)]
+        self._data_version = 0
+        self.version = 0
+
+    def load(self, *groups):
+        # groups: listas de dicts del MessageParser (dist, dir, x, y, team, unum, goalie)
+        players, records = self.players, self._records
+        players.clear()
+        cap = len(records)
+        n = 0
+        for group in groups:
+            for p in group:
+                if n >= cap:
+                    break
+                r = records[n]
+                n += 1
+                r["dist"] = p["dist"]
+                r["dir"] = p["dir"]
+                r["x"] = p["x"]
+                r["y"] = p["y"]
+                r["team"] = p["team"]
+                r["unum"] = p["unum"]
+                r["goalie"] = p["goalie"]
+                players.append(r)
+        players.sort(key=_by_dist)
+        self.version += 1
+
+    def load_dicts(self, players):
+        # Dicts incompletos (p.ej. de logs: solo dist/dir); x/y se calculan de dist/dir
+        full = []
+        for p in players:
+            r = {**PLAYER_DEFAULTS, **p}
+            if "x" not in p or "y" not in p:
+                rad = math.radians(r["dir"])
+                r["x"], r["y"] = r["dist"] * math.cos(rad), r["dist"] * math.sin(rad)
+            full.append(r)
+        self.load(full)
+
+    def view(self):
+        n = len(self.players)
+        if self._data_version != self.version:
+            if n:
+                self.data[:n] = [_row(r) for r in self.players]
+            self._data_version = self.version
+        return self.data[:n]
+
+
+_by_dist = itemgetter("dist")
+_row = itemgetter("dist", "dir", "x", "y")
+
 
 class WorldModel:
+    __slots__ = ("time", "play_mode", "self_side", "self_unum", "self_role", "stamina",
+                 "ball", "_ball", "_seen_goals", "_goals", "last_goal_seen", "mates_table", "opps_table",
+                 "ball_est", "_ball_pred")
+
     def __init__(self, max_history=5):
         self.time = 0
         self.play_mode = "before_kick_off"
@@ -9,30 +84,107 @@ class WorldModel:
         self.self_role = "Unknown"
         self.stamina = 8000
         self.ball = None
-        self.goals = [] 
-        self.last_goal_seen = {"l": None, "r": None} 
-        self.players_teammates = []
-        self.players_opponents = []
-        self.ball_history = deque(maxlen=max_history)
+        self._ball = {"dist": 0.0, "dir": 0.0, "x": 0.0, "y": 0.0}
+        self._seen_goals = []
+        self._goals = {s: {"side": s, "dist": 0.0, "dir": 0.0, "x": 0.0, "y": 0.0} for s in ("l", "r")}
+        self.last_goal_seen = {"l": None, "r": None}
+        self.mates_table = _PlayerTable()
+        self.opps_table = _PlayerTable()
+        self.ball_est = BallEstimator(history=max_history)
+        self._ball_pred = {"dist": 0.0, "dir": 0.0, "x": 0.0, "y": 0.0}
+
+    # Porterías vistas en el último see. update_from_see vacía y rellena la lista en sitio,
+    # así que una lista asignada desde fuera se copia: nunca se borra la del llamante
+    @property
+    def goals(self):
+        return self._seen_goals
+
+    @goals.setter
+    def goals(self, goals):
+        self._seen_goals = list(goals or [])
+
+    # Vistas (n, 4) [dist, dir, x, y] sin copia, ordenadas por distancia
+    @property
+    def mates(self):
+        return self.mates_table.view()
+
+    @property
+    def opps(self):
+        return self.opps_table.view()
+
+    # Compatibilidad: listas de dicts (del pool) como las de antes, ordenadas por distancia
+    @property
+    def players_teammates(self):
+        return self.mates_table.players
+
+    @players_teammates.setter
+    def players_teammates(self, players):
+        self.mates_table.load_dicts(players or [])
+
+    @property
+    def players_opponents(self):
+        return self.opps_table.players
+
+    @players_opponents.setter
+    def players_opponents(self, players):
+        self.opps_table.load_dicts(players or [])
 
     def update_from_see(self, parsed):
+        # parsed puede venir de MessageParser, que reutiliza sus dicts entre ciclos:
+        # todo se copia a estructuras propias que se actualizan en sitio.
         if "time" in parsed and parsed["time"] is not None:
             self.time = parsed["time"]
-        self.ball = parsed.get("ball")
-        current_goals = parsed.get("goals", [])
-        self.goals = current_goals
-        for g in current_goals:
-            self.last_goal_seen[g["side"]] = g
-        self.players_teammates = []
-        self.players_opponents = []
-        raw_players = parsed.get("teammates", []) + parsed.get("opponents", [])
-        for p in raw_players:
-            p_team = p.get("team", "")
-            if self.self_side and p_team.lower() == self.self_side.lower():
-                self.players_teammates.append(p)
+        ball = parsed.get("ball")
+        if ball is not None:
+            b = self._ball
+            b["dist"], b["dir"] = ball["dist"], ball["dir"]
+            self.ball = b
+            if "x" in ball and "y" in ball:
+                b["x"], b["y"] = ball["x"], ball["y"]
+                self.ball_est.update(self.time, b["x"], b["y"])
             else:
-                self.players_opponents.append(p)
+                # Dicts incompletos (solo dist/dir): no se alimenta el estimador con (0, 0)
+                rad = b["dir"] * DEG2RAD
+                b["x"], b["y"] = b["dist"] * math.cos(rad), b["dist"] * math.sin(rad)
+                self.ball_est.sync(self.time)
+        else:
+            self.ball = None
+            self.ball_est.sync(self.time)
+        goals = self.goals
+        goals.clear()
+        for g in parsed.get("goals", []):
+            side = g["side"]
+            mem = self._goals.get(side)
+            if mem is None or mem in goals:
+                continue
+            mem.update(g)
+            goals.append(mem)
+            seen = self.last_goal_seen.get(side)
+            if seen is None:
+                self.last_goal_seen[side] = dict(g)
+            else:
+                seen.update(g)
+        self.mates_table.load(parsed.get("teammates", []))
+        # Jugadores sin equipo identificado se tratan como rivales (obstáculos)
+        self.opps_table.load(parsed.get("opponents", []), parsed.get("unknown", []))
+
+    def predicted_ball(self):
+        # Balón estimado para el ciclo actual cuando el see no lo trae (None si nunca se
+        # vio o la estimación es demasiado vieja). Mismas claves que world_model.ball.
+        est = self.ball_est
+        age = est.age(self.time)
+        if age is None or age > est.max_age:
+            return None
+        b = self._ball_pred
+        b["x"], b["y"] = est.predict(self.time)
+        b["dist"], b["dir"] = polar(b["x"], b["y"])
+        return b
 
-    def update_from_sense_body(self, stamina=None, can_kick=False):
+    def update_from_sense_body(self, stamina=None, can_kick=False, speed=None, speed_dir=None):
         if stamina is not None:
-            self.stamina = stamina
\ No newline at end of file
+            self.stamina = stamina
+        if speed:
+            # sense_body da la velocidad ya decaída (relativa a la cabeza): en el último
+            # ciclo el jugador recorrió speed / PLAYER_DECAY
+            d, rad = speed / PLAYER_DECAY, (speed_dir or 0.0) * DEG2RAD
+            self.ball_est.move(d * math.cos(rad), d * math.sin(rad))
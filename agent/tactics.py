@@ -1,55 +1,157 @@
 import math
+import time
 
-def get_shoot_action(world_model, my_side):
+import numpy as np
+
+from agent.ball import BALL_DECAY, KICKABLE, RAD2DEG
+from agent.state import X, Y
+
+KICK_POWER_RATE = 0.027   # velocidad inicial del balón por unidad de potencia
+# Velocidad inicial de un chut a potencia 100 (no el tope del servidor, agent.ball.BALL_SPEED_MAX)
+KICK_SPEED_MAX = KICK_POWER_RATE * 100.0
+OPP_SPEED = 1.0           # m/ciclo que suponemos a un rival yendo a cortar
+OPP_REACTION = 1          # ciclos que tarda en reaccionar (ver el pase y girarse)
+MATE_SPEED = 0.8          # m/ciclo del receptor hacia un pase adelantado
+PASS_END_SPEED = 1.0      # velocidad con la que queremos que llegue el pase
+LEAD_DISTANCES = (3.0, 6.0)
+SHOT_ANGLES = 9           # ángulos muestreados a lo ancho de la portería
+GOAL_HALF_WIDTH = 7.0
+HORIZON = 40
+MARGIN_CAP = 5.0          # m: más margen que este no hace mejor un pase o un tiro
+BUDGET = 0.002            # segundos por ciclo para toda la evaluación de pases
+
+_STEPS = np.arange(1, HORIZON + 1, dtype=float)
+_GEOM = (1.0 - BALL_DECAY ** _STEPS) / (1.0 - BALL_DECAY)
+_OPP_REACH = OPP_SPEED * np.maximum(_STEPS - OPP_REACTION, 0.0) + KICKABLE
+
+
+def _target_goal(world_model, my_side):
     my_side_char = (my_side or "r")[0].lower()
     target_goal_side = 'l' if my_side_char == 'r' else 'r'
-    
-    goal = None
     for g in world_model.goals:
         if g["side"] == target_goal_side:
-            goal = g
-            break
-    if not goal:
-        goal = world_model.last_goal_seen.get(target_goal_side)
-    if not goal: return None 
-        
+            return g
+    return world_model.last_goal_seen.get(target_goal_side)
+
+
+def arrival_steps(dist, v0):
+    # Ciclos que tarda el balón en recorrer dist saliendo a v0 (inf si no llega)
+    left = 1.0 - dist * (1.0 - BALL_DECAY) / v0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.log(left) / math.log(BALL_DECAY)
+    return np.where(left > 0.0, k, np.inf)
+
+
+def clearance(targets, v0, opps):
+    """Margen (m) con el que el balón lanzado desde el origen hacia cada punto de
+    targets (m, 2) a velocidad v0 (m,) escapa de los rivales opps (n, 2) hasta llegar:
+    el mínimo de |balón(k) - rival| - alcance del rival en k ciclos, para k <= llegada.
+    Negativo = algún rival corta el balón antes. También devuelve los ciclos de llegada."""
+    dist = np.hypot(targets[:, 0], targets[:, 1])
+    karr = arrival_steps(dist, v0)
+    if not len(opps):
+        return np.full(len(targets), np.inf), karr
+    # Solo cuentan los ciclos hasta la llegada (y al menos el primero)
+    last = np.minimum(np.maximum(np.ceil(karr), 1.0), HORIZON)
+    k = int(last.max())
+    unit = targets / np.maximum(dist, 1e-9)[:, None]
+    s = np.minimum(v0[:, None] * _GEOM[:k], dist[:, None])             # (m, K)
+    bx = (s * unit[:, 0:1])[:, :, None]
+    by = (s * unit[:, 1:2])[:, :, None]
+    gap = np.hypot(bx - opps[:, 0], by - opps[:, 1])                    # (m, K, n)
+    gap = gap.min(axis=2) - _OPP_REACH[:k]
+    gap[_STEPS[:k] > last[:, None]] = np.inf
+    return gap.min(axis=1), karr
+
+
+def get_shoot_action(world_model, my_side):
+    goal = _target_goal(world_model, my_side)
+    if not goal: return None
+
     if goal["dist"] > 45.0: return None
-        
-    shoot_angle = goal["dir"]
-    blocked = False
-    for opp in world_model.players_opponents:
-        if opp["dist"] < goal["dist"] and abs(opp["dir"] - shoot_angle) < 6.0:
-            blocked = True
+
+    # Abanico de tiros a lo ancho de la boca de gol, todos a potencia máxima
+    dist = goal["dist"]
+    half = math.atan2(GOAL_HALF_WIDTH * 0.8, dist) * RAD2DEG
+    angles = goal["dir"] + np.linspace(-half, half, SHOT_ANGLES)
+    rad = np.radians(angles)
+    targets = np.stack([dist * np.cos(rad), dist * np.sin(rad)], axis=1)
+    v0 = np.full(SHOT_ANGLES, KICK_SPEED_MAX)
+    margin, karr = clearance(targets, v0, world_model.opps[:, X:Y + 1])
+    margin = np.minimum(np.where(np.isfinite(karr), margin, -np.inf), MARGIN_CAP)
+    top = margin.max()
+    if top <= 0.0: return None
+    # Entre los empatados (p.ej. sin rivales, todos al tope) el más centrado
+    best = int(np.argmin(np.where(margin == top, np.abs(angles - goal["dir"]), np.inf)))
+    return (100.0, float(angles[best]))
+
+
+def _lead_dirs(pos, goal):
+    # Dirección de los pases adelantados de cada compañero: hacia la portería rival si la
+    # vemos, si no en la prolongación de la línea de pase
+    if goal is not None:
+        g = math.radians(goal["dir"])
+        ahead = np.array([goal["dist"] * math.cos(g), goal["dist"] * math.sin(g)]) - pos
+    else:
+        ahead = pos.copy()
+    ahead /= np.maximum(np.hypot(ahead[:, 0], ahead[:, 1]), 1e-9)[:, None]
+    return ahead
+
+
+def _score_passes(targets, lead, goal, opps):
+    dist = np.hypot(targets[:, 0], targets[:, 1])
+    v0 = np.minimum(PASS_END_SPEED + dist * (1.0 - BALL_DECAY), KICK_SPEED_MAX)
+    margin, karr = clearance(targets, v0, opps)
+    # El receptor tiene que llegar al punto antes que el balón
+    ok = (dist >= 2.0) & (dist <= 45.0) & (margin > 0.0) & (lead <= MATE_SPEED * karr + KICKABLE)
+    angle = np.degrees(np.arctan2(targets[:, 1], targets[:, 0]))
+    score = 20.0 * (np.abs(angle) < 45.0) + dist * 0.5 + 2.0 * np.minimum(margin, MARGIN_CAP)
+    if goal is not None:
+        g = math.radians(goal["dir"])
+        gx, gy = goal["dist"] * math.cos(g), goal["dist"] * math.sin(g)
+        score += goal["dist"] - np.hypot(gx - targets[:, 0], gy - targets[:, 1])
+    score = np.where(ok, score, -np.inf)
+    return score, v0, angle
+
+
+def new_pass_cost():
+    # Coste medio (s) de evaluar un tramo de pases adelantados (todos los compañeros a una
+    # misma distancia de adelanto). Cada jugador guarda el suyo (AgentFSM.pass_cost): con
+    # hilos, un dict de módulo mezclaría los tiempos de todos.
+    return {"lead": 0.0}
+
+
+def get_best_pass(world_model, my_unum, my_side=None, budget=BUDGET, cost=None, deadline=None):
+    # Primero los pases al pie (siempre); después, tramo a tramo, los adelantados mientras
+    # el siguiente tramo quepa en budget y antes de deadline (time.monotonic del ciclo)
+    mates = world_model.mates
+    if not len(mates):
+        return None
+    cost = new_pass_cost() if cost is None else cost
+    stop = time.monotonic() + budget
+    if deadline is not None:
+        stop = min(stop, deadline)
+    opps = world_model.opps[:, X:Y + 1]
+    goal = _target_goal(world_model, my_side or world_model.self_side)
+    pos = mates[:, X:Y + 1]
+    n = len(mates)
+    score, v0, angle = _score_passes(pos, np.zeros(n), goal, opps)
+    i = int(np.argmax(score))
+    best = (score[i], v0[i], angle[i])
+    ahead = None
+    for lead in LEAD_DISTANCES:
+        t0 = time.monotonic()
+        if t0 + cost["lead"] > stop:
+            # Se relaja poco a poco para volver a probar los tramos que no han cabido
+            cost["lead"] *= 0.95
             break
-    if blocked: return None
-    return (100.0, shoot_angle)
-
-def get_best_pass(world_model, my_unum):
-    best_mate = None
-    best_score = -999
-    
-    for mate in world_model.players_teammates:
-        dist = mate["dist"]
-        angle = mate["dir"]
-        
-        if dist < 2.0: continue
-        if dist > 45.0: continue 
-        
-        score = 0
-        blocked = False
-        for opp in world_model.players_opponents:
-            if opp["dist"] < dist and abs(opp["dir"] - angle) < 5.0:
-                blocked = True
-                break
-        if blocked: score -= 500
-        
-        if abs(angle) < 45.0: score += 20 
-        score += dist * 0.5 
-        
-        if score > best_score and not blocked:
-            best_score = score
-            best_mate = mate
-    if best_mate:
-        pass_power = min(100.0, 40.0 + (best_mate["dist"] * 2.0))
-        return (pass_power, best_mate["dir"])
-    return None
\ No newline at end of file
+        if ahead is None:
+            ahead = _lead_dirs(pos, goal)
+        score, v0, angle = _score_passes(pos + ahead * lead, np.full(n, lead), goal, opps)
+        i = int(np.argmax(score))
+        if score[i] > best[0]:
+            best = (score[i], v0[i], angle[i])
+        cost["lead"] = 0.8 * cost["lead"] + 0.2 * (time.monotonic() - t0)
+    if best[0] == -np.inf:
+        return None
+    return (min(100.0, float(best[1]) / KICK_POWER_RATE), float(best[2]))
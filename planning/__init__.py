@@ -1,4 +1,20 @@
-from planning.potentials import compute_force
-from planning.astar import AStarPlanner
+import importlib
 
-__all__ = ["compute_force", "AStarPlanner"]
+# Carga perezosa: `import planning.potentials` (lo que usa el FSM) no arrastra la rejilla
+# numpy ni los planificadores; `from planning import AStarPlanner` sigue funcionando
+_EXPORTS = {
+    "compute_force": "planning.potentials", "compute_forces": "planning.potentials",
+    "forces_to_commands": "planning.potentials", "FormationField": "planning.potentials",
+    "AStarPlanner": "planning.astar", "DStarLitePlanner": "planning.dstar", "OccupancyGrid": "planning.grid",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'planning' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
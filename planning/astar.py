@@ -1,112 +1,142 @@
 import heapq
 import math
+import time
 from typing import Tuple, List, Optional
 
+from planning.grid import OccupancyGrid, DIAG_COST, KEEP_OBSTACLES
+
+SQRT2_EXTRA = DIAG_COST - 1.0
+
 class AStarPlanner:
-    
-    def __init__(self, cell_size=2.0):
-        
-        self.cell_size = cell_size
-        
-        self.field_x_min, self.field_x_max = -52.5, 52.5
-        self.field_y_min, self.field_y_max = -34.0, 34.0
-        
-        self.grid_width = int((self.field_x_max - self.field_x_min) / cell_size)
-        self.grid_height = int((self.field_y_max - self.field_y_min) / cell_size)
-    
+
+    def __init__(self, cell_size=2.0, grid: Optional[OccupancyGrid] = None):
+
+        self.grid = grid or OccupancyGrid(cell_size)
+        self.cell_size = self.grid.cell_size
+
+        self.field_x_min, self.field_x_max = self.grid.field_x_min, self.grid.field_x_max
+        self.field_y_min, self.field_y_max = self.grid.field_y_min, self.grid.field_y_max
+
+        self.grid_width = self.grid.width
+        self.grid_height = self.grid.height
+
+        # Buffers de búsqueda reutilizados: un valor solo es válido si su sello
+        # coincide con el id de la búsqueda actual, así no hay que limpiarlos.
+        n = self.grid.size
+        self._g = [0.0] * n
+        self._parent = [-1] * n
+        self._seen = [0] * n
+        self._closed = [0] * n
+        self._search_id = 0
+        self.last_expansions = 0
+        # False si la última búsqueda se cortó por plazo y devolvió un camino parcial
+        self.last_complete = True
+
     def world_to_grid(self, world_x: float, world_y: float) -> Tuple[int, int]:
-        gx = int((world_x - self.field_x_min) / self.cell_size)
-        gy = int((world_y - self.field_y_min) / self.cell_size)
-        
-        gx = max(0, min(gx, self.grid_width - 1))
-        gy = max(0, min(gy, self.grid_height - 1))
-        return gx, gy
-    
+        return self.grid.world_to_grid(world_x, world_y)
+
     def grid_to_world(self, gx: int, gy: int) -> Tuple[float, float]:
-        wx = self.field_x_min + gx * self.cell_size + self.cell_size / 2
-        wy = self.field_y_min + gy * self.cell_size + self.cell_size / 2
-        return wx, wy
-    
+        return self.grid.grid_to_world(gx, gy)
+
     def heuristic(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
-        return max(abs(pos1[0] - pos2[0]), abs(pos1[1] - pos2[1]))
-    
+        dx, dy = abs(pos1[0] - pos2[0]), abs(pos1[1] - pos2[1])
+        return max(dx, dy) + SQRT2_EXTRA * min(dx, dy)
+
     def get_neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
-        gx, gy = pos
-        neighbors = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx = gx + dx
-                ny = gy + dy
-                if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
-                    neighbors.append((nx, ny))
-        return neighbors
-    
-    def plan(self, 
-             start_world: Tuple[float, float], 
+        h = self.grid_height
+        return [divmod(n, h) for n, _ in self.grid.neighbors[pos[0] * h + pos[1]]]
+
+    def update_obstacles(self, obstacles_world):
+        # Solo se recalculan las celdas de los obstáculos que se movieron
+        return self.grid.update(obstacles_world)
+
+    def plan(self,
+             start_world: Tuple[float, float],
              goal_world: Tuple[float, float],
-             obstacles_world: Optional[List[Tuple[float, float]]] = None) -> Optional[List[Tuple[float, float]]]:
-
-        if obstacles_world is None:
-            obstacles_world = []
-        
-        start_grid = self.world_to_grid(*start_world)
-        goal_grid = self.world_to_grid(*goal_world)
-        
-        
-        obstacles = set()
-        for ox, oy in obstacles_world:
-            ogx, ogy = self.world_to_grid(ox, oy)
-            
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    obs_cell = (ogx + dx, ogy + dy)
-                    if 0 <= obs_cell[0] < self.grid_width and 0 <= obs_cell[1] < self.grid_height:
-                        obstacles.add(obs_cell)
-        
-        
-        open_set = [(0, start_grid)]
-        came_from = {}
-        g_score = {start_grid: 0}
-        closed_set = set()
-        
+             obstacles_world: Optional[List[Tuple[float, float]]] = None,
+             deadline: Optional[float] = None,
+             max_expansions: Optional[int] = None) -> Optional[List[Tuple[float, float]]]:
+        # Anytime: con deadline (time.perf_counter) o max_expansions, si la búsqueda A* se
+        # corta devuelve el camino hasta el nodo más cercano al objetivo (last_complete=False)
+
+        if obstacles_world is not KEEP_OBSTACLES:
+            self.grid.update(obstacles_world)
+
+        start = self.grid.index(*self.world_to_grid(*start_world))
+        goal = self.grid.index(*self.world_to_grid(*goal_world))
+
+        self.last_complete = True
+        cells = self._search_astar(start, goal, deadline, max_expansions)
+        if cells is None:
+            return None
+        return self.grid.path_to_world(cells, start_world)
+
+    def _new_search(self):
+        self._search_id += 1
+        return self._search_id
+
+    def _reconstruct(self, node, start):
+        cells = []
+        parent = self._parent
+        while node != start:
+            cells.append(node)
+            node = parent[node]
+        cells.reverse()
+        return cells
+
+    def _search_astar(self, start, goal, deadline=None, max_expansions=None):
+        sid = self._new_search()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        blocked = self.grid.blocked
+        neighbors = self.grid.neighbors
+        h = self.grid_height
+        gx, gy = divmod(goal, h)
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        g[start] = 0.0
+        seen[start] = sid
+        open_set = [(0.0, start)]
         iteration = 0
-        max_iterations = self.grid_width * self.grid_height  
-        
+        max_iterations = self.grid.size
+        limit = max_expansions or max_iterations
+        anytime = deadline is not None or max_expansions is not None
+        best, best_h = start, math.inf
+
         while open_set and iteration < max_iterations:
             iteration += 1
-            _, current = heapq.heappop(open_set)
-            
-            if current in closed_set:
+            _, current = heappop(open_set)
+            if closed[current] == sid:
                 continue
-            closed_set.add(current)
-            
-            if current == goal_grid:
-                
-                path = []
-                node = current
-                while node in came_from:
-                    path.append(self.grid_to_world(*node))
-                    node = came_from[node]
-                path.append(start_world)
-                return list(reversed(path))
-            
-            for neighbor in self.get_neighbors(current):
-                if neighbor in closed_set or neighbor in obstacles:
+            closed[current] = sid
+
+            if current == goal:
+                self.last_expansions = iteration
+                return self._reconstruct(current, start)
+
+            if anytime:
+                cx, cy = divmod(current, h)
+                dx, dy = abs(cx - gx), abs(cy - gy)
+                h_cur = dx + SQRT2_EXTRA * dy if dx > dy else dy + SQRT2_EXTRA * dx
+                if h_cur < best_h:
+                    best, best_h = current, h_cur
+                if iteration >= limit or (deadline is not None and not iteration & 31 and time.perf_counter() > deadline):
+                    self.last_expansions = iteration
+                    self.last_complete = False
+                    return self._reconstruct(best, start)
+
+            g_cur = g[current]
+            for neighbor, cost in neighbors[current]:
+                if blocked[neighbor] or closed[neighbor] == sid:
                     continue
-                
-                
-                dx = abs(neighbor[0] - current[0])
-                dy = abs(neighbor[1] - current[1])
-                move_cost = 1.41 if dx == 1 and dy == 1 else 1.0
-                
-                tentative_g = g_score[current] + move_cost
-                
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f = tentative_g + self.heuristic(neighbor, goal_grid)
-                    heapq.heappush(open_set, (f, neighbor))
-        
-        return None  
\ No newline at end of file
+                tentative_g = g_cur + cost
+                if seen[neighbor] != sid or tentative_g < g[neighbor]:
+                    seen[neighbor] = sid
+                    g[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    nx, ny = divmod(neighbor, h)
+                    dx, dy = abs(nx - gx), abs(ny - gy)
+                    f = tentative_g + (dx + SQRT2_EXTRA * dy if dx > dy else dy + SQRT2_EXTRA * dx)
+                    heappush(open_set, (f, neighbor))
+
+        self.last_expansions = iteration
+        return None
@@ -0,0 +1,163 @@
+import heapq
+from typing import List, Optional, Tuple
+
+from planning.grid import OccupancyGrid, DIAG_COST, KEEP_OBSTACLES
+
+INF = float("inf")
+COST_SCALE = 100
+
+
+class DStarLitePlanner:
+    # Replanificación incremental (D* Lite, Koenig & Likhachev) sobre la misma
+    # OccupancyGrid. Mientras el objetivo no cambie de celda, cada plan() solo repara
+    # los nodos afectados por las celdas que cambiaron y por el avance del jugador.
+    # Los costes se escalan a enteros: con floats, los empates de clave a lo largo del
+    # camino óptimo se rompen por redondeo y la búsqueda termina antes de tiempo.
+
+    def __init__(self, cell_size=2.0, grid: Optional[OccupancyGrid] = None, max_expansions=None):
+        self.grid = grid or OccupancyGrid(cell_size)
+        n = self.grid.size
+        self.max_expansions = max_expansions or 4 * n
+        self._nb = [tuple((v, int(round(c * COST_SCALE))) for v, c in nb) for nb in self.grid.neighbors]
+        self._diag_extra = int(round((DIAG_COST - 1.0) * COST_SCALE))
+        self._g = [INF] * n
+        self._rhs = [INF] * n
+        self._key = [None] * n
+        self._heap: List[Tuple[float, float, int]] = []
+        self._km = 0
+        self._goal = None
+        self._last_start = None
+        self._version = -1
+        self.last_expansions = 0
+
+    def _h(self, a, b):
+        ax, ay = divmod(a, self.grid.height)
+        bx, by = divmod(b, self.grid.height)
+        dx, dy = abs(ax - bx), abs(ay - by)
+        return COST_SCALE * max(dx, dy) + self._diag_extra * min(dx, dy)
+
+    def _calc_key(self, s, start):
+        m = min(self._g[s], self._rhs[s])
+        return (m + self._h(start, s) + self._km, m)
+
+    def _reset(self, goal):
+        n = self.grid.size
+        self._g[:] = [INF] * n
+        self._rhs[:] = [INF] * n
+        self._key[:] = [None] * n
+        self._heap = []
+        self._km = 0
+        self._goal = goal
+        self._rhs[goal] = 0
+        self._push(goal, (self._h(self._last_start, goal), 0))
+
+    def _push(self, s, key):
+        self._key[s] = key
+        heapq.heappush(self._heap, (key[0], key[1], s))
+
+    def _update_vertex(self, u, start):
+        g, rhs, blocked = self._g, self._rhs, self.grid.blocked
+        if u != self._goal:
+            best = INF
+            for v, cost in self._nb[u]:
+                if not blocked[v]:
+                    c = cost + g[v]
+                    if c < best:
+                        best = c
+            rhs[u] = best
+        if g[u] != rhs[u]:
+            self._push(u, self._calc_key(u, start))
+        else:
+            self._key[u] = None
+
+    def _top(self):
+        heap, keys = self._heap, self._key
+        while heap:
+            k1, k2, s = heap[0]
+            if keys[s] == (k1, k2):
+                return (k1, k2), s
+            heapq.heappop(heap)
+        return (INF, INF), None
+
+    def _compute(self, start):
+        g, rhs, neighbors = self._g, self._rhs, self._nb
+        expansions = 0
+        while expansions < self.max_expansions:
+            k_old, u = self._top()
+            if u is None:
+                break
+            if k_old >= self._calc_key(start, start) and rhs[start] == g[start]:
+                break
+            expansions += 1
+            k_new = self._calc_key(u, start)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                self._key[u] = None
+                heapq.heappop(self._heap)
+                for v, _ in neighbors[u]:
+                    self._update_vertex(v, start)
+            else:
+                g[u] = INF
+                for v, _ in neighbors[u]:
+                    self._update_vertex(v, start)
+                self._update_vertex(u, start)
+        self.last_expansions = expansions
+
+    def plan(self,
+             start_world: Tuple[float, float],
+             goal_world: Tuple[float, float],
+             obstacles_world: Optional[List[Tuple[float, float]]] = None) -> Optional[List[Tuple[float, float]]]:
+        grid = self.grid
+        if obstacles_world is not KEEP_OBSTACLES:
+            grid.update(obstacles_world)
+        start = grid.index(*grid.world_to_grid(*start_world))
+        goal = grid.index(*grid.world_to_grid(*goal_world))
+
+        if goal != self._goal:
+            self._last_start = start
+            self._reset(goal)
+        else:
+            self._km += self._h(self._last_start, start)
+            self._last_start = start
+            if grid.version == self._version + 1:
+                # Una celda que cambia altera el coste de las aristas que entran en
+                # ella: hay que revisar a todos sus vecinos.
+                for c in grid.changed.tolist():
+                    for v, _ in self._nb[c]:
+                        self._update_vertex(v, start)
+            elif grid.version != self._version:
+                # Se perdieron actualizaciones intermedias (rejilla compartida): desde cero
+                self._reset(goal)
+        self._version = grid.version
+
+        if grid.blocked[goal]:
+            # Igual que A*: no se puede entrar en una celda ocupada
+            return None
+        self._compute(start)
+        if self._g[start] == INF and self._rhs[start] == INF:
+            return None
+        cells = self._extract(start, goal)
+        if cells is None:
+            return None
+        return grid.path_to_world(cells, start_world)
+
+    def _extract(self, start, goal):
+        g, blocked, neighbors = self._g, self.grid.blocked, self._nb
+        cells = []
+        node = start
+        for _ in range(self.grid.size):
+            if node == goal:
+                return cells
+            best, best_c = None, INF
+            for v, cost in neighbors[node]:
+                if not blocked[v]:
+                    c = cost + g[v]
+                    if c < best_c:
+                        best, best_c = v, c
+            if best is None or best_c == INF:
+                return None
+            node = best
+            cells.append(node)
+        return None
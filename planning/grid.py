@@ -0,0 +1,105 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FIELD_X_MIN, FIELD_X_MAX = -52.5, 52.5
+FIELD_Y_MIN, FIELD_Y_MAX = -34.0, 34.0
+DIAG_COST = 1.41
+# plan(..., obstacles_world=KEEP_OBSTACLES): se reutiliza la rejilla tal como quedó en el
+# último update (None sigue significando "sin obstáculos")
+KEEP_OBSTACLES = object()
+
+
+class OccupancyGrid:
+    # Rejilla de ocupación preasignada compartida por los planificadores. Cada celda
+    # guarda cuántos obstáculos (inflados `inflate` celdas) la cubren; en cada ciclo
+    # solo se tocan las celdas de los obstáculos que cambiaron de celda.
+
+    def __init__(self, cell_size: float = 2.0, inflate: int = 1):
+        self.cell_size = cell_size
+        self.field_x_min, self.field_x_max = FIELD_X_MIN, FIELD_X_MAX
+        self.field_y_min, self.field_y_max = FIELD_Y_MIN, FIELD_Y_MAX
+        self.width = int((self.field_x_max - self.field_x_min) / cell_size)
+        self.height = int((self.field_y_max - self.field_y_min) / cell_size)
+        self.size = self.width * self.height
+
+        # Índice plano: idx = gx * height + gy
+        self.counts = np.zeros(self.size, dtype=np.int16)
+        self.obstacle_hits = np.zeros(self.size, dtype=np.int16)
+        self.blocked = bytes(self.size)
+        self.changed: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.version = 0
+
+        offs = [(dx, dy) for dx in range(-inflate, inflate + 1) for dy in range(-inflate, inflate + 1)]
+        self._foot_dx = np.array([o[0] for o in offs], dtype=np.int64)
+        self._foot_dy = np.array([o[1] for o in offs], dtype=np.int64)
+
+        # Vecinos precalculados (índice, coste) para no crear listas en cada expansión
+        self.neighbors: List[Tuple[Tuple[int, float], ...]] = []
+        for gx in range(self.width):
+            for gy in range(self.height):
+                nb = []
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        if dx == 0 and dy == 0:
+                            continue
+                        nx, ny = gx + dx, gy + dy
+                        if 0 <= nx < self.width and 0 <= ny < self.height:
+                            nb.append((nx * self.height + ny, DIAG_COST if dx and dy else 1.0))
+                self.neighbors.append(tuple(nb))
+
+    def world_to_grid(self, world_x: float, world_y: float) -> Tuple[int, int]:
+        gx = int((world_x - self.field_x_min) / self.cell_size)
+        gy = int((world_y - self.field_y_min) / self.cell_size)
+        gx = max(0, min(gx, self.width - 1))
+        gy = max(0, min(gy, self.height - 1))
+        return gx, gy
+
+    def grid_to_world(self, gx: int, gy: int) -> Tuple[float, float]:
+        wx = self.field_x_min + gx * self.cell_size + self.cell_size / 2
+        wy = self.field_y_min + gy * self.cell_size + self.cell_size / 2
+        return wx, wy
+
+    def index(self, gx: int, gy: int) -> int:
+        return gx * self.height + gy
+
+    def coords(self, idx: int) -> Tuple[int, int]:
+        return divmod(idx, self.height)
+
+    def cells_of(self, points: Optional[Sequence[Tuple[float, float]]]) -> np.ndarray:
+        if points is None or len(points) == 0:
+            return np.zeros(0, dtype=np.int64)
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        gx = np.clip(((pts[:, 0] - self.field_x_min) / self.cell_size).astype(np.int64), 0, self.width - 1)
+        gy = np.clip(((pts[:, 1] - self.field_y_min) / self.cell_size).astype(np.int64), 0, self.height - 1)
+        return gx * self.height + gy
+
+    def update(self, obstacles_world: Optional[Sequence[Tuple[float, float]]]) -> np.ndarray:
+        # Devuelve (y guarda en self.changed) las celdas cuyo estado libre/ocupado cambió
+        hits = np.bincount(self.cells_of(obstacles_world), minlength=self.size).astype(np.int16)
+        delta = hits - self.obstacle_hits
+        moved = np.nonzero(delta)[0]
+        if len(moved) == 0:
+            self.changed = moved
+            return moved
+        self.obstacle_hits = hits
+
+        gx, gy = np.divmod(moved, self.height)
+        fx = gx[:, None] + self._foot_dx
+        fy = gy[:, None] + self._foot_dy
+        valid = (fx >= 0) & (fx < self.width) & (fy >= 0) & (fy < self.height)
+        cells = (fx * self.height + fy)[valid]
+        before = self.counts[cells] > 0
+        np.add.at(self.counts, cells, np.broadcast_to(delta[moved][:, None], fx.shape)[valid])
+        flipped = cells[before != (self.counts[cells] > 0)]
+        self.changed = np.unique(flipped)
+        if len(self.changed):
+            self.blocked = (self.counts > 0).tobytes()
+            self.version += 1
+        return self.changed
+
+    def path_to_world(self, cells: List[int], start_world: Tuple[float, float]) -> List[Tuple[float, float]]:
+        path = [start_world]
+        for idx in cells:
+            path.append(self.grid_to_world(*divmod(idx, self.height)))
+        return path
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 FIELD_X_MIN, FIELD_X_MAX = -52.5, 52.5
 FIELD_Y_MIN, FIELD_Y_MAX = -34.0, 34.0
 
@@ -29,4 +30,147 @@ def compute_force(self_unum, self_pos, target, opponents, teammates, role_manage
     
     force_mag = math.hypot(f_x, f_y)
     if force_mag < 0.5: return 0.0, 0.0 
-    return math.degrees(math.atan2(f_y, f_x)), min(100.0, force_mag)
\ No newline at end of file
+    return math.degrees(math.atan2(f_y, f_x)), min(100.0, force_mag)
+
+
+# --- Versión vectorizada: muchos puntos de consulta y jugadores en una sola llamada ---
+# Misma ley que compute_force (atracción constante hacia el objetivo, repulsión
+# min(cap, gain/d^2) dentro de un radio) pero con posiciones en arrays (N, 2) en el
+# mismo marco de referencia, sea relativo al jugador o absoluto del campo.
+# Solo biblioteca por ahora: el FSM sigue con compute_force. FormationField trabaja en
+# coordenadas absolutas y el WorldModel no sabe dónde está el jugador (no hay
+# localización), así que no hay paso de colocación al que enchufarlo todavía.
+
+ATTRACT = 150.0
+OPP_RADIUS, OPP_GAIN, OPP_CAP = 4.0, 40.0, 120.0
+MATE_RADIUS, MATE_GAIN, MATE_CAP = 3.0, 20.0, 80.0
+BOUND_MARGIN = 3.0
+
+def as_points(points):
+    if points is None: return np.zeros((0, 2))
+    if len(points) and isinstance(points[0], dict):
+        return np.array([(p["x"], p["y"]) for p in points], dtype=np.float64)
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+def _attraction(points, target):
+    d = np.asarray(target, dtype=np.float64) - points
+    dist = np.hypot(d[..., 0], d[..., 1])
+    scale = np.where(dist > 0.5, ATTRACT / np.maximum(dist, 1e-9), 0.0)
+    return d * scale[..., None]
+
+def _repulsion(points, others, radius, gain, cap, mask=None):
+    # points (..., 2), others (M, 2) -> (..., 2). mask (..., M) descarta pares (p.ej. uno mismo)
+    if len(others) == 0: return np.zeros_like(points)
+    d = points[..., None, :] - others
+    dist = np.hypot(d[..., 0], d[..., 1])
+    safe = np.maximum(dist, 0.1)
+    rep = np.minimum(cap, gain / safe**2) * (dist < radius)
+    if mask is not None: rep = rep * mask
+    return (d * (rep / safe)[..., None]).sum(axis=-2)
+
+def _rep_potential(points, others, radius, gain, cap, mask=None):
+    # Potencial cuyo gradiente es la repulsión anterior: gain*(1/d - 1/radius), con d
+    # acotada en sqrt(gain/cap) para respetar el tope de fuerza.
+    if len(others) == 0: return np.zeros(points.shape[:-1])
+    d = points[..., None, :] - others
+    dist = np.maximum(np.hypot(d[..., 0], d[..., 1]), math.sqrt(gain / cap))
+    u = np.maximum(gain / dist - gain / radius, 0.0)
+    if mask is not None: u = u * mask
+    return u.sum(axis=-1)
+
+def bounds_force(points):
+    # Empuja hacia dentro cuando el punto está a menos de BOUND_MARGIN de una línea
+    points = np.asarray(points, dtype=np.float64)
+    f = np.zeros_like(points)
+    for axis, lo, hi in ((0, FIELD_X_MIN, FIELD_X_MAX), (1, FIELD_Y_MIN, FIELD_Y_MAX)):
+        for gap, sign in ((points[..., axis] - lo, 1.0), (hi - points[..., axis], -1.0)):
+            safe = np.maximum(gap, 0.1)
+            f[..., axis] += sign * np.minimum(MATE_CAP, MATE_GAIN / safe**2) * (gap < BOUND_MARGIN)
+    return f
+
+def compute_forces(points, target=None, opponents=None, teammates=None, teammate_mask=None):
+    """Fuerzas (N, 2) sobre N puntos de consulta. target puede ser (2,) o (N, 2)."""
+    points = as_points(points)
+    f = np.zeros_like(points)
+    if target is not None:
+        f += _attraction(points, target)
+    f += _repulsion(points, as_points(opponents), OPP_RADIUS, OPP_GAIN, OPP_CAP)
+    f += _repulsion(points, as_points(teammates), MATE_RADIUS, MATE_GAIN, MATE_CAP, teammate_mask)
+    return f
+
+def forces_to_commands(forces):
+    # Equivalente a la salida de compute_force: (ángulo en grados, potencia <= 100)
+    forces = np.asarray(forces, dtype=np.float64)
+    mag = np.hypot(forces[..., 0], forces[..., 1])
+    moving = mag >= 0.5
+    angle = np.where(moving, np.degrees(np.arctan2(forces[..., 1], forces[..., 0])), 0.0)
+    return angle, np.where(moving, np.minimum(100.0, mag), 0.0)
+
+class FormationField:
+    # Tablas precalculadas para colocar a todo el equipo en cada ciclo: anclas de la
+    # formación (RoleManager.positions), centros de celda del campo, repulsión de las
+    # líneas por celda y los desplazamientos de celda candidatos alrededor del ancla.
+
+    def __init__(self, role_manager, cell_size=2.0, search_radius=6.0, ball_shift=(0.6, 0.3)):
+        self.unums = sorted(role_manager.positions)
+        self.index = {u: i for i, u in enumerate(self.unums)}
+        self.anchors = np.array([role_manager.positions[u] for u in self.unums], dtype=np.float64).reshape(-1, 2)
+        self.ball_shift = np.asarray(ball_shift, dtype=np.float64)
+        self.cell_size = cell_size
+        self.width = int((FIELD_X_MAX - FIELD_X_MIN) / cell_size)
+        self.height = int((FIELD_Y_MAX - FIELD_Y_MIN) / cell_size)
+
+        gx, gy = np.meshgrid(np.arange(self.width), np.arange(self.height), indexing="ij")
+        self.centers = np.stack([FIELD_X_MIN + (gx + 0.5) * cell_size,
+                                 FIELD_Y_MIN + (gy + 0.5) * cell_size], axis=-1)
+        self.bounds_lut = bounds_force(self.centers)
+        # Potencial de las líneas: cuánto penaliza cada celda estar pegada a la banda
+        self.bounds_potential_lut = np.linalg.norm(self.bounds_lut, axis=-1) * (BOUND_MARGIN / ATTRACT)
+
+        r = max(1, int(math.ceil(search_radius / cell_size)))
+        self.offsets = np.array([(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1)
+                                 if dx * dx + dy * dy <= r * r], dtype=np.int64)
+        self._not_self = ~np.eye(len(self.unums), dtype=bool)
+
+    def cell_of(self, points):
+        points = np.asarray(points, dtype=np.float64)
+        gx = np.clip(((points[..., 0] - FIELD_X_MIN) / self.cell_size).astype(np.int64), 0, self.width - 1)
+        gy = np.clip(((points[..., 1] - FIELD_Y_MIN) / self.cell_size).astype(np.int64), 0, self.height - 1)
+        return gx, gy
+
+    def targets(self, ball=None):
+        # Anclas desplazadas hacia el balón, dentro del campo
+        if ball is None: return self.anchors.copy()
+        t = self.anchors + self.ball_shift * np.asarray(ball, dtype=np.float64)
+        t[:, 0] = np.clip(t[:, 0], FIELD_X_MIN + 1.0, FIELD_X_MAX - 1.0)
+        t[:, 1] = np.clip(t[:, 1], FIELD_Y_MIN + 1.0, FIELD_Y_MAX - 1.0)
+        return t
+
+    def best_positions(self, ball=None, opponents=None):
+        """Mejor celda candidata (N, 2) para cada jugador: cerca de su ancla, lejos de
+        rivales, compañeros y bandas. Todo el equipo en una sola evaluación."""
+        targets = self.targets(ball)
+        gx, gy = self.cell_of(targets)
+        cx = np.clip(gx[:, None] + self.offsets[:, 0], 0, self.width - 1)
+        cy = np.clip(gy[:, None] + self.offsets[:, 1], 0, self.height - 1)
+        cand = self.centers[cx, cy]                                    # (N, K, 2)
+        d = cand - targets[:, None, :]
+        u = np.hypot(d[..., 0], d[..., 1])
+        u = u + _rep_potential(cand, as_points(opponents), OPP_RADIUS, OPP_GAIN, OPP_CAP) / ATTRACT
+        u = u + _rep_potential(cand, targets, MATE_RADIUS, MATE_GAIN, MATE_CAP, self._not_self[:, None, :]) / ATTRACT
+        u = u + self.bounds_potential_lut[cx, cy]
+        best = np.argmin(u, axis=1)
+        return cand[np.arange(len(cand)), best]
+
+    def team_forces(self, positions, ball=None, opponents=None):
+        # Fuerzas (N, 2) para llevar a cada jugador (en el orden de self.unums) a su puesto
+        positions = as_points(positions)
+        f = compute_forces(positions, self.best_positions(ball, opponents), opponents, positions, self._not_self)
+        gx, gy = self.cell_of(positions)
+        return f + self.bounds_lut[gx, gy]
+
+    def sample_field(self, target=None, opponents=None, teammates=None):
+        # Campo de fuerzas (width, height, 2) en el centro de cada celda
+        pts = self.centers.reshape(-1, 2)
+        f = compute_forces(pts, target, opponents, teammates)
+        return f.reshape(self.width, self.height, 2) + self.bounds_lut
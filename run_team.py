@@ -12,6 +12,18 @@ def parse_args():
     p.add_argument("--players", "-n", type=int, default=11, help="Num jugadores")
     p.add_argument("--team", "-t", default="SoccerIA", help="Nombre del equipo")
     p.add_argument("--logdir", "-l", default="logs", help="Dir logs")
+    p.add_argument("--log-format", choices=["jsonl", "binary"], default="jsonl", help="Formato de los logs de partido")
+    p.add_argument("--log-compress", action="store_true", help="Comprimir bloques del log binario (zlib)")
+    p.add_argument("--runtime", choices=["threads", "asyncio", "processes"], default="threads",
+                   help="Un hilo por jugador, todos en un event loop asyncio o repartidos en procesos")
+    p.add_argument("--processes", type=int, default=0, help="Procesos en modo processes (0 = núcleos disponibles)")
+    p.add_argument("--fast-start", action="store_true", help="Lanza todos los jugadores a la vez, sin escalonar los init")
+    p.add_argument("--metrics-dir", default=None, help="Vuelca latencias por etapa (JSON) en este directorio")
+    p.add_argument("--metrics-port", type=int, default=0, help="Sirve las latencias en http://127.0.0.1:PORT/metrics")
+    p.add_argument("--metrics-interval", type=float, default=5.0, help="Segundos entre volcados de métricas")
+    p.add_argument("--watch-models", type=float, default=0.0, metavar="SECONDS",
+                   help="Revisa models/ cada SECONDS y carga en caliente los pesos <nombre>_v<N> más nuevos "
+                        "(SIGUSR1 = volver a la versión anterior)")
     return p.parse_args()
 
 def setup_logging(logdir):
@@ -44,6 +56,16 @@ def main():
         setattr(teams_full_connection, "SERVER_PORT", args.port)
         setattr(teams_full_connection, "NUM_PLAYERS", args.players)
         setattr(teams_full_connection, "TEAM_NAME", args.team)
+        setattr(teams_full_connection, "LOG_DIR", args.logdir)
+        setattr(teams_full_connection, "LOG_FORMAT", args.log_format)
+        setattr(teams_full_connection, "LOG_COMPRESS", args.log_compress)
+        setattr(teams_full_connection, "RUNTIME", args.runtime)
+        setattr(teams_full_connection, "PROCESSES", args.processes)
+        setattr(teams_full_connection, "FAST_START", args.fast_start)
+        setattr(teams_full_connection, "METRICS_DIR", args.metrics_dir)
+        setattr(teams_full_connection, "METRICS_PORT", args.metrics_port)
+        setattr(teams_full_connection, "METRICS_INTERVAL", args.metrics_interval)
+        setattr(teams_full_connection, "MODEL_WATCH", args.watch_models)
     except Exception as e:
         logging.exception(f"Error inyectando globals: {e}")
         raise
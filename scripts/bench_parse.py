@@ -0,0 +1,77 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from perception.parse import parse_see
+from perception.sexp import MessageParser
+
+FLAGS = ["f c", "f c t", "f c b", "f l t", "f l b", "f r t", "f r b", "f p l t", "f p l c", "f p l b",
+         "f g l t", "f g l b", "f t l 10", "f t l 20", "f t r 10", "f t r 20", "f b l 10", "f b r 10"]
+
+def synthetic_messages(n, team="Right", seed=0):
+    # Mensajes con el formato de rcssserver (protocolo por defecto, nombres largos)
+    rng = random.Random(seed)
+    msgs = []
+    for t in range(n):
+        parts = [f"(see {t}"]
+        for f in rng.sample(FLAGS, 10):
+            parts.append(f"(({f.replace('f ', 'flag ', 1)}) {rng.uniform(5, 60):.1f} {rng.uniform(-45, 45):.0f})")
+        parts.append(f"((goal {rng.choice('lr')}) {rng.uniform(10, 60):.1f} {rng.uniform(-45, 45):.0f})")
+        parts.append(f"((ball) {rng.uniform(1, 40):.1f} {rng.uniform(-45, 45):.0f} 0 0)")
+        for i in range(rng.randint(4, 12)):
+            name = rng.choice([team, "Left"])
+            parts.append(f"((player {name} {rng.randint(1, 11)}) {rng.uniform(2, 50):.1f} {rng.uniform(-45, 45):.0f} 0 0 0 0)")
+        parts.append(f"((line r) {rng.uniform(5, 50):.1f} {rng.uniform(-90, 90):.0f}))")
+        msgs.append(" ".join(parts).encode())
+        msgs.append(f"(sense_body {t} (view_mode high normal) (stamina {rng.uniform(3000, 8000):.1f} 1 130600) (speed 0.1 3) (head_angle 0) (kick 0) (dash {t}) (turn 0))".encode())
+        if t % 20 == 0:
+            msgs.append(f"(hear {t} referee play_on)".encode())
+    return msgs
+
+def load_messages(path):
+    with open(path, "rb") as f:
+        return [line.rstrip(b"\r\n") for line in f if line.strip()]
+
+def bench_legacy(msgs, team, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for data in msgs:
+            msg = data.decode(errors="ignore")
+            if msg.startswith("(see"):
+                parse_see(msg)
+            elif msg.startswith("(hear"):
+                re.search(r'\(hear\s+\d+\s+referee\s+([a-zA-Z0-9_]+)\)', msg)
+            elif msg.startswith("(sense_body"):
+                re.search(r'\(stamina\s+([\d\.]+)\s+', msg)
+    return time.perf_counter() - t0
+
+def bench_sexp(msgs, team, rounds):
+    # Como Player: sin flags, que el parser regex tampoco extrae
+    parser = MessageParser(team, flags=False)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for data in msgs:
+            parser.parse(memoryview(data))
+    return time.perf_counter() - t0
+
+def main():
+    p = argparse.ArgumentParser(description="Micro-benchmark del parser de mensajes")
+    p.add_argument("--messages", help="Fichero con mensajes grabados, uno por línea")
+    p.add_argument("--team", default="Right")
+    p.add_argument("--rounds", type=int, default=20)
+    args = p.parse_args()
+    msgs = load_messages(args.messages) if args.messages else synthetic_messages(500, args.team)
+    n_see = sum(1 for m in msgs if m.startswith(b"(see"))
+    print(f"{len(msgs)} mensajes ({n_see} see) x {args.rounds} rondas")
+    # La mejor de 3 repeticiones: la máquina es ruidosa y un único tiempo engaña
+    legacy = min(bench_legacy(msgs, args.team, args.rounds) for _ in range(3))
+    fast = min(bench_sexp(msgs, args.team, args.rounds) for _ in range(3))
+    total = len(msgs) * args.rounds
+    print(f"regex: {legacy / total * 1e6:.2f} us/msg")
+    print(f"sexp:  {fast / total * 1e6:.2f} us/msg")
+    print(f"speedup: {legacy / fast:.2f}x")
+
+if __name__ == "__main__": main()
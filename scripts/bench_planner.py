@@ -0,0 +1,83 @@
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from planning.astar import AStarPlanner
+from planning.dstar import DStarLitePlanner
+
+def reference_plan(cell_size, start_world, goal_world, obstacles_world):
+    # Implementación original de AStarPlanner.plan (sets/dicts nuevos en cada llamada)
+    x_min, y_min = -52.5, -34.0
+    w, h = int(105.0 / cell_size), int(68.0 / cell_size)
+    def to_grid(x, y):
+        return (max(0, min(int((x - x_min) / cell_size), w - 1)), max(0, min(int((y - y_min) / cell_size), h - 1)))
+    start, goal = to_grid(*start_world), to_grid(*goal_world)
+    obstacles = set()
+    for ox, oy in obstacles_world:
+        ogx, ogy = to_grid(ox, oy)
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                if 0 <= ogx + dx < w and 0 <= ogy + dy < h:
+                    obstacles.add((ogx + dx, ogy + dy))
+    open_set, came_from, g_score, closed = [(0, start)], {}, {start: 0}, set()
+    it = 0
+    while open_set and it < w * h:
+        it += 1
+        _, cur = heapq.heappop(open_set)
+        if cur in closed: continue
+        closed.add(cur)
+        if cur == goal:
+            path = []
+            while cur in came_from:
+                path.append(cur); cur = came_from[cur]
+            return path[::-1]
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                if dx == 0 and dy == 0: continue
+                nb = (cur[0] + dx, cur[1] + dy)
+                if not (0 <= nb[0] < w and 0 <= nb[1] < h) or nb in closed or nb in obstacles: continue
+                tg = g_score[cur] + (1.41 if dx and dy else 1.0)
+                if nb not in g_score or tg < g_score[nb]:
+                    came_from[nb], g_score[nb] = cur, tg
+                    heapq.heappush(open_set, (tg + max(abs(nb[0] - goal[0]), abs(nb[1] - goal[1])), nb))
+    return None
+
+def scenario(ticks, n_obstacles, seed=0):
+    # Obstáculos que se desplazan poco entre ticks y objetivo que cambia cada 20 ticks,
+    # como un jugador persiguiendo el balón entre rivales.
+    rng = random.Random(seed)
+    obstacles = [[rng.uniform(-45, 45), rng.uniform(-30, 30)] for _ in range(n_obstacles)]
+    start = [rng.uniform(-50, 0), rng.uniform(-30, 30)]
+    goal = (rng.uniform(0, 50), rng.uniform(-30, 30))
+    for t in range(ticks):
+        if t % 20 == 0:
+            goal = (rng.uniform(0, 50), rng.uniform(-30, 30))
+        for o in obstacles:
+            o[0] += rng.uniform(-0.6, 0.6); o[1] += rng.uniform(-0.6, 0.6)
+        start[0] += 0.5
+        if start[0] > 50: start[0] = -50.0
+        yield tuple(start), goal, [tuple(o) for o in obstacles]
+
+def run(name, fn, ticks):
+    t0 = time.perf_counter()
+    found = sum(1 for args in ticks if fn(*args) is not None)
+    dt = time.perf_counter() - t0
+    print(f"  {name:<12} {dt / len(ticks) * 1e3:8.3f} ms/plan  ({found}/{len(ticks)} con camino)")
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark de planificadores")
+    p.add_argument("--ticks", type=int, default=200)
+    p.add_argument("--obstacles", type=int, default=10)
+    args = p.parse_args()
+    ticks = list(scenario(args.ticks, args.obstacles))
+    for cs in (3.0, 2.0, 1.0):
+        astar, dstar = AStarPlanner(cs), DStarLitePlanner(cs)
+        print(f"cell_size={cs} ({astar.grid_width}x{astar.grid_height})")
+        run("original", lambda s, g, o: reference_plan(cs, s, g, o), ticks)
+        run("astar", lambda s, g, o: astar.plan(s, g, o), ticks)
+        run("dstar-lite", lambda s, g, o: dstar.plan(s, g, o), ticks)
+
+if __name__ == "__main__": main()
@@ -0,0 +1,116 @@
+import argparse
+import glob
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sim.server import ReplayServer, SimServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEAMS = ("Right", "Left")
+
+
+def launch_teams(n_players, port, runtime, workdir):
+    # run_team.py por equipo (11 como mucho por equipo), con logs y métricas en workdir
+    procs = []
+    for k, team in enumerate(TEAMS):
+        n = min(11, n_players - 11 * k)
+        if n <= 0:
+            break
+        cmd = [sys.executable, os.path.join(ROOT, "run_team.py"), "--conf", os.path.join(ROOT, "conf_file.conf"),
+               "--port", str(port), "--players", str(n), "--team", team, "--runtime", runtime,
+               "--logdir", os.path.join(workdir, "logs"), "--metrics-dir", os.path.join(workdir, "metrics"),
+               "--metrics-interval", "1.0", "--fast-start"]
+        procs.append(subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    return procs
+
+
+def stop_teams(procs):
+    for p in procs:
+        p.send_signal(signal.SIGINT)
+    for p in procs:
+        try:
+            p.wait(timeout=5.0)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+def client_stages(metrics_dir):
+    # Media de las medias por etapa de todos los jugadores (us) a partir de los volcados JSON
+    acc = {}
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        with open(path) as f:
+            snap = json.load(f)
+        for p in snap["players"]:
+            for stage, h in p["stages"].items():
+                if h["count"]:
+                    acc.setdefault(stage, []).append((h["mean_us"], h["p99_us"]))
+    return {s: {"mean_us": sum(m for m, _ in v) / len(v), "p99_us": max(q for _, q in v)} for s, v in acc.items()}
+
+
+def run_udp(args, server):
+    with tempfile.TemporaryDirectory() as workdir:
+        server.start()
+        procs = launch_teams(args.players, server.address[1], args.runtime, workdir)
+        try:
+            if args.mode == "udp":
+                server._thread.join(timeout=args.cycles * 0.1 / max(args.speed, 0.01) + args.players + 30.0)
+            else:
+                server._thread.join()
+            time.sleep(1.2)
+        finally:
+            stop_teams(procs)
+            server.stop()
+        stats = server.stats()
+        stats["client_stages"] = client_stages(os.path.join(workdir, "metrics"))
+    return stats
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark extremo a extremo del equipo contra el simulador local")
+    p.add_argument("--mode", choices=["local", "udp", "replay"], default="local",
+                   help="local: en proceso sin red; udp: run_team.py contra SimServer; replay: flujo grabado")
+    p.add_argument("--players", type=int, default=11, help="Jugadores nuestros (1-22; más de 11 = dos equipos)")
+    p.add_argument("--cycles", type=int, default=300)
+    p.add_argument("--speed", type=float, default=1.0, help="Multiplicador del reloj del simulador (udp)")
+    p.add_argument("--sync", action="store_true", help="Avanza el ciclo en cuanto responden todos (udp)")
+    p.add_argument("--opponents", type=int, default=0, help="Rivales de relleno del simulador")
+    p.add_argument("--runtime", choices=["threads", "asyncio", "processes"], default="threads")
+    p.add_argument("--record", help="Graba lo que recibe el primer jugador (udp) para usarlo con --replay")
+    p.add_argument("--replay", help="Fichero de mensajes a reproducir (modo replay)")
+    p.add_argument("--rate", type=float, default=10.0, help="Ciclos por segundo del replay (0 = sin pausa)")
+    p.add_argument("--json", action="store_true", help="Resultado en JSON")
+    args = p.parse_args()
+    args.players = max(1, min(22, args.players))
+
+    if args.mode == "local":
+        from sim.local import run_local
+        stats, registry = run_local(args.players, args.cycles, os.path.join(ROOT, "conf_file.conf"), args.opponents)
+        players = registry.snapshot()["players"]
+        stats["client_stages"] = {s: {"mean_us": sum(pl["stages"][s]["mean_us"] for pl in players) / len(players),
+                                      "p99_us": max(pl["stages"][s]["p99_us"] or 0 for pl in players)}
+                                  for s in ("parse", "step", "send", "cycle")}
+    elif args.mode == "udp":
+        server = SimServer(port=0, speed=args.speed, sync=args.sync, expected=args.players,
+                           opponents=args.opponents, max_cycles=args.cycles, record=args.record)
+        stats = run_udp(args, server)
+    else:
+        if not args.replay:
+            p.error("--mode replay necesita --replay FICHERO")
+        server = ReplayServer(args.replay, port=0, rate=args.rate, expected=min(args.players, 11))
+        stats = run_udp(args, server)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    stages = stats.pop("client_stages", {})
+    for k, v in stats.items():
+        print(f"{k:>16}: {v:.3f}" if isinstance(v, float) else f"{k:>16}: {v}")
+    for s, v in stages.items():
+        print(f"{'etapa ' + s:>16}: media {v['mean_us']:.1f} us, p99 <= {v['p99_us']} us")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,273 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent.commands import body_turn
+from agent.fsm import AgentFSM
+from agent.inference import InferenceServer, forward_actor
+from agent.logger import read_binary_log
+from agent.metrics import Histogram
+from agent.roles import RoleManager
+from agent.state import PLAYER_DEFAULTS, WorldModel
+from scripts.prepare_dataset import iter_entries
+from training.features import FeatureExtractor
+from training.rewards import RewardCalculator
+
+# Evaluación offline de las estrategias del AgentFSM sobre logs grabados (.jsonl de
+# GameLogger o .glog): cada log se reproduce estado a estado en un WorldModel y, en cada
+# estado de juego, se pide la acción a todas las estrategias. Se compara el comando de
+# cuerpo resultante con el grabado, se puntúa con RewardCalculator y se mide lo que tarda
+# cada decisión. Las redes se evalúan por lotes con las observaciones de todo el log, y
+# los logs se reparten entre los procesos de un pool.
+
+LOG_NAME_RE = re.compile(r"_(?P<unum>\d+)_\d+(?:_\d+)?\.(?:jsonl|glog)$")
+# Modos en los que step no consulta a ninguna estrategia
+IDLE_MODES = ("before_kick_off", "goal_")
+CLASSIC = {
+    "classic": lambda fsm, wm: fsm.strategy_field_player_classic(wm),
+    "goalie": lambda fsm, wm: fsm.strategy_goalie(wm.ball, wm.players_opponents, wm.players_teammates),
+}
+
+
+def body_command(action):
+    # (tipo, parámetros) del comando de cuerpo que enviaría CommandBuffer.set_action
+    kick = action.get("kick")
+    if kick is not None:
+        return "kick", (kick[0], kick[1])
+    turn = body_turn(action)
+    if turn != 0.0:
+        return "turn", (turn,)
+    dash = action.get("dash", 0.0)
+    if dash != 0.0:
+        return "dash", (dash,)
+    return "turn", (0.0,)
+
+
+def angle_diff(a, b):
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+def matches(command, logged, turn_tol, power_tol):
+    kind, args = command
+    if kind != logged[0]:
+        return False
+    ref = logged[1]
+    if kind == "turn":
+        return abs(angle_diff(args[0], ref[0])) <= turn_tol
+    if kind == "dash":
+        return abs(args[0] - ref[0]) <= power_tol
+    return abs(args[0] - ref[0]) <= power_tol and abs(angle_diff(args[1], ref[1])) <= turn_tol
+
+
+class StrategyStats:
+    __slots__ = ("states", "same_command", "agree", "kicks", "reward", "latency")
+
+    def __init__(self):
+        self.states = 0
+        self.same_command = 0
+        self.agree = 0
+        self.kicks = 0
+        self.reward = 0.0
+        self.latency = Histogram()
+
+    def add(self, command, logged, reward, ns, turn_tol, power_tol):
+        self.states += 1
+        self.same_command += command[0] == logged[0]
+        self.agree += matches(command, logged, turn_tol, power_tol)
+        self.kicks += command[0] == "kick"
+        self.reward += reward
+        self.latency.add(ns)
+
+    def merge(self, other):
+        for name in ("states", "same_command", "agree", "kicks", "reward"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.latency.merge(other.latency)
+        return self
+
+    def to_dict(self):
+        n = self.states or 1
+        return {"states": self.states, "command_pct": 100.0 * self.same_command / n,
+                "agree_pct": 100.0 * self.agree / n, "kick_pct": 100.0 * self.kicks / n,
+                "reward_mean": self.reward / n, "reward_total": self.reward, "latency": self.latency.to_dict()}
+
+
+def replay(wm, entry):
+    # Una entrada de log al WorldModel por el mismo camino que un see
+    wm.play_mode = entry.get("play_mode") or "play_on"
+    wm.stamina = entry["stamina"]
+    wm.update_from_see({"time": entry.get("time"), "ball": entry.get("ball"), "goals": entry.get("goals") or [],
+                        "teammates": [{**PLAYER_DEFAULTS, **p} for p in entry.get("teammates") or []],
+                        "opponents": [{**PLAYER_DEFAULTS, **p} for p in entry.get("opponents") or []]})
+
+
+def goal_snapshot(wm):
+    # Lo que lee RewardCalculator, copiado: el WorldModel se reutiliza en el siguiente estado
+    return SimpleNamespace(goals=[dict(g) for g in wm.goals],
+                           last_goal_seen={s: g and dict(g) for s, g in wm.last_goal_seen.items()})
+
+
+def neural_name(path):
+    return f"neural:{os.path.splitext(os.path.basename(path))[0]}"
+
+
+_worker = None
+
+def init_worker(conf, models, strategies, batch_size, turn_tol, power_tol):
+    # Una vez por proceso del pool: roles, pesos (.npy en mmap, compartidos entre procesos)
+    global _worker
+    actors = {}
+    for path in models:
+        actor = InferenceServer.load_actor(path)
+        if actor is None:
+            raise FileNotFoundError(path)
+        actors[neural_name(path)] = actor
+    _worker = SimpleNamespace(role_manager=RoleManager(conf), actors=actors, strategies=strategies,
+                              batch_size=batch_size, turn_tol=turn_tol, power_tol=power_tol, fsms={})
+
+
+def log_unum(path, header=None):
+    if header and header.get("unum"):
+        return int(header["unum"])
+    m = LOG_NAME_RE.search(os.path.basename(path))
+    return int(m.group("unum")) if m else 0
+
+
+def evaluate_log(path):
+    w = _worker
+    tol = (w.turn_tol, w.power_tol)
+    entries = list(iter_entries(path))
+    extractor, header = FeatureExtractor(), None
+    if path.endswith(".glog"):
+        header, records, _ = read_binary_log(path)
+        features, ok = extractor.from_records(records), np.ones(len(entries), dtype=bool)
+    else:
+        features, ok = extractor.from_entries(entries)
+    unum = log_unum(path, header)
+    fsm = w.fsms.get(unum)
+    if fsm is None:
+        fsm = w.fsms[unum] = AgentFSM(unum, w.role_manager, model_path=None)
+    side = 'r' if "Right" in os.path.basename(path) else 'l'
+    rewarder = RewardCalculator(side)
+    wm = WorldModel()
+    wm.self_side = side
+    stats = {name: StrategyStats() for name in ("log", *w.strategies, *w.actors)}
+    rows, states, prev = [], [], None
+
+    for i in np.flatnonzero(ok):
+        entry = entries[i]
+        try:
+            replay(wm, entry)
+        except (KeyError, TypeError, ValueError):
+            continue
+        snap = goal_snapshot(wm)
+        logged = entry.get("action") or {}
+        if not wm.play_mode.startswith(IDLE_MODES):
+            logged_cmd = body_command(logged)
+            stats["log"].add(logged_cmd, logged_cmd, rewarder.calculate(snap, prev, logged) if prev else 0.0,
+                             0, *tol)
+            fsm.current_wm = wm
+            for name in w.strategies:
+                t0 = time.perf_counter_ns()
+                action = CLASSIC[name](fsm, wm)
+                ns = time.perf_counter_ns() - t0
+                fsm.last_strategy = None
+                stats[name].add(body_command(action), logged_cmd,
+                                rewarder.calculate(snap, prev, action) if prev else 0.0, ns, *tol)
+            rows.append(i)
+            states.append((snap, prev, logged_cmd))
+        # El estimador del balón acompaña el giro que hizo de verdad el jugador grabado
+        wm.ball_est.turn(body_turn(logged))
+        prev = snap
+
+    if rows:
+        obs = features[rows]
+        for name, actor in w.actors.items():
+            st = stats[name]
+            for start in range(0, len(rows), w.batch_size):
+                t0 = time.perf_counter_ns()
+                actions = [fsm.decode_action(*out) for out in forward_actor(actor, obs[start:start + w.batch_size]).tolist()]
+                # Latencia por decisión amortizada en el lote (forward + decodificación)
+                ns = (time.perf_counter_ns() - t0) // len(actions)
+                for action, (snap, prev, logged_cmd) in zip(actions, states[start:start + w.batch_size]):
+                    st.add(body_command(action), logged_cmd, rewarder.calculate(snap, prev, action) if prev else 0.0,
+                           ns, *tol)
+    return path, len(rows), stats
+
+
+def evaluate(logs, conf="conf_file.conf", models=(), strategies=tuple(CLASSIC), workers=1, batch_size=4096,
+             turn_tol=15.0, power_tol=20.0):
+    # -> {estrategia: StrategyStats} sumando todos los logs; "log" son las acciones grabadas
+    initargs = (conf, list(models), list(strategies), batch_size, turn_tol, power_tol)
+    # Los logs más grandes primero, para que el último en acabar no sea uno largo
+    logs = sorted(logs, key=os.path.getsize, reverse=True)
+    totals = {}
+    def collect(result):
+        path, n, stats = result
+        for name, st in stats.items():
+            if name in totals:
+                totals[name].merge(st)
+            else:
+                totals[name] = st
+    if workers <= 1:
+        init_worker(*initargs)
+        for path in logs:
+            collect(evaluate_log(path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as pool:
+            for fut in as_completed([pool.submit(evaluate_log, path) for path in logs]):
+                collect(fut.result())
+    return totals
+
+
+def print_table(totals):
+    print(f"{'estrategia':<24} {'estados':>9} {'comando%':>8} {'acuerdo%':>8} {'chut%':>6} {'recompensa':>10} "
+          f"{'media_us':>9} {'p50_us':>7} {'p99_us':>7}")
+    for name, st in totals.items():
+        d = st.to_dict()
+        lat = d["latency"]
+        timing = f"{'-':>9} {'-':>7} {'-':>7}" if name == "log" else \
+            f"{lat['mean_us']:>9.1f} {lat['p50_us'] or 0:>7.0f} {lat['p99_us'] or 0:>7.0f}"
+        print(f"{name:<24} {d['states']:>9} {d['command_pct']:>8.1f} {d['agree_pct']:>8.1f} {d['kick_pct']:>6.1f} "
+              f"{d['reward_mean']:>10.4f} {timing}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Evaluación offline de las estrategias del AgentFSM sobre logs grabados")
+    p.add_argument("logs", nargs="*", help="Logs .jsonl/.glog (por defecto, todos los de --logdir)")
+    p.add_argument("--logdir", default="logs")
+    p.add_argument("--conf", default="conf_file.conf")
+    p.add_argument("--model", action="append", default=[], help="Pesos .npy/.pth a evaluar como estrategia neural (repetible)")
+    p.add_argument("--strategies", default="classic,goalie", help="Estrategias clásicas a evaluar (classic, goalie)")
+    p.add_argument("--batch-size", type=int, default=4096, help="Observaciones por forward de la red")
+    p.add_argument("--turn-tol", type=float, default=15.0, help="Grados de diferencia que aún cuentan como acuerdo")
+    p.add_argument("--power-tol", type=float, default=20.0, help="Potencia de diferencia que aún cuenta como acuerdo")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos del pool")
+    p.add_argument("--output", help="Resultados en JSON")
+    args = p.parse_args()
+    logs = args.logs or sorted(glob.glob(os.path.join(args.logdir, "*.jsonl")) + glob.glob(os.path.join(args.logdir, "*.glog")))
+    strategies = [s for s in args.strategies.split(",") if s]
+    unknown = [s for s in strategies if s not in CLASSIC]
+    if unknown:
+        p.error(f"Estrategias desconocidas: {', '.join(unknown)}")
+    if not logs:
+        p.error("No hay logs que evaluar")
+    t0 = time.perf_counter()
+    totals = evaluate(logs, args.conf, args.model, strategies, args.workers, args.batch_size, args.turn_tol, args.power_tol)
+    dt = time.perf_counter() - t0
+    states = totals["log"].states if "log" in totals else 0
+    print(f"{len(logs)} logs, {states} estados de juego en {dt:.1f} s ({states / dt:.0f} estados/s)")
+    print_table(totals)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({name: st.to_dict() for name, st in totals.items()}, f, indent=1)
+
+if __name__ == "__main__": main()
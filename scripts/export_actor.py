@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import torch
+from training.models import export_actor_numpy, load_actor
+from training.numpy_actor import NumpyActor
+
+def check(actor, np_actor, n=1024, seed=0):
+    obs = np.random.default_rng(seed).uniform(-1, 1, (n, np_actor.obs_size)).astype(np.float32)
+    with torch.no_grad():
+        ref = torch.cat(actor(torch.from_numpy(obs)), dim=1).numpy()
+    batch = np_actor.forward_batch(obs)
+    single = np.array([np_actor(o) for o in obs[:64]])
+    return float(np.abs(batch - ref).max()), float(np.abs(single - ref[:64]).max())
+
+def bench(fn, obs, rounds=2000):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(obs)
+    return (time.perf_counter() - t0) / rounds * 1e6
+
+def main():
+    p = argparse.ArgumentParser(description="Exporta los pesos del Actor a un .npy plano para NumpyActor")
+    p.add_argument("--model", default="models/actor_v1.pth")
+    p.add_argument("--out", default=None, help="Por defecto, el mismo nombre con extensión .npy")
+    p.add_argument("--tol", type=float, default=1e-5)
+    args = p.parse_args()
+    out = args.out or os.path.splitext(args.model)[0] + ".npy"
+
+    # obs_size y hidden se leen del propio .pth (fc1)
+    actor = load_actor(args.model)
+    obs_size = actor.fc1.in_features
+    flat = export_actor_numpy(actor, out)
+    np_actor = NumpyActor.load(out, obs_size)
+    print(f"{out}: {flat.size} parámetros, obs {obs_size}, hidden {np_actor.hidden} ({flat.nbytes / 1024:.1f} KiB)")
+
+    err_batch, err_single = check(actor, np_actor)
+    print(f"Diferencia máx. con torch: batch {err_batch:.2e}, individual {err_single:.2e}")
+    if max(err_batch, err_single) > args.tol:
+        print(f"ERROR: la exportación difiere de torch más de {args.tol}")
+        sys.exit(1)
+
+    obs = np.zeros(obs_size, dtype=np.float32)
+    def torch_tick(o):
+        with torch.no_grad():
+            return [h.item() for h in actor(torch.FloatTensor(o).unsqueeze(0))]
+    print(f"Latencia por tick: torch {bench(torch_tick, obs):.1f} us, numpy {bench(np_actor, obs):.1f} us")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,15 @@
+import argparse
+import glob
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent.logger import export_jsonl
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta logs binarios (.glog) a JSONL")
+    parser.add_argument("--logdir", default="logs")
+    args = parser.parse_args()
+    for f in sorted(glob.glob(os.path.join(args.logdir, "*.glog"))):
+        print(f"Exportado {export_jsonl(f)}")
+
+if __name__ == "__main__": main()
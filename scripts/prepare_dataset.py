@@ -2,48 +2,179 @@ import json
 import numpy as np
 import argparse
 import glob
+import hashlib
 import os
+import shutil
 import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from training.features import FeatureExtractor
-from training.rewards import RewardCalculator
-from agent.state import WorldModel
+from training.rewards import GAMMA, N_STEP, RewardCalculator, advantages, episode_ends, nstep_returns
+from agent.logger import iter_log_entries, read_binary_log
 
-def process_log(filepath):
+def iter_entries(filepath):
+    if filepath.endswith(".glog"):
+        yield from iter_log_entries(filepath)
+        return
+    with open(filepath, 'r') as f:
+        for line in f:
+            try: yield json.loads(line)
+            except ValueError: continue
+
+def process_log(filepath, gamma=GAMMA, n_step=N_STEP):
     print(f"Procesando {filepath}...")
     team_side = 'r' if "Right" in os.path.basename(filepath) else 'l'
     extractor, rewarder = FeatureExtractor(), RewardCalculator(team_side)
-    observations, actions, rewards, prev_wm = [], [], [], None
-    
-    with open(filepath, 'r') as f:
-        for line in f:
+    # Observaciones, acciones y recompensas de todo el log de una vez; los .glog ya traen los arrays tal cual
+    if filepath.endswith(".glog"):
+        records = read_binary_log(filepath)[1]
+        features = extractor.from_records(records)
+        kick = records["kick"].astype(bool)
+        actions = records["action"].astype(np.float64)
+        actions[~kick, 2:] = 0.0
+        goal_dist, modes = rewarder.goal_dists(records), records["play_mode"]
+    else:
+        entries = list(iter_entries(filepath))
+        features, ok = extractor.from_entries(entries)
+        rows, actions, kick, goal_dist, modes = [], [], [], [], []
+        for i in np.flatnonzero(ok):
+            data = entries[i]
             try:
-                data = json.loads(line)
-                wm = WorldModel()
-                wm.time, wm.stamina, wm.play_mode, wm.ball = data.get("time"), data.get("stamina"), data.get("play_mode"), data.get("ball")
-                
-                obs = extractor.get_observation(wm)
                 act = data.get("action", {})
                 act_vec = [act.get("dash", 0.0), act.get("turn", 0.0), 0.0, 0.0]
                 if act.get("kick"): act_vec[2], act_vec[3] = act["kick"]
-                
-                rew = rewarder.calculate(wm, prev_wm, act) if prev_wm else 0.0
-                observations.append(obs); actions.append(act_vec); rewards.append(rew)
-                prev_wm = wm
-            except: continue
-    return np.array(observations), np.array(actions), np.array(rewards)
+                dist = rewarder.goal_dist(data.get("goals", []))
+            except (AttributeError, KeyError, TypeError, ValueError): continue
+            rows.append(i); actions.append(act_vec); kick.append(bool(act.get("kick")))
+            goal_dist.append(dist); modes.append(data.get("play_mode"))
+        features, actions = features[rows], np.array(actions, dtype=np.float64).reshape(-1, 4)
+        kick, goal_dist = np.array(kick, dtype=bool), np.array(goal_dist, dtype=np.float64)
+        modes = np.array(modes, dtype=object)
+    rewards = rewarder.calculate_batch(goal_dist, actions[:, 0], kick)
+    # Retornos n-step y ventajas por tramo de juego (sin cruzar cambios de modo ni el final del log)
+    dones = episode_ends(modes)
+    returns = nstep_returns(rewarder.step_rewards(goal_dist, actions[:, 0], kick, dones), dones, gamma, n_step)
+    return features, actions, rewards, returns, advantages(returns)
+
+ARRAYS = ("obs", "actions", "rewards", "returns", "advantages")
+MANIFEST = "manifest.json"
+
+def file_hash(filepath, chunk=1 << 20):
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def shard_name(filepath, digest):
+    # Nombre del log + hash de su ruta + hash del contenido: dos logs idénticos en rutas
+    # distintas no comparten (ni se pisan) el shard
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return f"{stem}-{hashlib.sha1(filepath.encode()).hexdigest()[:8]}-{digest[:12]}"
+
+def build_shard(filepath, digest, shard_dir, gamma=GAMMA, n_step=N_STEP):
+    # Se ejecuta en un proceso del pool: un shard por log, .npy sin comprimir
+    arrays = dict(zip(ARRAYS, process_log(filepath, gamma, n_step)))
+    shard = os.path.join(shard_dir, shard_name(filepath, digest))
+    os.makedirs(shard, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(shard, f"{name}.npy"), np.asarray(arr, dtype=np.float32))
+    return filepath, digest, os.path.basename(shard), len(arrays["obs"])
+
+def load_manifest(shard_dir):
+    path = os.path.join(shard_dir, MANIFEST)
+    if not os.path.exists(path): return {}
+    with open(path) as f: return json.load(f)
+
+def save_manifest(shard_dir, manifest):
+    tmp = os.path.join(shard_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f: json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(shard_dir, MANIFEST))
+
+def shard_complete(shard_dir, entry, returns):
+    # Mismo log, mismos parámetros de retorno y todos los arrays (los shards de antes no traen returns)
+    shard = os.path.join(shard_dir, entry["shard"])
+    return entry.get("returns") == returns and all(os.path.exists(os.path.join(shard, f"{name}.npy")) for name in ARRAYS)
+
+def update_shards(logs, shard_dir, workers, gamma=GAMMA, n_step=N_STEP):
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = load_manifest(shard_dir)
+    returns = [gamma, n_step]
+    pending, failed = [], {}
+    for f in logs:
+        try:
+            digest = file_hash(f)
+        except OSError as e:
+            failed[f] = e
+            continue
+        entry = manifest.get(f)
+        if entry and entry["sha1"] == digest and shard_complete(shard_dir, entry, returns):
+            continue
+        pending.append((f, digest))
+    print(f"{len(logs)} logs, {len(pending)} nuevos o modificados")
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_shard, f, digest, shard_dir, gamma, n_step): f for f, digest in pending}
+            for fut in as_completed(futures):
+                # Un log roto no tumba al resto: se anota y se sigue con el manifiesto parcial
+                try:
+                    f, digest, shard, rows = fut.result()
+                except Exception as e:
+                    failed[futures[fut]] = e
+                    continue
+                manifest[f] = {"sha1": digest, "shard": shard, "rows": rows, "returns": returns}
+                save_manifest(shard_dir, manifest)
+    # Logs borrados o que han fallado (su shard anterior ya no corresponde al fichero): se
+    # quitan del manifiesto y se limpian sus shards
+    current = set(logs)
+    for f in [f for f in manifest if f not in current or f in failed]:
+        del manifest[f]
+    live = {e["shard"] for e in manifest.values()}
+    for name in os.listdir(shard_dir):
+        if os.path.isdir(os.path.join(shard_dir, name)) and name not in live:
+            shutil.rmtree(os.path.join(shard_dir, name))
+    save_manifest(shard_dir, manifest)
+    for f, e in sorted(failed.items()):
+        print(f"ERROR procesando {f}: {type(e).__name__}: {e}")
+    if failed:
+        print(f"{len(failed)} de {len(logs)} logs con errores; el dataset se genera sin ellos")
+    return manifest, failed
+
+def merge_shards(shard_dir, manifest, output, chunk_rows=65536):
+    # Escribe el .npz final shard a shard: cada array se vuelca directamente en su
+    # entrada del zip con una cabecera .npy del tamaño total, sin cargar todo en memoria.
+    entries = [e for _, e in sorted(manifest.items()) if e["rows"]]
+    total = sum(e["rows"] for e in entries)
+    if not total: return 0
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for name in ARRAYS:
+            first = np.load(os.path.join(shard_dir, entries[0]["shard"], f"{name}.npy"), mmap_mode="r")
+            header = {"descr": np.lib.format.dtype_to_descr(first.dtype), "fortran_order": False,
+                      "shape": (total,) + first.shape[1:]}
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as out:
+                np.lib.format.write_array_header_2_0(out, header)
+                for e in entries:
+                    arr = np.load(os.path.join(shard_dir, e["shard"], f"{name}.npy"), mmap_mode="r")
+                    for i in range(0, len(arr), chunk_rows):
+                        out.write(np.ascontiguousarray(arr[i:i + chunk_rows]).tobytes())
+    return total
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--logdir", default="logs")
     parser.add_argument("--output", default="training_data.npz")
+    parser.add_argument("--shard-dir", default="dataset_shards", help="Shards por log + manifiesto de hashes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos del pool")
+    parser.add_argument("--no-merge", action="store_true", help="Solo actualizar shards, sin generar el .npz")
+    parser.add_argument("--gamma", type=float, default=GAMMA, help="Descuento de los retornos n-step")
+    parser.add_argument("--n-step", type=int, default=N_STEP, help="Horizonte de los retornos (estados)")
     args = parser.parse_args()
-    all_obs, all_acts, all_rews = [], [], []
-    for f in glob.glob(os.path.join(args.logdir, "*.jsonl")):
-        o, a, r = process_log(f)
-        if len(o): all_obs.append(o); all_acts.append(a); all_rews.append(r)
-    if all_obs:
-        np.savez_compressed(args.output, obs=np.concatenate(all_obs), actions=np.concatenate(all_acts), rewards=np.concatenate(all_rews))
-        print(f"Dataset generado en {args.output}")
-
-if __name__ == "__main__": main()
\ No newline at end of file
+    logs = sorted(glob.glob(os.path.join(args.logdir, "*.jsonl")) + glob.glob(os.path.join(args.logdir, "*.glog")))
+    manifest, failed = update_shards(logs, args.shard_dir, args.workers, args.gamma, args.n_step)
+    if not args.no_merge:
+        rows = merge_shards(args.shard_dir, manifest, args.output)
+        if rows: print(f"Dataset generado en {args.output} ({rows} muestras)")
+    if failed: sys.exit(1)
+
+if __name__ == "__main__": main()
@@ -0,0 +1,4 @@
+from sim.world import World, SimPlayer
+from sim.server import SimServer, ReplayServer
+
+__all__ = ["World", "SimPlayer", "SimServer", "ReplayServer"]
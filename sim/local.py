@@ -0,0 +1,71 @@
+import time
+
+from agent.agent import Player
+from agent.commands import CommandBuffer, body_turn
+from agent.metrics import MetricsRegistry
+from agent.roles import RoleManager
+from sim.world import World
+
+# Del jugador 12 en adelante juegan en un segundo equipo, en el lado derecho
+TEAMS = (("Right", "l"), ("Left", "r"))
+
+
+def run_local(n_players=11, cycles=300, conf_file="conf_file.conf", opponents=0, inference=None):
+    """Partido en el mismo proceso, sin sockets ni reloj: World -> Player.handle_message
+    -> AgentFSM.step -> CommandBuffer -> World, tan rápido como dé la CPU. Devuelve las
+    estadísticas del partido y el MetricsRegistry con las latencias por etapa."""
+    now = time.perf_counter_ns
+    world = World()
+    roles = RoleManager(conf_file)
+    registry = MetricsRegistry("local")
+    agents = []
+    for i in range(n_players):
+        team, side = TEAMS[i // 11]
+        sp = world.add_player(side, team)
+        player = Player(side, sp.unum, roles, inference=inference, team_name=team)
+        player.world_model.self_role = roles.get_role(sp.unum)
+        x, y = roles.get_initial_position(sp.unum)
+        world.command(sp, b"(move %.2f %.2f)" % (x, y))
+        m = registry.player(i + 1)
+        m.unum = sp.unum
+        player.fsm.metrics = m
+        agents.append((sp, player, CommandBuffer(), m))
+    if opponents and n_players <= 11:
+        for _ in range(opponents):
+            world.add_player("r", "Sparring", auto=True)
+    world.step()
+    world.kick_off()
+
+    decisions = 0
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        heard = [world.hear(mode) for mode in world.heard]
+        world.heard.clear()
+        for sp, player, commands, m in agents:
+            see = world.wants_see(sp)
+            msgs = heard + [world.sense_body(sp)]
+            if see:
+                msgs.append(world.see(sp))
+            t_cycle = now()
+            for data in msgs:
+                t = now()
+                player.handle_message(data)
+                m.add("parse", now() - t)
+            if not see:
+                continue
+            t = now()
+            action = player.fsm.step(player.world_model)
+            t1 = now()
+            commands.set_action(action)
+            world.command(sp, bytes(commands.build()))
+            player.world_model.ball_est.turn(body_turn(action, commands.min_turn))
+            t2 = now()
+            m.add("step", t1 - t)
+            m.add("send", t2 - t1)
+            m.decision(world.time, t2 - t_cycle)
+            decisions += 1
+        world.step()
+    elapsed = time.perf_counter() - t0
+    stats = {"players": n_players, "cycles": cycles, "elapsed_s": elapsed, "cycles_per_s": cycles / elapsed,
+             "decisions_per_s": decisions / elapsed, "score": dict(world.score), "play_mode": world.play_mode}
+    return stats, registry
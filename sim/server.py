@@ -0,0 +1,285 @@
+import re
+import socket
+import threading
+import time
+from collections import deque
+
+from sim.world import World
+
+INIT_RE = re.compile(rb'\((init|reconnect)\s+([^\s()]+)(?:\s+(\d+))?')
+TIME_RE = re.compile(rb'^\((?:see|sense_body|hear)\s+(\d+)')
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class _UdpStage:
+    # Socket, clientes y latencia see -> comando comunes al simulador y al replay
+    def __init__(self, host, port, keep=4096):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind((host, port))
+        self.address = self.sock.getsockname()
+        self.clients = {}
+        self.sent_at = {}
+        self.latency = deque(maxlen=keep)
+        self.commands = 0
+        self.cycles = 0
+        self.t_start = self.t_end = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def send(self, data, addr):
+        try:
+            self.sock.sendto(data, addr)
+        except OSError:
+            pass
+
+    def sent_see(self, addr):
+        self.sent_at[addr] = time.perf_counter_ns()
+
+    def got_command(self, addr):
+        # Latencia del primer comando tras cada see enviado a ese cliente
+        self.commands += 1
+        t = self.sent_at.pop(addr, None)
+        if t is not None:
+            self.latency.append(time.perf_counter_ns() - t)
+
+    def poll(self, until):
+        # Atiende datagramas hasta until (perf_counter) o hasta que ready() diga que basta
+        buf = bytearray(8192)
+        while not self._stop.is_set():
+            left = until - time.perf_counter()
+            if left <= 0 or self.ready():
+                return
+            self.sock.settimeout(left)
+            try:
+                n, addr = self.sock.recvfrom_into(buf)
+            except socket.timeout:
+                return
+            except OSError:
+                return
+            self.handle(bytes(buf[:n]), addr)
+
+    def ready(self):
+        return False
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.sock.close()
+
+    def stats(self):
+        elapsed = (self.t_end or time.perf_counter()) - self.t_start if self.t_start else 0.0
+        lat = [v / 1e6 for v in self.latency]
+        return {"cycles": self.cycles, "elapsed_s": elapsed, "cycles_per_s": self.cycles / elapsed if elapsed else 0.0,
+                "clients": len(self.clients), "commands": self.commands,
+                "latency_ms_p50": percentile(lat, 0.5), "latency_ms_p99": percentile(lat, 0.99),
+                "latency_ms_max": max(lat) if lat else None}
+
+
+class SimServer(_UdpStage):
+    """Sustituto local de rcssserver sobre UDP: init/reconnect/bye, comandos de cuerpo y
+    see/sense_body/hear generados por sim.world.World.
+
+    speed multiplica la velocidad del reloj (2.0 = ciclos de 50 ms). Con sync el ciclo
+    avanza en cuanto todos los clientes que recibieron see han respondido (como
+    synch_mode), y el ciclo nominal queda como plazo máximo (50 ms si speed <= 0). opponents añade rivales de relleno que juegan
+    solos en el lado libre. record guarda lo que recibe el primer cliente, un mensaje por
+    línea, para reproducirlo con ReplayServer."""
+
+    def __init__(self, host="127.0.0.1", port=6000, cycle=0.1, speed=1.0, sync=False, expected=None,
+                 opponents=0, max_cycles=None, start_timeout=2.0, record=None):
+        super().__init__(host, port)
+        self.world = World()
+        self.cycle = cycle / speed if speed > 0 else 0.0
+        self.sync = sync
+        self.expected = expected
+        self.opponents = opponents
+        self.max_cycles = max_cycles
+        self.start_timeout = start_timeout
+        self.sides = {}
+        self.first_connect = None
+        self.record = open(record, "wb") if record else None
+        self.recorded = None
+
+    def handle(self, data, addr):
+        m = INIT_RE.match(data)
+        if m:
+            self._connect(m.group(1), m.group(2), m.group(3), addr)
+            return
+        p = self.clients.get(addr)
+        if p is None:
+            return
+        if data.startswith(b"(bye"):
+            del self.clients[addr]
+            self.sent_at.pop(addr, None)
+            return
+        self.world.command(p, data)
+        self.got_command(addr)
+
+    def _connect(self, kind, team, unum, addr):
+        world = self.world
+        side = self.sides.get(team)
+        if side is None:
+            if len(self.sides) >= 2:
+                self.send(b"(error no_more_team_or_player_or_goalie)", addr)
+                return
+            side = self.sides[team] = "l" if "l" not in self.sides.values() else "r"
+        if kind == b"reconnect" and unum:
+            p = next((q for q in world.players if q.side == side and q.unum == int(unum)), None)
+            if p is None:
+                self.send(b"(error reconnect)", addr)
+                return
+            self.clients = {a: q for a, q in self.clients.items() if q is not p}
+            self.clients[addr] = p
+            self.send(b"(reconnect %s %s)" % (side.encode(), world.play_mode.encode()), addr)
+            return
+        if sum(1 for q in world.players if q.side == side) >= 11:
+            self.send(b"(error no_more_team_or_player_or_goalie)", addr)
+            return
+        p = world.add_player(side, team)
+        self.clients[addr] = p
+        if self.first_connect is None:
+            self.first_connect = time.perf_counter()
+        if self.record and self.recorded is None:
+            self.recorded = addr
+        self.send(b"(init %s %d %s)" % (side.encode(), p.unum, world.play_mode.encode()), addr)
+
+    def ready(self):
+        # synch_mode: todos los que recibieron see en el último ciclo ya han respondido
+        return self.sync and self.cycles > 0 and not self.sent_at
+
+    def _maybe_kick_off(self):
+        world = self.world
+        if world.play_mode != "before_kick_off" or self.first_connect is None:
+            return
+        if self.expected and len(self.clients) < self.expected:
+            if time.perf_counter() - self.first_connect < self.start_timeout:
+                return
+        if self.opponents:
+            free = "r" if "l" in self.sides.values() else "l"
+            for _ in range(self.opponents):
+                world.add_player(free, "Sparring", auto=True)
+        world.kick_off()
+
+    def step(self):
+        world = self.world
+        self._maybe_kick_off()
+        world.step()
+        heard = [world.hear(mode) for mode in world.heard]
+        world.heard.clear()
+        for addr, p in self.clients.items():
+            msgs = heard + [world.sense_body(p)]
+            if world.wants_see(p):
+                msgs.append(world.see(p))
+            for data in msgs:
+                self.send(data, addr)
+                if addr == self.recorded:
+                    self.record.write(data + b"\n")
+            if data.startswith(b"(see"):
+                self.sent_see(addr)
+        self.cycles += 1
+
+    def run(self):
+        next_step = time.perf_counter() + self.cycle
+        while not self._stop.is_set():
+            self.poll(next_step if self.cycle else time.perf_counter() + 0.05)
+            if self._stop.is_set():
+                break
+            if not self.clients:
+                next_step = time.perf_counter() + self.cycle
+                continue
+            if self.t_start is None:
+                self.t_start = time.perf_counter()
+            self.step()
+            if self.max_cycles and self.cycles >= self.max_cycles:
+                break
+            next_step = max(next_step + self.cycle, time.perf_counter()) if self.cycle else 0.0
+        self.t_end = time.perf_counter()
+        if self.record:
+            self.record.close()
+
+    def stats(self):
+        st = super().stats()
+        st.update(time=self.world.time, play_mode=self.world.play_mode, score=dict(self.world.score))
+        return st
+
+
+class ReplayServer(_UdpStage):
+    """Reproduce un flujo de mensajes grabado (un mensaje por línea, p.ej. el record de
+    SimServer) a todos los clientes conectados, agrupado por ciclo de servidor, a rate
+    ciclos por segundo (0 = tan rápido como se pueda enviar). Responde a init/reconnect
+    y cuenta los comandos y su latencia como SimServer."""
+
+    def __init__(self, path, host="127.0.0.1", port=6000, rate=10.0, expected=1, loops=1, start_timeout=2.0):
+        super().__init__(host, port)
+        self.groups = self.load(path)
+        self.rate = rate
+        self.expected = expected
+        self.loops = loops
+        self.start_timeout = start_timeout
+
+    @staticmethod
+    def load(path):
+        groups, last = [], None
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.rstrip(b"\r\n")
+                if not line:
+                    continue
+                m = TIME_RE.match(line)
+                t = int(m.group(1)) if m else last
+                if not groups or t != last:
+                    groups.append([])
+                    last = t
+                groups[-1].append(line)
+        return groups
+
+    def handle(self, data, addr):
+        m = INIT_RE.match(data)
+        if m:
+            if addr not in self.clients:
+                self.clients[addr] = len(self.clients) + 1
+            unum = int(m.group(3)) if m.group(1) == b"reconnect" and m.group(3) else self.clients[addr]
+            if m.group(1) == b"reconnect":
+                self.send(b"(reconnect r play_on)", addr)
+            else:
+                self.send(b"(init r %d play_on)" % unum, addr)
+        elif addr in self.clients:
+            self.got_command(addr)
+
+    def run(self):
+        t0 = time.perf_counter()
+        while len(self.clients) < self.expected and time.perf_counter() - t0 < self.start_timeout:
+            self.poll(time.perf_counter() + 0.05)
+        # Margen para que los clientes terminen su colocación inicial
+        self.poll(time.perf_counter() + 0.6)
+        period = 1.0 / self.rate if self.rate > 0 else 0.0
+        self.t_start = time.perf_counter()
+        next_step = self.t_start
+        for _ in range(self.loops):
+            for group in self.groups:
+                if self._stop.is_set():
+                    return
+                for addr in self.clients:
+                    for data in group:
+                        self.send(data, addr)
+                    if any(d.startswith(b"(see") for d in group):
+                        self.sent_see(addr)
+                self.cycles += 1
+                next_step += period
+                self.poll(next_step)
+        self.t_end = time.perf_counter()
+        # Últimas respuestas
+        self.poll(self.t_end + 0.3)
@@ -0,0 +1,260 @@
+import math
+import re
+
+# Subconjunto de server.conf de rcssserver que usa la física simplificada
+PITCH_HALF_LENGTH = 52.5
+PITCH_HALF_WIDTH = 34.0
+GOAL_HALF_WIDTH = 7.01
+BALL_DECAY = 0.94
+BALL_SPEED_MAX = 3.0
+PLAYER_DECAY = 0.4
+PLAYER_SPEED_MAX = 1.05
+DASH_POWER_RATE = 0.006
+KICK_POWER_RATE = 0.027
+INERTIA_MOMENT = 5.0
+KICKABLE_AREA = 1.085     # kickable_margin + player_size + ball_size
+STAMINA_MAX = 8000.0
+STAMINA_INC = 45.0
+VIEW_HALF_ANGLE = 45.0    # view_width normal
+UNUM_FAR = 20.0           # más lejos no se ve el dorsal
+TEAM_FAR = 40.0           # ni el equipo
+GOAL_PAUSE = 30           # ciclos entre un gol y la reanudación
+OUT_PAUSE = 5             # y tras un balón fuera
+
+FLAGS = {
+    b"f c": (0.0, 0.0), b"f c t": (0.0, -34.0), b"f c b": (0.0, 34.0),
+    b"f l t": (-52.5, -34.0), b"f l b": (-52.5, 34.0), b"f r t": (52.5, -34.0), b"f r b": (52.5, 34.0),
+    b"f p l c": (-36.0, 0.0), b"f p r c": (36.0, 0.0), b"f g l t": (-52.5, -7.01),
+    b"f g l b": (-52.5, 7.01), b"f g r t": (52.5, -7.01), b"f g r b": (52.5, 7.01),
+}
+GOALS = {b"g l": (-PITCH_HALF_LENGTH, 0.0), b"g r": (PITCH_HALF_LENGTH, 0.0)}
+
+COMMAND_RE = re.compile(rb'\((dash|turn|kick|move|catch|tackle|turn_neck|say|change_view|bye)\s*([^()]*)\)')
+BODY = {b"dash", b"turn", b"kick", b"move", b"catch", b"tackle"}
+RAD2DEG = 180.0 / math.pi
+DEG2RAD = math.pi / 180.0
+
+
+def norm_angle(deg):
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+class SimPlayer:
+    __slots__ = ("side", "unum", "team", "goalie", "x", "y", "vx", "vy", "body", "stamina", "cmd",
+                 "counts", "auto", "home", "view_ms")
+
+    def __init__(self, side, unum, team, x=0.0, y=0.0, auto=False):
+        self.side = side
+        self.unum = unum
+        self.team = team.encode() if isinstance(team, str) else team
+        self.goalie = unum == 1
+        self.x, self.y = x, y
+        self.vx = self.vy = 0.0
+        self.body = 0.0 if side == "l" else 180.0
+        self.stamina = STAMINA_MAX
+        self.cmd = None
+        self.counts = {b"kick": 0, b"dash": 0, b"turn": 0, b"move": 0}
+        self.auto = auto
+        self.home = (x, y)
+        self.view_ms = 0
+
+
+class World:
+    """Campo de rcssserver reducido: balón y jugadores con la física básica (dash, turn,
+    kick, move, rozamiento, stamina) y generación de los mensajes see/sense_body/hear
+    con el formato del protocolo v7+. Todo en coordenadas del lado izquierdo, como el
+    servidor; los move del equipo derecho se reflejan."""
+
+    def __init__(self, see_ms=150, step_ms=100):
+        self.time = 0
+        self.play_mode = "before_kick_off"
+        self.players = []
+        self.bx = self.by = self.bvx = self.bvy = 0.0
+        self.score = {"l": 0, "r": 0}
+        self.see_ms = see_ms
+        self.step_ms = step_ms
+        self.resume_at = None
+        self.heard = []
+
+    def add_player(self, side, team, unum=None, auto=False):
+        unum = unum or 1 + sum(1 for p in self.players if p.side == side)
+        p = SimPlayer(side, unum, team, auto=auto)
+        # Colocación por defecto en la propia mitad, hasta que llegue un move
+        sign = -1.0 if side == "l" else 1.0
+        p.x, p.y = sign * (5.0 + 4.0 * (unum % 6)), -25.0 + 5.0 * unum
+        p.home = (p.x, p.y)
+        self.players.append(p)
+        return p
+
+    def set_play_mode(self, mode):
+        self.play_mode = mode
+        self.heard.append(mode)
+
+    def kick_off(self):
+        self.set_play_mode("play_on")
+
+    # --- comandos ---
+
+    def command(self, player, data):
+        # Un datagrama puede traer varios comandos; solo el primero de cuerpo cuenta
+        for name, args in COMMAND_RE.findall(data):
+            if name in BODY and player.cmd is None:
+                try:
+                    player.cmd = (name, [float(a) for a in args.split()])
+                except ValueError:
+                    continue
+
+    def _apply(self, p):
+        name, args = p.cmd
+        p.cmd = None
+        if name in p.counts:
+            p.counts[name] += 1
+        if name == b"dash" and args:
+            power = max(-100.0, min(100.0, args[0]))
+            power = max(-p.stamina, min(p.stamina, power))
+            p.stamina -= abs(power)
+            a = p.body * DEG2RAD
+            p.vx += power * DASH_POWER_RATE * math.cos(a)
+            p.vy += power * DASH_POWER_RATE * math.sin(a)
+        elif name == b"turn" and args:
+            moment = max(-180.0, min(180.0, args[0]))
+            p.body = norm_angle(p.body + moment / (1.0 + INERTIA_MOMENT * math.hypot(p.vx, p.vy)))
+        elif name == b"kick" and len(args) >= 2:
+            dx, dy = self.bx - p.x, self.by - p.y
+            dist = math.hypot(dx, dy)
+            if dist > KICKABLE_AREA:
+                return
+            dir_diff = abs(norm_angle(math.atan2(dy, dx) * RAD2DEG - p.body))
+            eff = 1.0 - 0.25 * dir_diff / 180.0 - 0.25 * max(dist - 0.385, 0.0) / 0.7
+            power = max(0.0, min(100.0, args[0])) * KICK_POWER_RATE * eff
+            a = (p.body + max(-180.0, min(180.0, args[1]))) * DEG2RAD
+            self.bvx += power * math.cos(a)
+            self.bvy += power * math.sin(a)
+            speed = math.hypot(self.bvx, self.bvy)
+            if speed > BALL_SPEED_MAX:
+                self.bvx *= BALL_SPEED_MAX / speed
+                self.bvy *= BALL_SPEED_MAX / speed
+        elif name == b"move" and len(args) >= 2 and self.play_mode != "play_on":
+            x, y = args[0], args[1]
+            p.x, p.y = (x, y) if p.side == "l" else (-x, -y)
+            p.vx = p.vy = 0.0
+
+    def _auto(self, p, chaser):
+        # Rival de relleno: el más cercano al balón va a por él y chuta hacia la portería
+        # contraria; el resto vuelve a su sitio
+        tx, ty = (self.bx, self.by) if p is chaser else p.home
+        dx, dy = tx - p.x, ty - p.y
+        dist = math.hypot(dx, dy)
+        if p is chaser and math.hypot(self.bx - p.x, self.by - p.y) <= KICKABLE_AREA:
+            gx = PITCH_HALF_LENGTH if p.side == "l" else -PITCH_HALF_LENGTH
+            goal_dir = norm_angle(math.atan2(-self.by, gx - self.bx) * RAD2DEG - p.body)
+            p.cmd = (b"kick", [80.0, goal_dir])
+        elif dist < 1.0:
+            p.cmd = None
+        else:
+            turn = norm_angle(math.atan2(dy, dx) * RAD2DEG - p.body)
+            p.cmd = (b"turn", [turn]) if abs(turn) > 10.0 else (b"dash", [min(100.0, 30.0 * dist)])
+
+    # --- ciclo ---
+
+    def step(self):
+        if self.play_mode == "play_on":
+            autos = [p for p in self.players if p.auto]
+            if autos:
+                for side in ("l", "r"):
+                    mine = [p for p in autos if p.side == side]
+                    if mine:
+                        chaser = min(mine, key=lambda p: (p.x - self.bx) ** 2 + (p.y - self.by) ** 2)
+                        for p in mine:
+                            self._auto(p, chaser)
+        for p in self.players:
+            if p.cmd is not None:
+                self._apply(p)
+            speed = math.hypot(p.vx, p.vy)
+            if speed > PLAYER_SPEED_MAX:
+                p.vx *= PLAYER_SPEED_MAX / speed
+                p.vy *= PLAYER_SPEED_MAX / speed
+            p.x += p.vx
+            p.y += p.vy
+            p.vx *= PLAYER_DECAY
+            p.vy *= PLAYER_DECAY
+            p.stamina = min(STAMINA_MAX, p.stamina + STAMINA_INC)
+        self.bx += self.bvx
+        self.by += self.bvy
+        self.bvx *= BALL_DECAY
+        self.bvy *= BALL_DECAY
+        self._referee()
+        self.time += 1
+
+    def _referee(self):
+        if self.resume_at is not None and self.time >= self.resume_at:
+            self.resume_at = None
+            self.bx = self.by = self.bvx = self.bvy = 0.0
+            self.set_play_mode("play_on")
+            return
+        if self.play_mode != "play_on":
+            return
+        if abs(self.bx) > PITCH_HALF_LENGTH:
+            if abs(self.by) < GOAL_HALF_WIDTH:
+                side = "l" if self.bx > 0 else "r"
+                self.score[side] += 1
+                self.set_play_mode(f"goal_{side}_{self.score[side]}")
+                self.resume_at = self.time + GOAL_PAUSE
+                self.bvx = self.bvy = 0.0
+                return
+        # Sin saques de banda ni córners: balón fuera, pausa corta y se reanuda en el centro
+        if abs(self.bx) > PITCH_HALF_LENGTH or abs(self.by) > PITCH_HALF_WIDTH:
+            self.bx = max(-PITCH_HALF_LENGTH, min(PITCH_HALF_LENGTH, self.bx))
+            self.by = max(-PITCH_HALF_WIDTH, min(PITCH_HALF_WIDTH, self.by))
+            self.bvx = self.bvy = 0.0
+            self.set_play_mode("drop_ball")
+            self.resume_at = self.time + OUT_PAUSE
+
+    # --- sensores ---
+
+    def wants_see(self, p):
+        # Un see cada see_ms (150 ms en vista normal) con ciclos de step_ms
+        p.view_ms += self.step_ms
+        if p.view_ms >= self.see_ms:
+            p.view_ms -= self.see_ms
+            return True
+        return False
+
+    def _seen(self, parts, p, name, ox, oy):
+        dx, dy = ox - p.x, oy - p.y
+        deg = norm_angle(math.atan2(dy, dx) * RAD2DEG - p.body)
+        if abs(deg) > VIEW_HALF_ANGLE:
+            return
+        parts.append(b"((%s) %.1f %.0f)" % (name, math.hypot(dx, dy), deg))
+
+    def see(self, p):
+        parts = [b"(see %d" % self.time]
+        for name, (fx, fy) in FLAGS.items():
+            self._seen(parts, p, name, fx, fy)
+        for name, (gx, gy) in GOALS.items():
+            self._seen(parts, p, name, gx, gy)
+        self._seen(parts, p, b"b", self.bx, self.by)
+        for q in self.players:
+            if q is p:
+                continue
+            dist = math.hypot(q.x - p.x, q.y - p.y)
+            if dist > TEAM_FAR:
+                name = b"p"
+            elif dist > UNUM_FAR:
+                name = b'p "%s"' % q.team
+            else:
+                name = b'p "%s" %d%s' % (q.team, q.unum, b" goalie" if q.goalie else b"")
+            self._seen(parts, p, name, q.x, q.y)
+        return b" ".join(parts) + b")"
+
+    def sense_body(self, p):
+        # Como rcssserver: velocidad ya decaída y su dirección relativa a la cara del jugador
+        speed = math.hypot(p.vx, p.vy)
+        c = p.counts
+        return (b"(sense_body %d (view_mode high normal) (stamina %.1f 1 130600) (speed %.2f %.0f) "
+                b"(head_angle 0) (kick %d) (dash %d) (turn %d) (say 0) (turn_neck 0) (catch 0) (move %d) "
+                b"(change_view 0))" % (self.time, p.stamina, speed, norm_angle(math.atan2(p.vy, p.vx) * RAD2DEG - p.body),
+                                       c[b"kick"], c[b"dash"], c[b"turn"], c[b"move"]))
+
+    def hear(self, mode):
+        return b"(hear %d referee %s)" % (self.time, mode.encode())
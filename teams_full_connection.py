@@ -1,26 +1,140 @@
 #!/usr/bin/env python3
+import asyncio
+import heapq
+import multiprocessing
+import queue
+import signal
 import socket
+import sys
 import time
 import threading
 import json
 import os
-import re
 import traceback
 
-from agent import Player
-from agent.state import WorldModel
-from agent.fsm import AgentFSM
-from perception.parse import parse_see
+from perception.sexp import MessageParser
 from agent.roles import RoleManager
-from agent.logger import GameLogger 
+from agent.commands import CommandBuffer, body_turn
+from agent.receiver import LatestReceiver
+from agent.startup import StartupProfiler
+
+# Módulos pesados (numpy, FSM, logger, inferencia): los carga load_modules() desde main
+# para medir lo que cuesta cada uno y tenerlos listos antes de los handshakes de init.
+Player = make_logger = InferenceServer = None
 
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 6000
 NUM_PLAYERS = 11
 TEAM_NAME = "Right"
 CONF_FILE = "conf_file.conf"
+MODEL_PATH = "models/actor_v1.pth"
+# Segundos entre revisiones del directorio de MODEL_PATH en busca de versiones nuevas
+# de los pesos (agent.registry.ModelRegistry); 0 = pesos fijos cargados al arrancar
+MODEL_WATCH = 0.0
+MODELS = None
+LOG_DIR = "logs"
+LOG_FORMAT = "jsonl"
+LOG_COMPRESS = False
+RUNTIME = "threads"
+PROCESSES = 0
+MAX_RESTARTS = 3
+CYCLE = 0.1
+FAST_START = False
+LAUNCH_STAGGER = 0.05
+INIT_TIMEOUT = 4.0
+PROFILER = None
+# Latencias por etapa: sin directorio ni puerto no se mide nada
+METRICS_DIR = None
+METRICS_PORT = 0
+METRICS_INTERVAL = 5.0
+METRICS = None
+
+def load_modules(profiler):
+    global Player, make_logger, InferenceServer
+    profiler.import_module("numpy")
+    profiler.import_module("agent.fsm")
+    Player = profiler.import_module("agent.agent").Player
+    make_logger = profiler.import_module("agent.logger").make_logger
+    InferenceServer = profiler.import_module("agent.inference").InferenceServer
+
+def launch_stagger():
+    # Separación entre jugadores: mantiene el orden de dorsales; con FAST_START todos a la vez
+    return 0.0 if FAST_START else LAUNCH_STAGGER
+
+def start_metrics(port_offset=0):
+    # Registro de latencias y su exportador (fichero JSON periódico y/o HTTP local)
+    global METRICS
+    if not (METRICS_DIR or METRICS_PORT):
+        return None
+    from agent.metrics import MetricsExporter, MetricsRegistry
+    METRICS = MetricsRegistry(TEAM_NAME, CYCLE)
+    path = os.path.join(METRICS_DIR, f"metrics_{TEAM_NAME}_{os.getpid()}.json") if METRICS_DIR else None
+    port = METRICS_PORT + port_offset if METRICS_PORT else None
+    try:
+        exporter = MetricsExporter(METRICS, path, port, METRICS_INTERVAL)
+    except OSError as e:
+        print(f"[main] Error arrancando el exportador de métricas: {e}")
+        METRICS = None
+        return None
+    where = [w for w in (path, port and f"http://127.0.0.1:{port}/metrics") if w]
+    print(f"[main] Métricas de latencia en {', '.join(where)}")
+    return exporter
+
+
+def watch_models(**kwargs):
+    # Servidor de inferencia alimentado por el registro de versiones: existe aunque aún no
+    # haya pesos (los jugadores juegan en clásico hasta que llegue la primera versión).
+    # SIGUSR1 vuelve a la versión anterior.
+    global MODELS
+    from agent.registry import ModelRegistry
+    MODELS = ModelRegistry(MODEL_PATH, interval=MODEL_WATCH)
+    MODELS.poll()
+    inference = InferenceServer(MODELS.actor, **kwargs)
+    MODELS.listeners.append(inference.set_actor)
+    MODELS.start()
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        # En otro hilo: el handler corre en el principal, que puede tener el lock del registro
+        signal.signal(signal.SIGUSR1, lambda *_: threading.Thread(target=MODELS.rollback, daemon=True).start())
+    print(f"[main] Vigilando versiones de {MODEL_PATH} cada {MODEL_WATCH:g} s (activa: {MODELS.version})")
+    return inference
+
+
+def play_cycle(player, logger, commands, sendto, addr, cycle_start, metrics=None):
+    # Decisión, log y envío del ciclo; con metrics se mide cada etapa (perf_counter_ns)
+    # y el tiempo total desde que llegó el see (cycle_start, time.monotonic). El FSM
+    # decide con el plazo del ciclo: cycle_start + CYCLE.
+    wm = player.world_model
+    t0 = time.perf_counter_ns() if metrics else 0
+    action = player.fsm.step(wm, None if cycle_start is None else cycle_start + CYCLE)
+    t1 = time.perf_counter_ns() if metrics else 0
+    logger.log_tick(wm, action)
+    t2 = time.perf_counter_ns() if metrics else 0
+    # Un único datagrama por ciclo, enviado en cuanto hay decisión
+    commands.set_action(action)
+    commands.flush(sendto, addr, cycle_start)
+    # El estimador del balón (coordenadas relativas) acompaña el giro una vez enviado
+    wm.ball_est.turn(body_turn(action, commands.min_turn))
+    if metrics:
+        t3 = time.perf_counter_ns()
+        metrics.add("step", t1 - t0)
+        metrics.add("log", t2 - t1)
+        metrics.add("send", t3 - t2)
+        since = int((time.monotonic() - cycle_start) * 1e9) if cycle_start is not None else t3 - t0
+        metrics.decision(wm.time, since)
+    return action
+
+
+def timed_handler(handle, metrics):
+    # Envuelve el handler de mensajes para medir la etapa parse (solo con métricas)
+    if metrics is None:
+        return handle
+    def timed(data):
+        t0 = time.perf_counter_ns()
+        result = handle(data)
+        metrics.add("parse", time.perf_counter_ns() - t0)
+        return result
+    return timed
 
-INIT_RE = re.compile(r"\(init\s+([lrLR])\s+(\d+)", re.IGNORECASE)
 
 def load_positions(conf_file):
     if not os.path.exists(conf_file):
@@ -45,11 +159,12 @@ def safe_send(sock, msg, host, port):
         print(f"[safe_send] send error: {e}")
 
 
-def player_thread(idx, positions, host, port, role_manager):
+def player_thread(idx, positions, host, port, role_manager, inference=None):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind(("", 0))
     sock.settimeout(0.8)
 
+    t_start = time.perf_counter()
     try:
         safe_send(sock, f"(init {TEAM_NAME})", host, port)
     except Exception as e:
@@ -59,20 +174,17 @@ def player_thread(idx, positions, host, port, role_manager):
 
     side = None
     unum = None
-    init_buf = ""
-    INIT_TIMEOUT = 4.0
+    init_parser = MessageParser(TEAM_NAME)
     t0 = time.time()
     server_addr = (host, port)
 
     while time.time() - t0 < INIT_TIMEOUT:
         try:
             data, server_addr = sock.recvfrom(8192)
-            msg = data.decode(errors="ignore")
-            init_buf += msg
-            m = INIT_RE.search(init_buf)
-            if m:
-                side = m.group(1).lower()
-                unum = int(m.group(2))
+            if init_parser.parse(data) == "init":
+                side = init_parser.init["side"]
+                unum = init_parser.init["unum"]
+                t_init = time.perf_counter()
                 print(f"[{TEAM_NAME} #{idx}] INIT OK: side={side}, unum={unum}")
                 break
         except socket.timeout:
@@ -97,80 +209,379 @@ def player_thread(idx, positions, host, port, role_manager):
     if role_manager is None:
         role_manager = RoleManager(CONF_FILE)
     
-    player = Player(side, unum, role_manager)
+    t_build = time.perf_counter()
+    player = Player(side, unum, role_manager, inference=inference, team_name=TEAM_NAME)
     
     player.world_model.self_role = role_manager.get_role(unum)
     
-    logger = GameLogger(TEAM_NAME, unum)
+    logger = make_logger(TEAM_NAME, unum, log_dir=LOG_DIR, fmt=LOG_FORMAT, compress=LOG_COMPRESS)
+    commands = CommandBuffer()
+    receiver = LatestReceiver(sock)
+    if PROFILER:
+        PROFILER.player(idx, handshake=t_init - t_start, build=time.perf_counter() - t_build)
+
+    metrics = METRICS.player(idx) if METRICS else None
+    if metrics:
+        metrics.unum = unum
+        player.fsm.metrics = metrics
+
+    def handle(data):
+        try:
+            player.handle_message(data)
+        except Exception as e:
+            print(f"[{TEAM_NAME} #{idx}] parse error: {e}")
+    handle = timed_handler(handle, metrics)
 
     sock.settimeout(1.0)
 
     while True:
         try:
-            data, server_addr = sock.recvfrom(8192)
-            msg = data.decode(errors="ignore")
-
-            if msg.startswith("(see"):
+            # Si un ciclo se alarga, los see atrasados se descartan y se decide con el último
+            if receiver.drain(handle):
                 try:
-                    obs_dict = parse_see(msg)
-                    player.world_model.update_from_see(obs_dict)
-                    
-                    action = player.fsm.step(player.world_model)
-                    
-                    logger.log_tick(player.world_model, action)
-                    
-                    cmds = []
-                    turn_val = action.get("turn", 0.0)
-                    dash_val = action.get("dash", 0.0)
-                    kick_val = action.get("kick")
-                    
-                    if turn_val != 0.0:
-                        cmds.append(f"(turn {turn_val:.1f})")
-                    if dash_val != 0.0:
-                        cmds.append(f"(dash {dash_val:.1f})")
-                    if kick_val is not None:
-                        power, angle = kick_val
-                        cmds.append(f"(kick {power:.1f} {angle:.1f})")
-                    
-                    if not cmds:
-                        cmds = ["(turn 0)"]
-                    
-                    for cmd in cmds:
-                        safe_send(sock, cmd, host, port)
-                        time.sleep(0.003)
-                        
+                    play_cycle(player, logger, commands, sock.sendto, (host, port), receiver.see_time, metrics)
                 except Exception as e:
                     print(f"[{TEAM_NAME} #{idx}] (see) error: {e}")
                     traceback.print_exc()
 
-            elif msg.startswith("(hear"):
-                try:
-                    if "referee" in msg:
-                        m = re.search(r'\(hear\s+\d+\s+referee\s+([a-zA-Z0-9_]+)\)', msg)
-                        if m:
-                            mode = m.group(1)
-                            player.world_model.play_mode = mode
-                except Exception as e:
-                    pass
-
-            elif msg.startswith("(sense_body"):
-                try:
-                    stamina_match = re.search(r'\(stamina\s+([\d\.]+)\s+', msg)
-                    if stamina_match:
-                        stamina = float(stamina_match.group(1))
-                        player.world_model.update_from_sense_body(stamina=stamina)
-                except:
-                    pass
-
         except Exception as e:
             break
 
+    print(f"[{TEAM_NAME} #{idx}] {commands.summary()}; {receiver.summary()}; estrategias: {player.fsm.strategy_summary()}")
     logger.close()
     sock.close()
 
+# --- Runtime asyncio: los 11 jugadores en un único event loop ---
+
+class AsyncPlayer(asyncio.DatagramProtocol):
+    def __init__(self, idx, team):
+        self.idx = idx
+        self.team = team
+        self.transport = None
+        self.parser = MessageParser(TEAM_NAME)
+        self.init_done = asyncio.get_running_loop().create_future()
+        self.player = None
+        self.logger = None
+        self.backlog = []
+        self.commands = CommandBuffer()
+        self.dropped_see = 0
+        self.last_recv = time.monotonic()
+        self.deadline = None
+        self.metrics = None
+        self.handle = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.last_recv = time.monotonic()
+        if self.player is None:
+            if not self.init_done.done():
+                if self.parser.parse(data) == "init":
+                    self.init_done.set_result((self.parser.init["side"], self.parser.init["unum"]))
+            else:
+                # Mensajes que llegan mientras se coloca (p.ej. el play_on del árbitro)
+                self.backlog.append(bytes(data))
+            return
+        try:
+            kind = self.handle(data)
+        except Exception as e:
+            print(f"[{TEAM_NAME} #{self.idx}] parse error: {e}")
+            return
+        if kind == "see":
+            self.team.schedule(self, self.last_recv + CYCLE)
+
+    def error_received(self, exc):
+        print(f"[{TEAM_NAME} #{self.idx}] socket error: {exc}")
+
+    def send(self, msg):
+        # sendto de un transporte datagram no bloquea: si el socket no acepta, asyncio lo encola
+        self.transport.sendto(msg.encode() if msg.endswith("\n") else (msg + "\n").encode(), self.team.server)
+
+    def close(self):
+        if self.logger:
+            strategies = self.player.fsm.strategy_summary() if self.player else "-"
+            print(f"[{TEAM_NAME} #{self.idx}] {self.commands.summary()}; {self.dropped_see} see sin decisión propia; "
+                  f"estrategias: {strategies}")
+            self.logger.close()
+            self.logger = None
+        if self.transport:
+            self.transport.close()
+
+
+class AsyncTeam:
+    def __init__(self, host, port, positions, role_manager, inference=None, on_ready=None):
+        self.server = (host, port)
+        self.on_ready = on_ready
+        self.positions = positions
+        self.role_manager = role_manager
+        self.inference = inference
+        self.players = []
+        self.ready = []
+        self.wakeup = asyncio.Event()
+        self.decisions = 0
+        self.late = 0
+
+    def schedule(self, proto, deadline):
+        # Una decisión pendiente por jugador; si llega otro see antes de atenderla,
+        # se decidirá con el world model ya actualizado y el plazo más antiguo.
+        if proto.deadline is None:
+            proto.deadline = deadline
+            heapq.heappush(self.ready, (deadline, proto.idx, proto))
+            self.wakeup.set()
+        else:
+            proto.dropped_see += 1
+
+    async def start_player(self, idx, known_unum=None):
+        loop = asyncio.get_running_loop()
+        _, proto = await loop.create_datagram_endpoint(lambda: AsyncPlayer(idx, self), local_addr=("0.0.0.0", 0))
+        t_start = time.perf_counter()
+        if known_unum:
+            # Proceso reiniciado por el supervisor: recupera el mismo dorsal
+            proto.send(f"(reconnect {TEAM_NAME} {known_unum})")
+        else:
+            proto.send(f"(init {TEAM_NAME})")
+        try:
+            side, unum = await asyncio.wait_for(proto.init_done, INIT_TIMEOUT)
+            unum = unum or known_unum
+            t_init = time.perf_counter()
+        except asyncio.TimeoutError:
+            print(f"[{TEAM_NAME} #{idx}] Init failed, closing.")
+            proto.close()
+            return
+        print(f"[{TEAM_NAME} #{idx}] INIT OK: side={side}, unum={unum}")
+
+        target_pos = self.positions.get(unum) or self.positions.get(idx)
+        if target_pos:
+            x, y = target_pos
+            print(f"[{TEAM_NAME} #{idx}] Moving to ({x:.2f},{y:.2f})")
+            for _ in range(6):
+                proto.send(f"(move {x:.2f} {y:.2f})")
+                await asyncio.sleep(0.08)
+
+        role_manager = self.role_manager or RoleManager(CONF_FILE)
+        t_build = time.perf_counter()
+        player = Player(side, unum, role_manager, inference=self.inference, team_name=TEAM_NAME)
+        player.world_model.self_role = role_manager.get_role(unum)
+        if proto.parser.init["play_mode"]:
+            player.world_model.play_mode = proto.parser.init["play_mode"]
+        proto.logger = make_logger(TEAM_NAME, unum, log_dir=LOG_DIR, fmt=LOG_FORMAT, compress=LOG_COMPRESS)
+        if PROFILER:
+            PROFILER.player(idx, handshake=t_init - t_start, build=time.perf_counter() - t_build)
+        proto.last_recv = time.monotonic()
+        for data in proto.backlog:
+            # Solo actualizan el world model: las decisiones de esos ciclos ya no sirven
+            try:
+                player.handle_message(data)
+            except Exception as e:
+                print(f"[{TEAM_NAME} #{idx}] parse error: {e}")
+        proto.backlog = []
+        proto.metrics = METRICS.player(idx) if METRICS else None
+        if proto.metrics:
+            proto.metrics.unum = unum
+            player.fsm.metrics = proto.metrics
+        proto.handle = timed_handler(player.handle_message, proto.metrics)
+        proto.player = player
+        self.players.append(proto)
+        if self.on_ready:
+            self.on_ready(idx, unum, proto.logger.filename)
+
+    def decide(self, proto, cycle_start=None):
+        try:
+            play_cycle(proto.player, proto.logger, proto.commands, proto.transport.sendto, self.server,
+                       cycle_start, proto.metrics)
+            self.decisions += 1
+        except Exception as e:
+            print(f"[{TEAM_NAME} #{proto.idx}] (see) error: {e}")
+            traceback.print_exc()
+
+    async def prefetch(self, batch):
+        # Inferencia de todos los jugadores listos en un solo batch, esperada sin bloquear el
+        # loop (la red sigue entrando); cada FSM la recoge en su step
+        requests = []
+        for deadline, proto in batch:
+            req = proto.player.fsm.neural_request(proto.player.world_model, deadline)
+            if req is not None:
+                requests.append((proto, req))
+        if not requests:
+            return
+        t0 = time.perf_counter_ns()
+        results = await self.inference.infer_async([obs for _, (obs, _) in requests], [d for _, (_, d) in requests])
+        dt = time.perf_counter_ns() - t0
+        for (proto, _), out in zip(requests, results):
+            if proto.player is not None:
+                proto.player.fsm.prefetched = out if out is not None else False
+            if proto.metrics:
+                proto.metrics.add("infer", dt)
+
+    async def run(self, silence_timeout=1.0):
+        while self.players:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), silence_timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            # Jugadores por orden de plazo; entre uno y otro se deja entrar la red
+            batch = []
+            while self.ready:
+                deadline, _, proto = heapq.heappop(self.ready)
+                proto.deadline = None
+                if proto.player is not None:
+                    batch.append((deadline, proto))
+            if self.inference is not None and batch:
+                await self.prefetch(batch)
+            for deadline, proto in batch:
+                if proto.player is None:
+                    continue
+                # Fuera de plazo también se decide: step repite la última acción (cached)
+                # y el jugador no se queda un ciclo sin comando
+                if time.monotonic() > deadline:
+                    self.late += 1
+                self.decide(proto, deadline - CYCLE)
+                await asyncio.sleep(0)
+            # Igual que los hilos: un jugador sin mensajes durante silence_timeout termina
+            now = time.monotonic()
+            for proto in [p for p in self.players if now - p.last_recv > silence_timeout]:
+                print(f"[{TEAM_NAME} #{proto.idx}] Sin mensajes del servidor, cerrando.")
+                proto.close()
+                proto.player = None
+                self.players.remove(proto)
+
+    def close(self):
+        for proto in self.players:
+            proto.close()
+        self.players = []
+
+
+async def async_main(host, port, positions, role_manager, inference=None, indices=None, known=None, on_ready=None):
+    team = AsyncTeam(host, port, positions, role_manager, inference, on_ready)
+    indices = indices or range(1, NUM_PLAYERS + 1)
+    known = known or {}
+    try:
+        starts = []
+        for i in indices:
+            starts.append(asyncio.create_task(team.start_player(i, known.get(i))))
+            await asyncio.sleep(launch_stagger())
+        await asyncio.gather(*starts)
+        if PROFILER:
+            print(PROFILER.report())
+        print(f"[main] {len(team.players)} jugadores en un único event loop, esperando Ctrl-C para finalizar.")
+        await team.run()
+    finally:
+        print(f"[main] Decisiones: {team.decisions}, fuera de plazo: {team.late}")
+        team.close()
+
+
+# --- Modo procesos: los jugadores repartidos en grupos, uno por proceso ---
+
+class _QueueWriter:
+    # stdout/stderr de un proceso hijo: cada línea se manda al supervisor
+    def __init__(self, events):
+        self.events = events
+        self.buf = ""
+
+    def write(self, text):
+        self.buf += text
+        while "\n" in self.buf:
+            line, self.buf = self.buf.split("\n", 1)
+            self.events.put(("out", line))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def group_process(indices, known, host, port, positions, role_manager, actor, events):
+    global PROFILER
+    sys.stdout = sys.stderr = _QueueWriter(events)
+    PROFILER = StartupProfiler()
+    if Player is None:
+        # Sin fork (spawn) el hijo parte de un intérprete nuevo
+        load_modules(PROFILER)
+    # Con fork, role_manager y los pesos del actor son las páginas del padre (copy-on-write);
+    # con MODEL_WATCH cada grupo vigila y carga las versiones (los .npy van con mmap y
+    # comparten las páginas del fichero)
+    if MODEL_WATCH:
+        inference = watch_models(window=0.0)
+    else:
+        inference = InferenceServer(actor, window=0.0) if actor is not None else None
+    on_ready = lambda idx, unum, path: events.put(("ready", idx, unum, path))
+    # Cada grupo exporta sus propias métricas: fichero por pid y puerto base + primer índice
+    exporter = start_metrics(port_offset=indices[0])
+    try:
+        asyncio.run(async_main(host, port, positions, role_manager, inference, indices, known, on_ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if inference:
+            inference.close()
+        if exporter:
+            exporter.close()
+
+
+def supervise(host, port, positions, role_manager, actor):
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+    n_procs = max(1, min(PROCESSES or os.cpu_count() or 1, NUM_PLAYERS))
+    indices = list(range(1, NUM_PLAYERS + 1))
+    groups = [indices[g::n_procs] for g in range(n_procs)]
+    events = ctx.Queue()
+    known, log_files, restarts, procs = {}, {}, [0] * n_procs, {}
+
+    def start(g):
+        p = ctx.Process(target=group_process, name=f"{TEAM_NAME}-g{g}",
+                        args=(groups[g], dict(known), host, port, positions, role_manager, actor, events),
+                        daemon=True)
+        p.start()
+        procs[g] = p
+
+    print(f"[main] {NUM_PLAYERS} jugadores en {n_procs} procesos: {groups}")
+    for g in range(n_procs):
+        start(g)
+    if MODEL_WATCH and hasattr(signal, "SIGUSR1"):
+        # El rollback se reenvía a cada grupo, que tiene su propio registro
+        signal.signal(signal.SIGUSR1, lambda *_: [os.kill(p.pid, signal.SIGUSR1) for p in list(procs.values())])
+    try:
+        while procs:
+            try:
+                ev = events.get(timeout=0.5)
+                if ev[0] == "out":
+                    print(ev[1])
+                elif ev[0] == "ready":
+                    _, idx, unum, path = ev
+                    known[idx] = unum
+                    log_files.setdefault(idx, []).append(path)
+                continue
+            except queue.Empty:
+                pass
+            for g, p in list(procs.items()):
+                if p.is_alive():
+                    continue
+                del procs[g]
+                if p.exitcode != 0 and restarts[g] < MAX_RESTARTS:
+                    restarts[g] += 1
+                    print(f"[main] Proceso {p.name} terminó con código {p.exitcode}, reinicio {restarts[g]}/{MAX_RESTARTS}")
+                    start(g)
+                elif p.exitcode != 0:
+                    print(f"[main] Proceso {p.name} abandonado tras {MAX_RESTARTS} reinicios")
+    except KeyboardInterrupt:
+        print("[main] Interrupción recibida, saliendo.")
+    finally:
+        for p in procs.values():
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+        for idx in sorted(log_files):
+            print(f"[main] Logs #{idx} (dorsal {known.get(idx)}): {', '.join(log_files[idx])}")
+
+
 def main():
+    global PROFILER
     host = SERVER_HOST
     port = SERVER_PORT
+    PROFILER = profiler = StartupProfiler()
+    with profiler.phase("módulos"):
+        load_modules(profiler)
 
     try:
         positions = load_positions(CONF_FILE)
@@ -185,19 +596,71 @@ def main():
         print(f"[main] Error cargando roles: {e}")
         role_manager = None
 
+    if RUNTIME == "processes":
+        try:
+            with profiler.phase("modelo: carga"):
+                actor = None if MODEL_WATCH else InferenceServer.load_actor(MODEL_PATH)
+            if actor is not None:
+                # Pesos en memoria compartida antes de crear los procesos
+                actor.share_memory()
+                with profiler.phase("modelo: calentamiento"):
+                    profiler.import_module("agent.inference").warm_actor(actor)
+                print(f"[main] Pesos del actor compartidos desde {MODEL_PATH}")
+        except Exception as e:
+            print(f"[main] Error cargando modelo compartido: {e}")
+            actor = None
+        print(profiler.report())
+        supervise(host, port, positions, role_manager, actor)
+        return
+
+    exporter = start_metrics()
+    try:
+        run_players(host, port, positions, role_manager, profiler)
+    finally:
+        if exporter:
+            exporter.close()
+
+
+def run_players(host, port, positions, role_manager, profiler):
+    try:
+        # En asyncio las peticiones de los jugadores listos entran juntas (infer_async): sin ventana de espera
+        kwargs = {"window": 0.0} if RUNTIME == "asyncio" else {}
+        with profiler.phase("modelo: carga"):
+            if MODEL_WATCH:
+                inference = watch_models(**kwargs)
+            else:
+                inference = InferenceServer.from_path(MODEL_PATH, **kwargs)
+        if inference and inference.actor is not None:
+            # Primer forward antes de los handshakes, no en el primer ciclo de juego
+            with profiler.phase("modelo: calentamiento"):
+                inference.warmup()
+            print(f"[main] Servidor de inferencia compartido cargado desde {MODEL_PATH}")
+    except Exception as e:
+        print(f"[main] Error cargando modelo compartido: {e}")
+        inference = None
+
+    if RUNTIME == "asyncio":
+        try:
+            asyncio.run(async_main(host, port, positions, role_manager, inference))
+        except KeyboardInterrupt:
+            print("[main] Interrupción recibida, saliendo.")
+        return
+
     threads = []
     for i in range(1, NUM_PLAYERS + 1):
         t = threading.Thread(
             target=player_thread,
-            args=(i, positions, host, port, role_manager),
+            args=(i, positions, host, port, role_manager, inference),
             daemon=True
         )
         t.start()
         threads.append(t)
-        time.sleep(0.05)
+        time.sleep(launch_stagger())
 
     print(f"[main] Lanzados {len(threads)} hilos, esperando Ctrl-C para finalizar.")
     try:
+        profiler.wait_players(NUM_PLAYERS, INIT_TIMEOUT + 1.0)
+        print(profiler.report())
         while True:
             time.sleep(1.0)
     except KeyboardInterrupt:
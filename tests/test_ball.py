@@ -0,0 +1,60 @@
+# tests/test_ball.py
+import math
+
+from agent.ball import BALL_DECAY, BallEstimator
+from agent.state import WorldModel
+
+def rolling_ball(steps, x=10.0, y=0.0, vx=-1.5, vy=0.5):
+    for t in range(steps):
+        yield t, x, y
+        x, y = x + vx, y + vy
+        vx, vy = vx * BALL_DECAY, vy * BALL_DECAY
+
+def test_velocity_converges_and_predicts():
+    est = BallEstimator()
+    obs = list(rolling_ball(30))
+    for t, x, y in obs[:20]:
+        est.update(t, x, y)
+    t, x, y = obs[25]
+    px, py = est.predict(t)
+    assert math.hypot(px - x, py - y) < 0.1
+    traj = est.trajectory(6)
+    assert traj.shape == (6, 2)
+    assert math.hypot(traj[5, 0] - x, traj[5, 1] - y) < 0.1
+
+def test_intercept_static_ball():
+    est = BallEstimator()
+    est.update(0, 8.0, 0.0)
+    k, x, y = est.intercept(speed=1.0)
+    assert k == 8 and (x, y) == (8.0, 0.0)
+
+def test_turn_rotates_relative_frame():
+    est = BallEstimator()
+    est.update(0, 0.0, 5.0)
+    est.turn(90.0)
+    x, y = est.predict(0)
+    assert abs(x - 5.0) < 1e-9 and abs(y) < 1e-9
+
+def test_own_movement_keeps_ball_velocity():
+    # Balón parado a 20 m y el jugador corriendo hacia él a 1 m/ciclo (sense_body: 0.4)
+    wm = WorldModel()
+    assert wm.ball_est.intercept() is None
+    for t in range(8):
+        if t:
+            wm.update_from_sense_body(speed=0.4, speed_dir=0.0)
+        wm.update_from_see({"time": t, "ball": {"dist": 20.0 - t, "dir": 0.0, "x": 20.0 - t, "y": 0.0}})
+    assert abs(wm.ball_est.vel[0]) < 1e-9
+    k, x, y = wm.ball_est.intercept(speed=1.0)
+    assert abs(x - 13.0) < 1e-9
+
+def test_world_model_predicts_missing_ball():
+    wm = WorldModel()
+    for t, x, y in rolling_ball(10):
+        dist, deg = math.hypot(x, y), math.degrees(math.atan2(y, x))
+        wm.update_from_see({"time": t, "ball": {"dist": dist, "dir": deg, "x": x, "y": y}})
+    wm.update_from_see({"time": 12})
+    pred = wm.predicted_ball()
+    assert wm.ball is None and pred is not None
+    assert abs(pred["x"] - dict((t, x) for t, x, _ in rolling_ball(13))[12]) < 0.2
+    wm.update_from_see({"time": 40})
+    assert wm.predicted_ball() is None
@@ -0,0 +1,30 @@
+# tests/test_commands.py
+from agent.commands import CommandBuffer
+
+def test_one_body_command_per_cycle():
+    buf = CommandBuffer()
+    buf.set_action({"turn": 30.0, "dash": 80.0, "kick": (50.0, 10.0)})
+    buf.turn_neck(20)
+    assert bytes(buf.build()) == b"(kick 50.0 10.0)(turn_neck 20.0)\n"
+    buf.set_action({"turn": 2.0, "dash": 80.0, "kick": None})
+    assert bytes(buf.build()) == b"(dash 80.0)\n"
+    buf.set_action({"turn": 0.0, "dash": 0.0, "kick": None})
+    assert bytes(buf.build()) == b"(turn 0.0)\n"
+
+def test_flush_sends_single_datagram():
+    sent = []
+    buf = CommandBuffer()
+    for cmd in ["(turn 10)", "(dash 50)", "(say hola)"]:
+        buf.add(cmd)
+    buf.flush(lambda data, addr: sent.append((bytes(data), addr)), ("127.0.0.1", 6000))
+    assert sent == [(b"(turn 10)(say hola)\n", ("127.0.0.1", 6000))]
+    assert buf.stats()["sends"] == 1
+
+def test_overflow_is_counted_not_silent():
+    buf = CommandBuffer(size=32)
+    buf.set_action({"turn": 0.0, "dash": 80.0, "kick": None})
+    buf.say("x" * 40)
+    buf.turn_neck(10)
+    # El say no cabe: se descarta y se cuenta, el resto sale
+    assert bytes(buf.build()) == b"(dash 80.0)(turn_neck 10.0)\n"
+    assert buf.stats()["dropped"] == 1 and "1 comandos descartados" in buf.summary()
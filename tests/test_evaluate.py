@@ -0,0 +1,29 @@
+# tests/test_evaluate.py
+import numpy as np
+
+from agent.logger import BinaryGameLogger
+from agent.state import WorldModel
+from scripts.evaluate_policy import evaluate
+from training.numpy_actor import flat_size
+
+def test_replay_scores_every_strategy(tmp_path):
+    log = BinaryGameLogger("Right", 9, log_dir=str(tmp_path))
+    for t in range(12):
+        wm = WorldModel()
+        wm.time, wm.play_mode = t, "play_on" if t > 1 else "before_kick_off"
+        wm.ball = {"dist": 40.0, "dir": 3.0 * t - 10.0}
+        wm.goals = [{"side": "l", "dist": 60.0 - t, "dir": 0.0}]
+        wm.players_opponents = [{"dist": 10.0, "dir": 20.0}]
+        # Lejos del balón la clásica solo gira hacia él
+        log.log_tick(wm, {"turn": wm.ball["dir"], "dash": 0.0, "kick": None})
+    log.close()
+    model = tmp_path / "actor_v1.npy"
+    np.save(model, np.random.default_rng(0).normal(0, 0.2, flat_size(49)).astype(np.float32))
+
+    totals = evaluate([str(p) for p in tmp_path.glob("*.glog")], models=[str(model)], batch_size=4)
+    assert list(totals) == ["log", "classic", "goalie", "neural:actor_v1"]
+    assert all(st.states == 10 for st in totals.values())
+    classic = totals["classic"].to_dict()
+    assert classic["agree_pct"] == 100.0 and classic["latency"]["count"] == 10
+    # Recompensa de acercarse 1 m por ciclo a la portería rival (l, jugando en el lado r)
+    assert abs(totals["log"].reward - 10.0) < 1e-6
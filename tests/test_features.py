@@ -0,0 +1,42 @@
+# tests/test_features.py
+import numpy as np
+
+from agent.logger import RECORD_DTYPE
+from agent.state import WorldModel
+from training.features import FeatureExtractor
+
+ENTRY = {"stamina": 6000.0, "ball": {"dist": 90.0, "dir": 30.0},
+         "goals": [{"side": "r", "dist": 60.0, "dir": -9.0}],
+         "teammates": [{"dist": 20.0, "dir": 10.0}, {"dist": 5.0, "dir": -40.0}],
+         "opponents": [{"dist": 8.0, "dir": 45.0}]}
+
+def world_model(entry):
+    wm = WorldModel()
+    wm.stamina, wm.ball, wm.goals = entry["stamina"], entry["ball"], entry["goals"]
+    wm.players_teammates, wm.players_opponents = entry["teammates"], entry["opponents"]
+    return wm
+
+def test_single_batch_entries_and_records_agree():
+    fe = FeatureExtractor()
+    out = np.zeros(49, dtype=np.float32)
+    obs = fe.get_observation(world_model(ENTRY), out)
+    assert obs is out
+    assert obs[0] == 1.0 and obs[3] == -1.0 and obs[5] == np.float32(0.5)
+    # Compañeros por distancia y huecos a (-1, 0)
+    assert obs[7] == np.float32(5.0 / 60.0) and obs[9] == np.float32(20.0 / 60.0)
+    assert obs[11] == -1.0 and obs[12] == 0.0 and obs[27] == np.float32(8.0 / 60.0)
+
+    batch = fe.get_observations([world_model(ENTRY), WorldModel()])
+    assert np.array_equal(batch[0], obs) and batch[1, 0] == -1.0 and batch[1, 2] == 1.0
+
+    from_log, ok = fe.from_entries([ENTRY, {"stamina": None}])
+    assert ok.tolist() == [True, False] and np.array_equal(from_log[0], obs)
+
+    rec = np.zeros(1, dtype=RECORD_DTYPE)
+    rec["stamina"], rec["ball"] = 6000.0, (90.0, 30.0)
+    rec["goals"] = [[np.nan, np.nan], [60.0, -9.0]]
+    rec["teammates"] = np.nan
+    rec["teammates"][0, :2] = [(5.0, -40.0), (20.0, 10.0)]
+    rec["opponents"] = np.nan
+    rec["opponents"][0, 0] = (8.0, 45.0)
+    assert np.array_equal(fe.from_records(rec)[0], obs)
@@ -0,0 +1,36 @@
+# tests/test_fsm.py
+import time
+
+from agent.fsm import COST_PRIOR, AgentFSM
+from agent.roles import RoleManager
+from agent.state import WorldModel
+
+def test_fsm_repeats_last_action_past_deadline():
+    fsm = AgentFSM(9, RoleManager("conf_file.conf"))
+    wm = WorldModel()
+    wm.play_mode = "play_on"
+    wm.ball = {"dist": 10.0, "dir": 20.0, "x": 9.4, "y": 3.4}
+    fsm.step(wm, time.monotonic() + 1.0)
+    fsm.last_action = {"turn": 15.0, "dash": 80.0, "kick": (100.0, 0.0)}
+    action = fsm.step(wm, time.monotonic())
+    assert action == {"turn": 15.0, "dash": 80.0, "kick": None}
+    assert fsm.strategy_counts["cached"] == 1
+
+class LateInference:
+    # Servidor que agota el plazo: infer espera y no devuelve nada
+    actor = object()
+    def register(self): pass
+    def infer(self, obs, timeout=0.02):
+        time.sleep(0.02)
+        return None
+
+def test_neural_timeout_is_charged_to_neural():
+    fsm = AgentFSM(9, RoleManager("conf_file.conf"), inference=LateInference())
+    wm = WorldModel()
+    wm.play_mode = "play_on"
+    wm.ball = {"dist": 10.0, "dir": 20.0, "x": 9.4, "y": 3.4}
+    classic = fsm.costs["classic"]
+    fsm.step(wm, time.monotonic() + 1.0)
+    assert fsm.strategy_counts == {"classic": 1}
+    neural = COST_PRIOR["neural"]
+    assert fsm.costs["neural"] > neural and fsm.costs["classic"] < classic + 0.001
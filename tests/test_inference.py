@@ -0,0 +1,64 @@
+# tests/test_inference.py
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from agent.inference import InferenceServer
+
+class EchoActor:
+    # Devuelve la primera columna de la observación en las 5 salidas y anota el tamaño de cada batch
+    obs_size = 49
+
+    def __init__(self):
+        self.sizes = []
+
+    def forward_batch(self, obs):
+        self.sizes.append(len(obs))
+        return np.repeat(obs[:, :1], 5, axis=1)
+
+def infer_all(server, values, timeout=2.0):
+    results = [None] * len(values)
+    def run(i):
+        results[i] = server.infer(np.full(49, values[i], dtype=np.float32), timeout=timeout)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(values))]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+def test_batches_players_of_a_cycle():
+    actor = EchoActor()
+    server = InferenceServer(actor, window=1.0)
+    for _ in range(3): server.register()
+    try:
+        results = infer_all(server, [1.0, 2.0, 3.0])
+    finally:
+        server.close()
+    assert actor.sizes == [3]
+    assert sorted(r[0] for r in results) == [1.0, 2.0, 3.0]
+
+def test_timed_out_request_is_cancelled():
+    actor = EchoActor()
+    server = InferenceServer(actor, window=0.3)
+    for _ in range(2): server.register()
+    try:
+        # Solo un jugador: la ventana espera al segundo y la petición vence antes
+        assert server.infer(np.zeros(49, dtype=np.float32), timeout=0.02) is None
+        assert server.timeouts == 1 and not server._pending
+        # La petición abandonada no ocupa sitio en el batch siguiente
+        results = infer_all(server, [4.0, 5.0])
+    finally:
+        server.close()
+    assert actor.sizes == [2] and sorted(r[0] for r in results) == [4.0, 5.0]
+
+def test_async_requests_share_one_batch():
+    actor = EchoActor()
+    server = InferenceServer(actor, window=0.0)
+    try:
+        deadline = time.monotonic() + 2.0
+        obs = [np.full(49, v, dtype=np.float32) for v in (1.0, 2.0, 3.0)]
+        results = asyncio.run(server.infer_async(obs, [deadline] * 3))
+    finally:
+        server.close()
+    assert actor.sizes == [3] and [r[0] for r in results] == [1.0, 2.0, 3.0]
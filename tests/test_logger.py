@@ -0,0 +1,25 @@
+# tests/test_logger.py
+from agent.logger import BinaryGameLogger, iter_log_entries, read_binary_log
+from agent.state import WorldModel
+
+def _wm(t, mode):
+    wm = WorldModel()
+    wm.time, wm.play_mode, wm.stamina, wm.self_role = t, mode, 8000 - t, "Forward"
+    wm.ball = {"dist": 5.0, "dir": 10.0} if t % 2 else None
+    wm.goals = [{"side": "r", "dist": 40.0, "dir": 3.0}]
+    wm.players_teammates = [{"dist": 3.0, "dir": 1.0}]
+    return wm
+
+def test_binary_log_roundtrip_with_rotation(tmp_path):
+    log = BinaryGameLogger("Right", 3, log_dir=str(tmp_path), block_records=4, compress=True, max_bytes=600)
+    for t in range(20):
+        log.log_tick(_wm(t, "play_on" if t > 3 else "before_kick_off"),
+                     {"dash": 50.0, "turn": 0.0, "kick": (80.0, 5.0) if t == 7 else None})
+    log.close()
+    parts = sorted(tmp_path.glob("*.glog"))
+    assert len(parts) > 1
+    assert sum(len(read_binary_log(str(p))[1]) for p in parts) == 20
+    entries = list(iter_log_entries(str(parts[0])))
+    assert entries[0]["play_mode"] == "before_kick_off" and entries[0]["ball"] is None
+    assert entries[1]["ball"]["dist"] == 5.0
+    assert entries[1]["goals"] == [{"side": "r", "dist": 40.0, "dir": 3.0}]
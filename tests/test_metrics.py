@@ -0,0 +1,23 @@
+# tests/test_metrics.py
+import json
+
+from agent.metrics import BUCKETS_US, MetricsRegistry
+
+def test_histograms_and_missed_cycles(tmp_path):
+    reg = MetricsRegistry("Right", cycle=0.1)
+    m = reg.player(3)
+    m.add("step", 30_000)        # 30 us
+    m.add("step", 1_500_000)     # 1.5 ms
+    m.decision(10, 2_000_000)
+    m.decision(13, 150_000_000)  # tarde y con dos ciclos sin comando (11, 12)
+    h = m.stages["step"]
+    assert h.counts[0] == 1 and h.counts[BUCKETS_US.index(2000)] == 1
+    assert (m.decisions, m.late, m.idle) == (2, 1, 2)
+    assert list(m.missed) == [(13, "late"), (11, "idle"), (12, "idle")]
+    path = str(tmp_path / "m.json")
+    reg.write(path)
+    snap = json.load(open(path))
+    assert snap["players"][0]["stages"]["cycle"]["count"] == 2
+    text = reg.prometheus()
+    assert 'rc_stage_seconds_bucket{team="Right",player="3",unum="None",stage="step",le="+Inf"} 2' in text
+    assert 'kind="idle"} 2' in text
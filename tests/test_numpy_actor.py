@@ -0,0 +1,50 @@
+# tests/test_numpy_actor.py
+import numpy as np
+import pytest
+from training.numpy_actor import NumpyActor, flat_size
+
+def reference(actor, x):
+    x = x.astype(np.float64)
+    h = np.maximum(x @ actor.w1 + actor.b1, 0)
+    h = np.maximum(h @ actor.w2 + actor.b2, 0)
+    z = h @ actor.wh + actor.bh
+    sig = 1 / (1 + np.exp(-z))
+    return np.stack([sig[:, 0], np.tanh(z[:, 1]), sig[:, 2], sig[:, 3], np.tanh(z[:, 4])], axis=1)
+
+def test_single_and_batch_match_reference(tmp_path):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "actor.npy"
+    np.save(path, rng.normal(0, 0.2, flat_size(49)).astype(np.float32))
+    actor = NumpyActor.load(path)
+    assert actor.obs_size == 49 and actor.hidden == 128
+    obs = rng.uniform(-1, 1, (16, 49)).astype(np.float32)
+    ref = reference(actor, obs)
+    assert np.abs(actor.forward_batch(obs) - ref).max() < 1e-5
+    assert np.abs(np.array([actor(o) for o in obs]) - ref).max() < 1e-5
+
+def test_export_matches_torch(tmp_path):
+    torch = pytest.importorskip("torch")
+    from training.models import Actor, export_actor_numpy
+    actor = Actor(obs_size=49).eval()
+    export_actor_numpy(actor, tmp_path / "actor.npy")
+    np_actor = NumpyActor.load(tmp_path / "actor.npy")
+    obs = np.random.default_rng(1).uniform(-1, 1, (32, 49)).astype(np.float32)
+    with torch.no_grad():
+        ref = torch.cat(actor(torch.from_numpy(obs)), dim=1).numpy()
+    assert np.abs(np_actor.forward_batch(obs) - ref).max() < 1e-5
+
+def test_hidden_size_from_weights(tmp_path):
+    # Los tamaños del sweep: hidden sale del número de parámetros
+    for hidden in (64, 256):
+        np.save(tmp_path / "actor.npy", np.zeros(flat_size(49, hidden), dtype=np.float32))
+        actor = NumpyActor.load(tmp_path / "actor.npy")
+        assert actor.hidden == hidden and actor.forward_batch(np.zeros((2, 49))).shape == (2, 5)
+    with pytest.raises(ValueError):
+        NumpyActor(np.zeros(flat_size(49, 64) + 1, dtype=np.float32))
+
+def test_load_actor_reads_hidden_from_checkpoint(tmp_path):
+    torch = pytest.importorskip("torch")
+    from training.models import Actor, load_actor
+    torch.save(Actor(obs_size=49, hidden=64).state_dict(), tmp_path / "actor.pth")
+    actor = load_actor(tmp_path / "actor.pth")
+    assert actor.fc1.out_features == 64 and actor.fc1.in_features == 49
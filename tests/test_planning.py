@@ -0,0 +1,61 @@
+# tests/test_planning.py
+import random
+from planning.astar import AStarPlanner
+from planning.dstar import DStarLitePlanner
+from planning.grid import KEEP_OBSTACLES
+
+def path_cost(planner, path):
+    cells = [planner.grid.world_to_grid(*p) for p in path]
+    cost = 0.0
+    for (x0, y0), (x1, y1) in zip(cells, cells[1:]):
+        cost += 1.41 if (x0 != x1 and y0 != y1) else 1.0
+    return round(cost, 2)
+
+def test_astar_dstar_agree_on_cost():
+    rng = random.Random(3)
+    astar, dstar = AStarPlanner(2.0), DStarLitePlanner(2.0)
+    goal = (40.0, 10.0)
+    for _ in range(30):
+        obstacles = [(rng.uniform(-40, 40), rng.uniform(-25, 25)) for _ in range(10)]
+        start = (rng.uniform(-50, -30), rng.uniform(-30, 30))
+        a = astar.plan(start, goal, obstacles)
+        d = dstar.plan(start, goal, obstacles)
+        assert (a is None) == (d is None)
+        if a is not None:
+            assert path_cost(astar, a) == path_cost(astar, d)
+
+def test_blocked_goal_returns_none():
+    planner = AStarPlanner(2.0)
+    assert planner.plan((-40.0, 0.0), (10.0, 0.0), [(10.0, 0.0)]) is None
+    assert DStarLitePlanner(2.0).plan((-40.0, 0.0), (10.0, 0.0), [(10.0, 0.0)]) is None
+    # KEEP_OBSTACLES reutiliza la rejilla; None es un campo sin obstáculos
+    assert planner.plan((-40.0, 0.0), (10.0, 0.0), KEEP_OBSTACLES) is None
+    assert planner.plan((-40.0, 0.0), (10.0, 0.0)) is not None
+
+def test_astar_anytime_returns_partial_path():
+    planner = AStarPlanner(2.0)
+    obstacles = [(0.0, y) for y in range(-20, 21, 2)]
+    full = planner.plan((-30.0, 0.0), (30.0, 0.0), obstacles)
+    assert full is not None and planner.last_complete
+    partial = planner.plan((-30.0, 0.0), (30.0, 0.0), obstacles, max_expansions=20)
+    assert not planner.last_complete and partial[0] == full[0] and len(partial) < len(full)
+
+def test_compute_forces_matches_scalar():
+    from planning.potentials import compute_force, compute_forces, forces_to_commands
+    opps = [{"x": 1.0, "y": 2.0, "dist": 2.24}, {"x": -6.0, "y": 0.0, "dist": 6.0}]
+    mates = [{"x": 0.5, "y": -1.0, "dist": 1.12}]
+    target = {"x": 8.0, "y": -3.0}
+    angle, power = compute_force(2, (0, 0), target, opps, mates, None)
+    angles, powers = forces_to_commands(compute_forces([(0.0, 0.0)], (8.0, -3.0), opps, mates))
+    assert abs(angles[0] - angle) < 1e-9 and abs(powers[0] - power) < 1e-9
+
+def test_formation_field_positions_whole_team():
+    from planning.potentials import FormationField
+    class Roles:
+        positions = {1: (-50.0, 0.0), 6: (-20.0, 0.0), 11: (-0.5, 0.0)}
+    ff = FormationField(Roles())
+    best = ff.best_positions(ball=(10.0, 0.0), opponents=[(5.0, 0.0)])
+    assert best.shape == (3, 2)
+    # El delantero no se coloca encima del rival
+    assert abs(best[2, 0] - 5.0) + abs(best[2, 1]) > 2.0
+    assert ff.sample_field((0.0, 0.0)).shape == (ff.width, ff.height, 2)
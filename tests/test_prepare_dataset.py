@@ -0,0 +1,32 @@
+# tests/test_prepare_dataset.py
+import shutil
+
+from agent.logger import BinaryGameLogger
+from agent.state import WorldModel
+from scripts.prepare_dataset import update_shards
+
+def write_log(directory, unum):
+    log = BinaryGameLogger("Right", unum, log_dir=str(directory))
+    for t in range(6):
+        wm = WorldModel()
+        wm.time, wm.play_mode = t, "play_on"
+        wm.ball = {"dist": 10.0, "dir": 5.0}
+        wm.goals = [{"side": "l", "dist": 40.0 - t, "dir": 0.0}]
+        log.log_tick(wm, {"turn": 0.0, "dash": 50.0, "kick": None})
+    log.close()
+    return log.filename
+
+def test_identical_logs_get_own_shards_and_failures_are_reported(tmp_path):
+    (tmp_path / "a").mkdir(); (tmp_path / "b").mkdir()
+    first = write_log(tmp_path / "a", 7)
+    second = str(tmp_path / "b" / "copy.glog")
+    shutil.copy(first, second)
+    broken = tmp_path / "b" / "broken.glog"
+    broken.write_bytes(b"no es un log")
+    logs = [first, second, str(broken)]
+    manifest, failed = update_shards(logs, str(tmp_path / "shards"), workers=1)
+    assert list(failed) == [str(broken)]
+    assert sorted(manifest) == [first, second]
+    assert manifest[first]["sha1"] == manifest[second]["sha1"]
+    assert manifest[first]["shard"] != manifest[second]["shard"]
+    assert all(e["rows"] == 6 for e in manifest.values())
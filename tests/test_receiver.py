@@ -0,0 +1,21 @@
+# tests/test_receiver.py
+import socket
+
+from agent.receiver import LatestReceiver
+
+def test_newest_see_is_applied_in_arrival_order():
+    a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        for msg in (b"(see 1)", b"(hear 1 referee play_on)", b"(see 2)", b"(sense_body 2)",
+                    b"(hear 2 referee goal_l)"):
+            a.send(msg)
+        b.settimeout(1.0)
+        receiver = LatestReceiver(b)
+        applied = []
+        assert receiver.drain(lambda data: applied.append(bytes(data)))
+        # El see viejo se descarta; lo que llegó después del nuevo se aplica después
+        assert applied == [b"(hear 1 referee play_on)", b"(see 2)", b"(sense_body 2)", b"(hear 2 referee goal_l)"]
+        assert receiver.dropped_see == 1 and receiver.see_time is not None
+        assert b.gettimeout() == 1.0
+    finally:
+        a.close(); b.close()
@@ -0,0 +1,58 @@
+# tests/test_registry.py
+import os
+
+import numpy as np
+
+from agent.inference import InferenceServer
+from agent.registry import ModelRegistry
+from training.numpy_actor import flat_size
+
+def write_actor(path, seed, age=10.0):
+    np.save(path, np.random.default_rng(seed).normal(0, 0.1, flat_size(49)).astype(np.float32))
+    t = os.path.getmtime(path) - age
+    os.utime(path, (t, t))
+
+def test_new_version_swaps_into_server_and_rolls_back(tmp_path):
+    write_actor(tmp_path / "actor_v1.npy", 0)
+    registry = ModelRegistry(str(tmp_path / "actor_v1.pth"), interval=0)
+    assert registry.poll() and registry.version == 1
+    server = InferenceServer(registry.actor, window=0.0)
+    registry.listeners.append(server.set_actor)
+    try:
+        obs = np.zeros(49, dtype=np.float32)
+        first = server.infer(obs, timeout=1.0)
+        assert not registry.poll()
+        # Versión a medio escribir (recién modificada) o rota: no se carga
+        write_actor(tmp_path / "actor_v2.npy", 1, age=0.0)
+        (tmp_path / "actor_v3.npy").write_bytes(b"roto")
+        os.utime(tmp_path / "actor_v3.npy", (0, 0))
+        assert not registry.poll() and registry.version == 1
+        write_actor(tmp_path / "actor_v2.npy", 1)
+        assert registry.poll() and registry.version == 2 and server.actor is registry.actor
+        assert server.infer(obs, timeout=1.0) != first
+        assert registry.rollback() and registry.version == 1 and not registry.poll()
+        assert server.infer(obs, timeout=1.0) == first
+    finally:
+        server.close()
+
+def test_rollback_during_load_keeps_consistent_state(tmp_path):
+    write_actor(tmp_path / "actor_v1.npy", 0)
+    registry = ModelRegistry(str(tmp_path / "actor_v1.pth"), interval=0)
+    assert registry.poll()
+    write_actor(tmp_path / "actor_v2.npy", 1)
+    assert registry.poll() and registry.version == 2
+    seen = []
+    registry.listeners.append(lambda actor: seen.append((registry.version, actor is registry.actor)))
+    load = registry.load
+    def load_and_rollback(path):
+        # SIGUSR1 mientras se carga v3 (fuera del lock): se retira v2
+        actor = load(path)
+        registry.rollback()
+        return actor
+    registry.load = load_and_rollback
+    write_actor(tmp_path / "actor_v3.npy", 2)
+    assert registry.poll() and registry.version == 3 and registry.previous[0] == 1
+    assert seen == [(1, True), (3, True)]
+    # La versión retirada no vuelve aunque v3 se retire también
+    registry.load = load
+    assert registry.rollback() and registry.version == 1 and not registry.poll()
@@ -0,0 +1,27 @@
+# tests/test_rewards.py
+import numpy as np
+
+from agent.state import WorldModel
+from training.rewards import RewardCalculator, episode_ends, nstep_returns
+
+def test_batch_rewards_match_calculate():
+    rc = RewardCalculator("r")
+    goal_dist = np.array([50.0, 48.0, np.nan, 47.0, 0.0, 45.0, 44.5])
+    dash = np.array([100.0, -40.0, 0.0, 80.0, 10.0, 0.0, 60.0])
+    kick = np.array([False, False, True, False, True, False, False])
+    prev, ref = None, []
+    for d, a, k in zip(goal_dist, dash, kick):
+        wm = WorldModel()
+        wm.goals = [] if d != d else [{"side": "l", "dist": d, "dir": 0.0}]
+        action = {"dash": a, "kick": (50.0, 0.0) if k else None}
+        ref.append(rc.calculate(wm, prev, action) if prev else 0.0)
+        prev = wm
+    assert np.array_equal(rc.calculate_batch(goal_dist, dash, kick), ref)
+
+def test_nstep_returns_stop_at_episode_end():
+    dones = episode_ends(["play_on", "play_on", "play_on", "goal_l", "play_on"])
+    assert dones.tolist() == [False, False, True, True, True]
+    g = nstep_returns(np.ones(5), dones, gamma=0.5, n=2)
+    assert g.tolist() == [1.5, 1.5, 1.0, 1.0, 1.0]
+    g = nstep_returns(np.ones(5), np.zeros(5, dtype=bool), gamma=0.5, n=2, values=np.full(5, 4.0))
+    assert g.tolist() == [2.5, 2.5, 2.5, 1.5, 1.0]
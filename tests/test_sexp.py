@@ -0,0 +1,52 @@
+# tests/test_sexp.py
+from perception.sexp import MessageParser
+
+SEE = (b'(see 123 ((f c) 12.3 -20) ((f p l t) 40 10 0 0) ((g r) 50 -3) ((b) 10 5 0.1 0.2) '
+       b'((p "Right" 3) 5 10 0 0 20 30) ((p "Left" 1 goalie) 30 -10 k) ((p "Right") 40 2) '
+       b'((p) 50 20) ((l r) 30 -80))\x00')
+
+def test_see_classifies_players_by_team():
+    p = MessageParser("Right")
+    assert p.parse(memoryview(SEE)) == "see"
+    see = p.see
+    assert see["time"] == 123
+    assert see["ball"]["dist"] == 10.0
+    assert [m["unum"] for m in see["teammates"]] == [3, None]
+    assert see["opponents"][0]["team"] == "Left" and see["opponents"][0]["goalie"]
+    assert len(see["unknown"]) == 1
+    assert [f["name"] for f in see["flags"]] == ["f c", "f p l t"]
+    assert see["goals"][0]["side"] == "r" and see["lines"][0]["side"] == "r"
+
+def test_see_reuses_structures_and_long_names():
+    p = MessageParser("Right")
+    p.parse(SEE)
+    ball = p.see["ball"]
+    p.parse(b"(see 124 ((ball) 3 0) ((player Right 7) 8 15) ((goal l) 20 1))")
+    assert p.see["ball"] is ball and ball["dist"] == 3.0
+    assert p.see["teammates"][0]["unum"] == 7
+    assert not p.see["opponents"] and not p.see["flags"]
+    assert p.see["goals"][0]["side"] == "l"
+
+def test_hear_sense_body_init():
+    p = MessageParser("Right")
+    assert p.parse(b"(hear 12 referee kick_off_l)") == "hear"
+    assert p.hear["sender"] == "referee" and p.hear["message"] == "kick_off_l"
+    assert p.parse(b"(sense_body 12 (view_mode high normal) (stamina 7000.5 1 130600) (speed 0.1 3) (head_angle 0))") == "sense_body"
+    assert p.sense["stamina"] == 7000.5 and p.sense["view_mode"] == "high normal"
+    assert p.parse(b"(init r 3 before_kick_off)") == "init"
+    assert p.init == {"side": "r", "unum": 3, "play_mode": "before_kick_off"}
+
+def test_fast_paths_match_general_parse():
+    full, fast = MessageParser("Right"), MessageParser("Right", flags=False)
+    full.parse(SEE); fast.parse(SEE)
+    assert not fast.see["flags"]
+    for key in ("time", "ball", "teammates", "opponents", "unknown", "goals", "lines"):
+        assert fast.see[key] == full.see[key]
+    # Orden de rcssserver (un solo match) y el mismo mensaje desordenado (campo a campo)
+    sense = (b"(sense_body 40 (view_mode high normal) (stamina 7000 1 130600) (speed 0.5 -10) (head_angle 5) "
+             b"(kick 1) (dash 20) (turn 3) (say 0) (turn_neck 2) (catch 0) (move 1) (change_view 0))")
+    assert fast.parse(sense) == "sense_body"
+    ordered = dict(fast.sense)
+    fast.parse(b"(sense_body 40 (stamina 7000 1 130600) (view_mode high normal) (speed 0.5 -10) (head_angle 5) "
+               b"(turn 3) (kick 1) (dash 20) (say 0) (turn_neck 2) (catch 0) (move 1) (change_view 0))")
+    assert fast.sense == ordered and ordered["dash"] == 20 and ordered["speed"] == 0.5
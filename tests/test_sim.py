@@ -0,0 +1,59 @@
+# tests/test_sim.py
+import socket
+
+from perception.sexp import MessageParser
+from sim.server import SimServer
+from sim.world import World
+
+def test_see_is_parsed_relative_to_body():
+    world = World()
+    me = world.add_player("l", "Right")
+    mate = world.add_player("l", "Right")
+    opp = world.add_player("r", "Left")
+    me.x, me.y, me.body = 0.0, 0.0, 0.0
+    mate.x, mate.y = 10.0, 0.0
+    opp.x, opp.y = 5.0, 5.0
+    world.bx, world.by = 3.0, -3.0
+    parser = MessageParser("Right")
+    assert parser.parse(world.see(me)) == "see"
+    see = parser.see
+    assert see["teammates"][0]["unum"] == mate.unum and see["teammates"][0]["dist"] == 10.0
+    assert see["opponents"][0]["dir"] == 45.0
+    assert see["ball"]["dir"] == -45.0
+    assert parser.parse(world.sense_body(me)) == "sense_body" and parser.sense["stamina"] == 8000.0
+
+def test_dash_turn_kick_physics():
+    world = World()
+    p = world.add_player("l", "Right")
+    p.x = p.y = 0.0
+    world.command(p, b"(move -10 5)(turn_neck 10)")
+    world.step()
+    assert (p.x, p.y) == (-10.0, 5.0)
+    world.kick_off()
+    world.bx, world.by = -9.5, 5.0
+    world.command(p, b"(kick 100 0)(dash 100)")
+    world.step()
+    assert world.bx > -9.5 + 2.0 and p.counts[b"kick"] == 1 and p.counts[b"dash"] == 0
+    world.command(p, b"(dash 100)")
+    world.step()
+    assert p.x > -10.0 and p.stamina < 8000.0
+
+def test_udp_init_and_commands():
+    server = SimServer(port=0, speed=10.0, max_cycles=5).start()
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(2.0)
+    try:
+        client.sendto(b"(init Right (version 19))", server.address)
+        data, addr = client.recvfrom(8192)
+        assert data.startswith(b"(init l 1 before_kick_off)")
+        kinds = set()
+        while "see" not in kinds:
+            data, _ = client.recvfrom(8192)
+            kinds.add(data[1:data.index(b" ")].decode())
+            client.sendto(b"(turn 30)", addr)
+        server._thread.join(timeout=3.0)
+        assert server.cycles == 5 and server.commands >= 1 and server.latency
+        assert "sense_body" in kinds and "hear" in kinds
+    finally:
+        client.close()
+        server.stop()
@@ -0,0 +1,40 @@
+# tests/test_state.py
+import math
+
+from agent.state import WorldModel
+from perception.sexp import MessageParser
+
+SEE = (b'(see 7 ((b) 10 5) ((p "Right" 3) 20 10) ((p "Right" 4) 5 -10) ((p "Left" 1 goalie) 30 -10) '
+       b'((p) 8 40) ((g r) 50 -3))')
+
+def test_update_in_place_sorted_views():
+    p, wm = MessageParser("Right"), WorldModel()
+    p.parse(SEE)
+    wm.update_from_see(p.see)
+    data = wm.mates_table.data
+    assert wm.mates[:, 0].tolist() == [5.0, 20.0]
+    assert wm.opps[:, 0].tolist() == [8.0, 30.0]
+    assert [m["unum"] for m in wm.players_teammates] == [4, 3]
+    assert wm.players_opponents[1].get("goalie") and wm.players_opponents[0]["unum"] is None
+    assert wm.ball["dist"] == 10.0 and wm.goals[0]["side"] == "r"
+    p.parse(b'(see 8 ((p "Right" 3) 2 1))')
+    wm.update_from_see(p.see)
+    assert wm.mates_table.data is data and len(wm.mates) == 1 and len(wm.opps) == 0
+    assert wm.ball is None and wm.goals == [] and wm.last_goal_seen["r"]["dist"] == 50.0
+
+def test_compat_setters_accept_dicts():
+    wm = WorldModel()
+    wm.players_opponents = [{"dist": 9.0, "dir": 2.0}, {"dist": 4.0, "dir": -2.0}]
+    assert wm.opps[:, :2].tolist() == [[4.0, -2.0], [9.0, 2.0]]
+    # Sin x/y se calculan de dist/dir
+    assert abs(wm.opps[1, 2] - 9.0 * math.cos(math.radians(2.0))) < 1e-9 and wm.opps[1, 3] > 0
+    p = MessageParser("Right")
+    p.parse(SEE)
+    wm.update_from_see(p.see)
+    assert [o["team"] for o in wm.players_opponents] == ["", "Left"]
+
+def test_assigned_goals_are_copied():
+    wm, goals = WorldModel(), [{"side": "l", "dist": 30.0, "dir": 0.0}]
+    wm.goals = goals
+    wm.update_from_see({"time": 3})
+    assert wm.goals == [] and len(goals) == 1
@@ -0,0 +1,49 @@
+# tests/test_tactics.py
+import agent.tactics as tactics
+from agent.state import WorldModel
+
+def _wm(mates, opps, goal=None):
+    wm = WorldModel()
+    wm.self_side = "r"
+    wm.players_teammates = mates
+    wm.players_opponents = opps
+    if goal:
+        wm.goals = [goal]
+    return wm
+
+def _p(dist, deg):
+    import math
+    return {"dist": dist, "dir": deg, "x": dist * math.cos(math.radians(deg)), "y": dist * math.sin(math.radians(deg))}
+
+def test_pass_avoids_intercepted_lane():
+    wm = _wm([_p(15.0, 0.0), _p(12.0, 40.0)], [_p(7.0, 1.0)])
+    # Presupuesto holgado: el pase bueno es uno adelantado y no debe depender de la CPU
+    power, angle = tactics.get_best_pass(wm, 3, budget=1.0)
+    assert abs(angle - 40.0) < 15.0 and 0.0 < power <= 100.0
+
+def test_no_pass_when_every_lane_is_covered():
+    wm = _wm([_p(15.0, 0.0)], [_p(3.0, 0.0), _p(5.0, 20.0), _p(5.0, -20.0)])
+    assert tactics.get_best_pass(wm, 3, budget=0.0) is None
+
+def test_shot_aims_away_from_goalie():
+    goal = dict(_p(12.0, 0.0), side="l")
+    wm = _wm([], [_p(11.0, -6.0)], goal)
+    power, angle = tactics.get_shoot_action(wm, "r")
+    assert power == 100.0 and angle > 5.0
+    wm = _wm([], [_p(6.0, a) for a in range(-30, 31, 10)], goal)
+    assert tactics.get_shoot_action(wm, "r") is None
+
+def test_lead_passes_stop_at_deadline():
+    import time
+    wm = _wm([_p(15.0, 0.0)], [_p(3.0, 0.0), _p(5.0, 20.0), _p(5.0, -20.0)])
+    cost = tactics.new_pass_cost()
+    # Plazo vencido: solo pases al pie, sin medir ningún tramo adelantado
+    assert tactics.get_best_pass(wm, 3, cost=cost, deadline=time.monotonic() - 1.0) is None
+    assert cost["lead"] == 0.0
+    tactics.get_best_pass(wm, 3, cost=cost, budget=1.0)
+    assert cost["lead"] > 0.0 and tactics.new_pass_cost()["lead"] == 0.0
+
+def test_shot_without_opponents_goes_to_goal_centre():
+    goal = dict(_p(20.0, 12.0), side="l")
+    power, angle = tactics.get_shoot_action(_wm([], [], goal), "r")
+    assert power == 100.0 and abs(angle - 12.0) < 1e-9
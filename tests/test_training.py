@@ -0,0 +1,71 @@
+# tests/test_training.py
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+def make_npz(path, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = np.stack([rng.uniform(0, 100, n), rng.uniform(-180, 180, n),
+                        np.where(rng.random(n) < 0.3, rng.uniform(10, 100, n), 0.0), rng.uniform(-90, 90, n)], axis=1)
+    np.savez(path, obs=rng.uniform(-1, 1, (n, 49)).astype(np.float32), actions=actions.astype(np.float32),
+             rewards=np.zeros(n, dtype=np.float32))
+
+def test_masked_loss_matches_boolean_indexing():
+    from training.dataset import prepare_targets
+    from training.models import Actor
+    from training.train import actor_loss
+    rng = np.random.default_rng(1)
+    act = torch.tensor(np.stack([rng.uniform(0, 100, 64), rng.uniform(-180, 180, 64),
+                                 np.where(rng.random(64) < 0.5, 50.0, 0.0), rng.uniform(-90, 90, 64)], axis=1),
+                       dtype=torch.float32)
+    obs = torch.tensor(rng.uniform(-1, 1, (64, 49)), dtype=torch.float32)
+    out = Actor()(obs)
+    mask = (act[:, 2] > 0)
+    mse = torch.nn.functional.mse_loss
+    ref = (mse(out[0], act[:, 0:1] / 100) + mse(out[1], act[:, 1:2] / 180)
+           + torch.nn.functional.binary_cross_entropy(out[2], mask.float().unsqueeze(1))
+           + mse(out[3][mask].squeeze(1), act[mask, 2] / 100) + mse(out[4][mask].squeeze(1), act[mask, 3] / 180))
+    loss = actor_loss(out, torch.from_numpy(prepare_targets(act.numpy())))
+    assert abs(loss.item() - ref.item()) < 1e-5
+
+def test_streaming_checkpoint_and_resume(tmp_path):
+    from training.train import train_streaming
+    data = tmp_path / "data.npz"
+    make_npz(data)
+    ckpt, out = str(tmp_path / "ckpt.pt"), str(tmp_path / "actor.pth")
+    train_streaming(str(data), epochs=2, batch_size=64, workers=0, threads=1, accum=2, checkpoint=ckpt, output=out)
+    assert torch.load(ckpt)["epoch"] == 1
+    train_streaming(str(data), epochs=3, batch_size=64, workers=0, threads=1, accum=2, checkpoint=ckpt,
+                    output=out, resume=True)
+    state = torch.load(ckpt)
+    assert state["epoch"] == 2 and state["step"] == 3 * 3
+
+def test_sweep_prunes_and_ranks(tmp_path):
+    from training.sweep import make_grid, shared_dataset, successive_halving
+    data = tmp_path / "data.npz"
+    make_npz(data)
+    out = tmp_path / "sweep"
+    configs = make_grid([1e-3, 1e-2], [16, 32], [1.0], [1.0])
+    task = {"data": shared_dataset(str(data), str(out / "data")), "out_dir": str(out), "threads": 1,
+            "batch_size": 64, "accum": 1, "val_fraction": 0.2, "patience": 5, "min_delta": 0.0, "seed": 0}
+    results = successive_halving(configs, task, parallel=2, min_epochs=1, max_epochs=2, eta=2)
+    assert len(results) == 4 and results[0]["val_loss"] <= results[-1]["val_loss"]
+    assert sorted(r["epochs"] for r in results) == [1, 1, 2, 2]
+    assert (out / f"{results[0]['name']}.pth").exists()
+
+def test_sharded_dataset_returns_and_advantages(tmp_path):
+    from training.dataset import ShardedSoccerDataset
+    rng = np.random.default_rng(2)
+    for name, n in (("a", 5), ("b", 3)):
+        shard = tmp_path / name
+        shard.mkdir()
+        for arr, shape in (("obs", (n, 49)), ("actions", (n, 4)), ("rewards", (n,)), ("returns", (n,)), ("advantages", (n,))):
+            np.save(shard / f"{arr}.npy", rng.normal(size=shape).astype(np.float32))
+    ds = ShardedSoccerDataset(str(tmp_path))
+    item = ds[6]
+    assert ds.has_returns and len(ds) == 8
+    assert item['return'].item() == pytest.approx(float(np.load(tmp_path / "b" / "returns.npy")[1]))
+    assert item['advantage'].item() == pytest.approx(float(np.load(tmp_path / "b" / "advantages.npy")[1]))
+    (tmp_path / "b" / "returns.npy").unlink()
+    assert 'return' not in ShardedSoccerDataset(str(tmp_path))[0]
@@ -1,5 +1,7 @@
+import json
+import os
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, Sampler
 import numpy as np
 class SoccerDataset(Dataset):
     def __init__(self, npz_file):
@@ -8,5 +10,194 @@ class SoccerDataset(Dataset):
         self.actions = torch.FloatTensor(data['actions']) 
         self.rewards = torch.FloatTensor(data['rewards'])
         self.kick_mask = (self.actions[:, 2] > 0).float().unsqueeze(1)
+        # Retornos n-step y ventajas (prepare_dataset) para el Critic; los datasets antiguos no los traen
+        self.returns = torch.FloatTensor(data['returns']) if 'returns' in data.files else None
+        self.advantages = torch.FloatTensor(data['advantages']) if 'advantages' in data.files else None
     def __len__(self): return len(self.obs)
-    def __getitem__(self, idx): return {'obs': self.obs[idx], 'action': self.actions[idx], 'reward': self.rewards[idx], 'kick_mask': self.kick_mask[idx]}
\ No newline at end of file
+    def __getitem__(self, idx):
+        item = {'obs': self.obs[idx], 'action': self.actions[idx], 'reward': self.rewards[idx], 'kick_mask': self.kick_mask[idx]}
+        if self.returns is not None: item['return'], item['advantage'] = self.returns[idx], self.advantages[idx]
+        return item
+
+class ShardedSoccerDataset(Dataset):
+    # Shards .npy sin comprimir (los que genera prepare_dataset.py) abiertos con mmap:
+    # nada se copia a RAM por adelantado y los workers del DataLoader comparten la
+    # page cache del sistema en lugar de tener cada uno su copia.
+    def __init__(self, shard_dir, arrays=("obs", "actions", "rewards")):
+        self.shard_dir = shard_dir
+        self.shards = self._find_shards(shard_dir)
+        # Retornos n-step y ventajas (prepare_dataset), como en SoccerDataset: solo si todos
+        # los shards los traen (los generados antes no)
+        self.has_returns = bool(self.shards) and all(
+            os.path.exists(os.path.join(s, f"{a}.npy")) for s in self.shards for a in ("returns", "advantages"))
+        self.arrays = tuple(arrays) + (("returns", "advantages") if self.has_returns else ())
+        lengths = [len(np.load(os.path.join(s, "obs.npy"), mmap_mode="r")) for s in self.shards]
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._maps = None
+
+    @staticmethod
+    def _find_shards(shard_dir):
+        manifest = os.path.join(shard_dir, "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                entries = json.load(f)
+            names = sorted({e["shard"] for e in entries.values() if e["rows"]})
+        else:
+            names = sorted(n for n in os.listdir(shard_dir) if os.path.exists(os.path.join(shard_dir, n, "obs.npy")))
+        return [os.path.join(shard_dir, n) for n in names]
+
+    def _open(self):
+        # Perezoso: cada proceso (incluidos los workers) mapea los ficheros al primer acceso
+        self._maps = [{a: np.load(os.path.join(s, f"{a}.npy"), mmap_mode="r") for a in self.arrays}
+                      for s in self.shards]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_maps"] = None
+        return state
+
+    def locate(self, idx):
+        shard = int(np.searchsorted(self.offsets, idx, side="right")) - 1
+        return shard, idx - int(self.offsets[shard])
+
+    def shard_ranges(self):
+        return [(int(a), int(b)) for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def __len__(self): return int(self.offsets[-1])
+
+    def __getitem__(self, idx):
+        if self._maps is None: self._open()
+        if idx < 0: idx += len(self)
+        shard, local = self.locate(idx)
+        m = self._maps[shard]
+        action = torch.from_numpy(np.array(m["actions"][local], dtype=np.float32))
+        item = {'obs': torch.from_numpy(np.array(m["obs"][local], dtype=np.float32)), 'action': action,
+                'reward': torch.tensor(float(m["rewards"][local])),
+                'kick_mask': (action[2:3] > 0).float()}
+        if self.has_returns:
+            item['return'] = torch.tensor(float(m["returns"][local]))
+            item['advantage'] = torch.tensor(float(m["advantages"][local]))
+        return item
+
+
+class ShardShuffleSampler(Sampler):
+    # Barajado en dos niveles: orden de shards aleatorio y permutación dentro de cada
+    # shard. Cada época recorre todos los índices una vez manteniendo la localidad de
+    # acceso al mmap (no salta entre ficheros en cada muestra).
+    def __init__(self, dataset, seed=0):
+        self.ranges = dataset.shard_ranges()
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch): self.epoch = epoch
+
+    def __len__(self): return sum(b - a for a, b in self.ranges)
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        for s in rng.permutation(len(self.ranges)):
+            a, b = self.ranges[s]
+            yield from (a + rng.permutation(b - a)).tolist()
+
+
+# Objetivos del Actor ya normalizados: dash/100, turn/180, kick_pow/100, kick_ang/180 y
+# la máscara de chut, en una sola matriz float32 (N, 5) por bloque
+TARGET_SCALE = np.array([100.0, 180.0, 100.0, 180.0], dtype=np.float32)
+TARGETS = "targets.npy"
+
+def prepare_targets(actions):
+    actions = np.asarray(actions, dtype=np.float32)
+    out = np.empty((len(actions), 5), dtype=np.float32)
+    out[:, :4] = actions / TARGET_SCALE
+    out[:, 4] = actions[:, 2] > 0
+    return out
+
+
+class PreparedData(Dataset):
+    # Para el bucle de entrenamiento por lotes: cada bloque (un shard con mmap o el .npz
+    # entero en RAM) tiene obs float32 y targets.npy preprocesados una vez. Los índices
+    # son lotes (bloque, filas) que da BlockBatchSampler; cada __getitem__ devuelve un lote
+    # entero ya en tensores, así que el DataLoader va con batch_size=None.
+    def __init__(self, dataset_path):
+        self.path = dataset_path
+        if os.path.isdir(dataset_path):
+            self.shards = ShardedSoccerDataset._find_shards(dataset_path)
+            for shard in self.shards:
+                self._prepare_shard(shard)
+            self.lengths = [len(np.load(os.path.join(s, "obs.npy"), mmap_mode="r")) for s in self.shards]
+            self._blocks = None
+        else:
+            data = np.load(dataset_path)
+            self.shards = None
+            self._blocks = [(np.ascontiguousarray(data["obs"], dtype=np.float32), prepare_targets(data["actions"]))]
+            self.lengths = [len(self._blocks[0][0])]
+        self.obs_size = int(self.block(0)[0].shape[1]) if sum(self.lengths) else 0
+
+    @staticmethod
+    def _prepare_shard(shard):
+        # targets.npy se rehace si falta o si actions.npy es más nuevo
+        actions, targets = os.path.join(shard, "actions.npy"), os.path.join(shard, TARGETS)
+        if os.path.exists(targets) and os.path.getmtime(targets) >= os.path.getmtime(actions):
+            return
+        tmp = targets + ".tmp.npy"
+        np.save(tmp, prepare_targets(np.load(actions, mmap_mode="r")))
+        os.replace(tmp, targets)
+
+    def block(self, k):
+        if self._blocks is None:
+            # Perezoso: cada proceso (workers, procesos del barrido) mapea los ficheros al usarlos
+            self._blocks = [(np.load(os.path.join(s, "obs.npy"), mmap_mode="r"),
+                             np.load(os.path.join(s, TARGETS), mmap_mode="r")) for s in self.shards]
+        return self._blocks[k]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.shards is not None:
+            state["_blocks"] = None
+        return state
+
+    def __len__(self): return sum(self.lengths)
+
+    def __getitem__(self, item):
+        k, rows = item
+        obs, targets = self.block(k)
+        return torch.from_numpy(np.asarray(obs[rows], dtype=np.float32)), torch.from_numpy(np.asarray(targets[rows]))
+
+
+class BlockBatchSampler(Sampler):
+    # Lotes de batch_size filas de un mismo bloque: bloques en orden aleatorio y filas
+    # barajadas dentro de cada uno (como ShardShuffleSampler), ordenadas dentro del lote
+    # para leer el mmap hacia delante. rows: opcional, filas usables de cada bloque (p.ej.
+    # la parte de entrenamiento o la de validación).
+    def __init__(self, data, batch_size, seed=0, rows=None):
+        self.rows = rows if rows is not None else [None] * len(data.lengths)
+        self.lengths = [n if r is None else len(r) for n, r in zip(data.lengths, self.rows)]
+        self.batch_size = batch_size
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch): self.epoch = epoch
+
+    def __len__(self): return sum(-(-n // self.batch_size) for n in self.lengths)
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+        for k in rng.permutation(len(self.lengths)):
+            perm = rng.permutation(self.lengths[k])
+            if self.rows[k] is not None:
+                perm = self.rows[k][perm]
+            for i in range(0, len(perm), self.batch_size):
+                yield int(k), np.sort(perm[i:i + self.batch_size])
+
+
+def split_rows(data, val_fraction, seed=0):
+    # Reparto fijo entrenamiento / validación dentro de cada bloque
+    rng = np.random.default_rng(seed)
+    train, val = [], []
+    for n in data.lengths:
+        is_val = rng.random(n) < val_fraction
+        train.append(np.flatnonzero(~is_val))
+        val.append(np.flatnonzero(is_val))
+    return train, val
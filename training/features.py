@@ -1,31 +1,119 @@
+from array import array
+
 import numpy as np
 
+OBS_SIZE = 49
+MAX_TEAMMATES, MAX_OPPONENTS = 10, 11
+# Máximo de jugadores que guarda cada tabla del WorldModel (agent.state.MAX_PLAYERS)
+MAX_PLAYERS = 22
+
+# Columnas: balón (dist, dir), stamina, portería l y r (dist, dir), compañeros y rivales
+# (dist, dir) por distancia. Lo que no se ve vale (-1, 0).
+BALL, STAMINA, GOALS, MATES = 0, 2, 3, 7
+OPPS = MATES + 2 * MAX_TEAMMATES
+GOAL_COL = {"l": GOALS, "r": GOALS + 2}
+EMPTY_ROW = [-1.0, 0.0, 0.0] + [-1.0, 0.0] * (2 + MAX_TEAMMATES + MAX_OPPONENTS)
+_EMPTY_ROW = memoryview(array("f", EMPTY_ROW))
+# Divisores por columna (float64, como el cálculo escalar, para dar los mismos float32)
+SCALE = np.array([60.0, 180.0, 8000.0] + [120.0, 180.0] * 2 + [60.0, 180.0] * (MAX_TEAMMATES + MAX_OPPONENTS))
+
+
+def _by_dist(p):
+    return p.get("dist", 0.0)
+
+
 class FeatureExtractor:
     def __init__(self):
-        self.obs_size = 49 
-
-    def get_observation(self, world_model):
-        obs = []
-        if world_model.ball:
-            obs.extend([min(world_model.ball["dist"] / 60.0, 1.0), world_model.ball["dir"] / 180.0])
-        else: 
-            obs.extend([-1.0, 0.0])
-
-        obs.append(getattr(world_model, "stamina", 8000) / 8000.0)
-        
-        goals_data = {g["side"]: g for g in world_model.goals}
-        for side in ['l', 'r']:
-            g = goals_data.get(side)
-            obs.extend([g["dist"] / 120.0, g["dir"] / 180.0] if g else [-1.0, 0.0])
-
-        teammates = sorted(world_model.players_teammates, key=lambda x: x["dist"])
-        for i in range(10):
-            p = teammates[i] if i < len(teammates) else None
-            obs.extend([p["dist"] / 60.0, p["dir"] / 180.0] if p else [-1.0, 0.0])
-
-        opponents = sorted(world_model.players_opponents, key=lambda x: x["dist"])
-        for i in range(11):
-            p = opponents[i] if i < len(opponents) else None
-            obs.extend([p["dist"] / 60.0, p["dir"] / 180.0] if p else [-1.0, 0.0])
-
-        return np.array(obs, dtype=np.float32)
\ No newline at end of file
+        self.obs_size = OBS_SIZE
+
+    def get_observation(self, world_model, out=None):
+        # out: buffer float32 contiguo de OBS_SIZE del llamador (p.ej. una fila de un lote),
+        # se escribe en sitio y se devuelve; sin out se crea uno nuevo en cada llamada
+        if out is None:
+            out = np.empty(OBS_SIZE, dtype=np.float32)
+        row = memoryview(out)
+        row[:] = _EMPTY_ROW
+        ball = world_model.ball
+        if ball:
+            row[0] = min(ball["dist"] / 60.0, 1.0)
+            row[1] = ball["dir"] / 180.0
+        row[2] = getattr(world_model, "stamina", 8000) / 8000.0
+        for g in world_model.goals:
+            col = GOAL_COL.get(g["side"])
+            if col is not None:
+                row[col] = g["dist"] / 120.0
+                row[col + 1] = g["dir"] / 180.0
+        # Los jugadores del WorldModel ya vienen ordenados por distancia
+        for players, col, cap in ((world_model.players_teammates, MATES, MAX_TEAMMATES),
+                                  (world_model.players_opponents, OPPS, MAX_OPPONENTS)):
+            for col, p in zip(range(col, col + 2 * cap, 2), players):
+                row[col] = p["dist"] / 60.0
+                row[col + 1] = p["dir"] / 180.0
+        return out
+
+    # --- por lotes: valores en bruto (NaN = no visto) y una sola normalización numpy ---
+
+    @staticmethod
+    def _fill_raw(raw, ball, stamina, goals, mates, opps):
+        # raw: memoryview float64 de una fila del lote, ya a NaN
+        if ball:
+            raw[0], raw[1] = ball["dist"], ball["dir"]
+        raw[2] = stamina
+        for g in goals:
+            col = GOAL_COL.get(g["side"])
+            if col is not None:
+                raw[col], raw[col + 1] = g["dist"], g["dir"]
+        for players, col, cap in ((mates, MATES, MAX_TEAMMATES), (opps, OPPS, MAX_OPPONENTS)):
+            for col, p in zip(range(col, col + 2 * cap, 2), players):
+                raw[col], raw[col + 1] = p["dist"], p["dir"]
+
+    @staticmethod
+    def normalize(raw, out=None):
+        # raw (N, OBS_SIZE) en unidades del servidor, NaN donde no se vio el objeto
+        if out is None:
+            out = np.empty(raw.shape, dtype=np.float32)
+        scaled = raw / SCALE
+        np.minimum(scaled[:, BALL], 1.0, out=scaled[:, BALL])
+        for cols, fill in ((scaled[:, 0:1], -1.0), (scaled[:, 1:2], 0.0),
+                           (scaled[:, GOALS::2], -1.0), (scaled[:, GOALS + 1::2], 0.0)):
+            cols[np.isnan(cols)] = fill
+        out[:] = scaled
+        return out
+
+    def get_observations(self, world_models, out=None):
+        # Lote de WorldModel (p.ej. todos los jugadores de un proceso) -> (N, OBS_SIZE);
+        # cada fila se escribe en sitio en out, sin pasar por arrays intermedios
+        if out is None:
+            out = np.empty((len(world_models), OBS_SIZE), dtype=np.float32)
+        for i, wm in enumerate(world_models):
+            self.get_observation(wm, out[i])
+        return out
+
+    def from_entries(self, entries, out=None):
+        # Entradas de log (GameLogger / iter_log_entries) -> (obs (N, OBS_SIZE), ok (N,) bool).
+        # Las filas que no se pueden leer (campos ausentes o mal formados) quedan con ok=False.
+        raw = np.full((len(entries), OBS_SIZE), np.nan)
+        ok = np.zeros(len(entries), dtype=bool)
+        for i, data in enumerate(entries):
+            try:
+                # Como el setter del WorldModel: como mucho MAX_PLAYERS y ordenados por distancia
+                mates = sorted((data.get("teammates") or [])[:MAX_PLAYERS], key=_by_dist)
+                opps = sorted((data.get("opponents") or [])[:MAX_PLAYERS], key=_by_dist)
+                self._fill_raw(memoryview(raw[i]), data.get("ball"), data.get("stamina"), data.get("goals", []),
+                               [{"dist": 0.0, "dir": 0.0, **p} for p in mates],
+                               [{"dist": 0.0, "dir": 0.0, **p} for p in opps])
+                ok[i] = True
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+        return self.normalize(raw, out), ok
+
+    def from_records(self, records, out=None):
+        # Registros de un log binario (agent.logger.RECORD_DTYPE), todo en numpy: ya traen
+        # NaN en lo no visto y los jugadores ordenados por distancia
+        raw = np.empty((len(records), OBS_SIZE))
+        raw[:, 0:2] = records["ball"]
+        raw[:, STAMINA] = records["stamina"]
+        raw[:, GOALS:MATES] = records["goals"].reshape(len(records), 4)
+        raw[:, MATES:OPPS] = records["teammates"][:, :MAX_TEAMMATES].reshape(len(records), -1)
+        raw[:, OPPS:] = records["opponents"][:, :MAX_OPPONENTS].reshape(len(records), -1)
+        return self.normalize(raw, out)
@@ -4,17 +4,17 @@ import torch.nn.functional as F
 
 class Actor(nn.Module):
     # CORRECCIÓN: Default obs_size = 49
-    def __init__(self, obs_size=49):
+    def __init__(self, obs_size=49, hidden=128):
         super().__init__()
-        self.fc1 = nn.Linear(obs_size, 128)
-        self.fc2 = nn.Linear(128, 128)
+        self.fc1 = nn.Linear(obs_size, hidden)
+        self.fc2 = nn.Linear(hidden, hidden)
         
-        self.head_dash = nn.Linear(128, 1)
-        self.head_turn = nn.Linear(128, 1)
+        self.head_dash = nn.Linear(hidden, 1)
+        self.head_turn = nn.Linear(hidden, 1)
         
-        self.head_kick_prob = nn.Linear(128, 1)
-        self.head_kick_pow = nn.Linear(128, 1)
-        self.head_kick_ang = nn.Linear(128, 1)
+        self.head_kick_prob = nn.Linear(hidden, 1)
+        self.head_kick_pow = nn.Linear(hidden, 1)
+        self.head_kick_ang = nn.Linear(hidden, 1)
 
     def forward(self, x):
         x = F.relu(self.fc1(x))
@@ -34,4 +34,27 @@ class Critic(nn.Module):
         self.value_head = nn.Linear(128, 1)
 
     def forward(self, x):
-        return self.value_head(F.relu(self.fc2(F.relu(self.fc1(x)))))
\ No newline at end of file
+        return self.value_head(F.relu(self.fc2(F.relu(self.fc1(x)))))
+
+def export_actor_numpy(actor, path):
+    # Vector plano float32 para training.numpy_actor.NumpyActor: W1, b1, W2, b2 y las
+    # 5 cabezas fusionadas (dash, turn, kick_prob, kick_pow, kick_ang) en WH, bH.
+    import numpy as np
+    heads = [actor.head_dash, actor.head_turn, actor.head_kick_prob, actor.head_kick_pow, actor.head_kick_ang]
+    with torch.no_grad():
+        parts = [actor.fc1.weight.t(), actor.fc1.bias, actor.fc2.weight.t(), actor.fc2.bias,
+                 torch.cat([h.weight for h in heads], dim=0).t(), torch.cat([h.bias for h in heads])]
+        flat = np.concatenate([p.detach().cpu().numpy().astype(np.float32).ravel() for p in parts])
+    np.save(path, flat)
+    return flat
+
+
+def load_actor(path):
+    # obs_size y hidden salen de la forma de fc1 (hidden, obs_size): sirve para los .pth
+    # del sweep (hidden 64/128/256) sin tener que saber con qué configuración se entrenaron
+    state = torch.load(path, map_location="cpu")
+    hidden, obs_size = state["fc1.weight"].shape
+    actor = Actor(obs_size=obs_size, hidden=hidden)
+    actor.load_state_dict(state)
+    actor.eval()
+    return actor
@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+
+HIDDEN = 128
+HEADS = 5  # dash, turn, kick_prob, kick_pow, kick_ang
+# Cabezas con tanh (turn, kick_ang); el resto con sigmoide
+TANH_HEADS = np.array([False, True, False, False, True])
+
+
+def flat_size(obs_size, hidden=HIDDEN):
+    return obs_size * hidden + hidden + hidden * hidden + hidden + hidden * HEADS + HEADS
+
+
+def hidden_of(n_params, obs_size=49):
+    # El vector plano no guarda las formas: con obs_size conocido, n = h*(obs+h+7) + 5
+    # tiene una única solución entera h > 0
+    b = obs_size + 2 + HEADS
+    hidden = int(round((math.sqrt(b * b + 4 * (n_params - HEADS)) - b) / 2)) if n_params > HEADS else 0
+    if hidden <= 0 or flat_size(obs_size, hidden) != n_params:
+        raise ValueError(f"Tamaño de pesos inesperado para obs_size {obs_size}: {n_params}")
+    return hidden
+
+
+class NumpyActor:
+    # Forward del Actor (obs -> hidden -> hidden -> 5) con numpy puro. Los pesos vienen de
+    # un vector plano float32 (ver training.models.export_actor_numpy) en el orden
+    # W1, b1, W2, b2, WH, bH, con las 5 cabezas fusionadas en una sola matriz WH.
+    # hidden se deduce del tamaño del vector y obs_size (el de las features, 49).
+
+    def __init__(self, flat, obs_size=49):
+        flat = np.asarray(flat, dtype=np.float32)
+        self.hidden = hidden = hidden_of(flat.size, obs_size)
+        self.obs_size = obs_size
+        self.flat = flat
+        shapes = [(self.obs_size, hidden), (hidden,), (hidden, hidden), (hidden,), (hidden, HEADS), (HEADS,)]
+        views, pos = [], 0
+        for shape in shapes:
+            n = int(np.prod(shape))
+            views.append(flat[pos:pos + n].reshape(shape))
+            pos += n
+        self.w1, self.b1, self.w2, self.b2, self.wh, self.bh = views
+        # Buffers para el caso de una sola observación (el de cada tick)
+        self._h1 = np.empty(hidden, dtype=np.float32)
+        self._h2 = np.empty(hidden, dtype=np.float32)
+        self._out = np.empty(HEADS, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path, obs_size=49, mmap=True):
+        # Con mmap los procesos de un mismo equipo comparten las páginas del fichero
+        return cls(np.load(path, mmap_mode="r" if mmap else None), obs_size)
+
+    def share_memory(self):
+        return self
+
+    def forward_batch(self, obs):
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_size)
+        h = np.maximum(x @ self.w1 + self.b1, 0.0)
+        h = np.maximum(h @ self.w2 + self.b2, 0.0)
+        out = h @ self.wh + self.bh
+        # sigmoid(x) = (1 + tanh(x/2)) / 2, sin overflow para x muy negativos
+        return np.where(TANH_HEADS, np.tanh(out), 0.5 + 0.5 * np.tanh(0.5 * out))
+
+    def __call__(self, obs):
+        # Una observación: (dash, turn, kick_prob, kick_pow, kick_ang) como floats
+        x = np.asarray(obs, dtype=np.float32)
+        h1, h2, out = self._h1, self._h2, self._out
+        np.dot(x, self.w1, out=h1)
+        h1 += self.b1
+        np.maximum(h1, 0.0, out=h1)
+        np.dot(h1, self.w2, out=h2)
+        h2 += self.b2
+        np.maximum(h2, 0.0, out=h2)
+        np.dot(h2, self.wh, out=out)
+        out += self.bh
+        v = out.tolist()
+        tanh = math.tanh
+        return (0.5 + 0.5 * tanh(0.5 * v[0]), tanh(v[1]), 0.5 + 0.5 * tanh(0.5 * v[2]),
+                0.5 + 0.5 * tanh(0.5 * v[3]), tanh(v[4]))
+
@@ -1,16 +1,97 @@
+import numpy as np
+
+# Descuento y horizonte por defecto de los retornos n-step del dataset
+GAMMA = 0.99
+N_STEP = 10
+KICK_BONUS = 0.2
+DASH_COST = 0.01
+
+
 class RewardCalculator:
     def __init__(self, team_side):
-        self.team_side = team_side 
+        self.team_side = team_side
         self.enemy_goal_side = 'l' if team_side == 'r' else 'r'
     def calculate(self, current_wm, prev_wm, action):
         reward = 0.0
         curr_dist, prev_dist = self._get_goal_dist(current_wm), self._get_goal_dist(prev_wm)
-        if curr_dist and prev_dist: reward += (prev_dist - curr_dist) * 1.0 
-        if action.get("kick"): reward += 0.2 
-        reward -= (abs(action.get("dash", 0.0)) / 100.0) * 0.01
+        if curr_dist and prev_dist: reward += (prev_dist - curr_dist) * 1.0
+        if action.get("kick"): reward += KICK_BONUS
+        reward -= (abs(action.get("dash", 0.0)) / 100.0) * DASH_COST
         return reward
     def _get_goal_dist(self, wm):
         for g in wm.goals:
             if g["side"] == self.enemy_goal_side: return g["dist"]
         mem_goal = wm.last_goal_seen.get(self.enemy_goal_side)
-        return mem_goal["dist"] if mem_goal else None
\ No newline at end of file
+        return mem_goal["dist"] if mem_goal else None
+
+    # --- por lotes: un log entero en arrays numpy ---
+
+    def goal_dist(self, goals):
+        # goals de una entrada de log -> distancia a la portería rival (NaN si no se ve)
+        for g in goals:
+            if g["side"] == self.enemy_goal_side: return g["dist"]
+        return np.nan
+
+    def goal_dists(self, records):
+        # Registros de un log binario (agent.logger.RECORD_DTYPE): columna de la portería rival
+        return records["goals"][:, "lr".index(self.enemy_goal_side), 0].astype(np.float64)
+
+    def progress(self, goal_dist):
+        # Avance hacia la portería rival de cada estado respecto al anterior (0 en el primero
+        # o si falta alguna de las dos distancias; una distancia 0 cuenta como falta, como en calculate)
+        goal_dist = np.asarray(goal_dist, dtype=np.float64)
+        out = np.zeros(len(goal_dist))
+        prev, curr = goal_dist[:-1], goal_dist[1:]
+        seen = (prev == prev) & (prev != 0.0) & (curr == curr) & (curr != 0.0)
+        out[1:] = np.where(seen, prev - curr, 0.0)
+        return out
+
+    def action_terms(self, dash, kick):
+        return np.where(kick, KICK_BONUS, 0.0) - np.abs(dash) / 100.0 * DASH_COST
+
+    def calculate_batch(self, goal_dist, dash, kick):
+        # Lo mismo que calculate(estado, estado anterior, acción) para cada fila de un log,
+        # con la primera a 0: mismas operaciones en float64, mismos resultados
+        reward = self.progress(goal_dist) + np.where(kick, KICK_BONUS, 0.0)
+        reward -= np.abs(dash) / 100.0 * DASH_COST
+        if len(reward):
+            reward[0] = 0.0
+        return reward
+
+    def step_rewards(self, goal_dist, dash, kick, dones):
+        # Recompensa de cada transición (s_t, a_t) -> s_t+1: coste/bonus de la acción de t
+        # más el avance que se ve en t+1. calculate_batch (la columna rewards) junta en la
+        # fila t el avance que llega a t con la acción de t; para retornos hay que alinearlo.
+        reward = self.action_terms(dash, kick)
+        reward[:-1] += np.where(dones[:-1], 0.0, self.progress(goal_dist)[1:])
+        return reward
+
+
+def episode_ends(play_modes):
+    # dones[t]: t es el último estado de su tramo (cambio de modo de juego o fin del log)
+    modes = np.asarray(play_modes)
+    dones = np.ones(len(modes), dtype=bool)
+    dones[:-1] = modes[1:] != modes[:-1]
+    return dones
+
+
+def nstep_returns(rewards, dones, gamma=GAMMA, n=N_STEP, values=None):
+    # G_t = sum_{k<n} gamma^k r_t+k, sin cruzar el final del tramo; con values (p.ej. del
+    # Critic) se añade gamma^n V(s_t+n) si s_t+n sigue en el mismo tramo
+    rewards = np.asarray(rewards, dtype=np.float64)
+    size = len(rewards)
+    segment = np.zeros(size, dtype=np.int64)
+    segment[1:] = np.cumsum(dones[:-1])
+    returns = rewards.copy()
+    for k in range(1, min(n, size)):
+        returns[:-k] += gamma ** k * np.where(segment[k:] == segment[:-k], rewards[k:], 0.0)
+    if values is not None and n < size:
+        returns[:-n] += gamma ** n * np.where(segment[n:] == segment[:-n], values[n:], 0.0)
+    return returns
+
+
+def advantages(returns, values=None):
+    # A_t = G_t - V(s_t); sin Critic, la media de los retornos como línea base
+    if values is None:
+        return returns - (returns.mean() if len(returns) else 0.0)
+    return returns - values
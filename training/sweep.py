@@ -0,0 +1,188 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Barrido de hiperparámetros del Actor: cada configuración se entrena en un proceso del
+# pool sobre el mismo dataset mapeado en memoria (PreparedData sobre shards .npy: todos
+# los procesos leen las mismas páginas de la page cache). Successive halving: todas las
+# configuraciones empiezan con min_epochs, y en cada ronda sigue solo la mejor 1/eta
+# (por pérdida de validación) con eta veces más épocas, hasta max_epochs. Dentro de cada
+# tramo hay early stopping por paciencia.
+
+
+def make_grid(lrs, hiddens, move_weights, kick_weights):
+    configs = []
+    for lr, hidden, mw, kw in itertools.product(lrs, hiddens, move_weights, kick_weights):
+        name = f"lr{lr:g}_h{hidden}_mw{mw:g}_kw{kw:g}"
+        configs.append({"name": name, "lr": lr, "hidden": hidden, "move_weight": mw, "kick_weight": kw})
+    return configs
+
+
+def shared_dataset(dataset_path, cache_dir):
+    # Un directorio de shards se usa tal cual; un .npz se vuelca una vez a .npy sin
+    # comprimir en cache_dir para poder mapearlo desde todos los procesos
+    if os.path.isdir(dataset_path):
+        return dataset_path
+    shard = os.path.join(cache_dir, "npz")
+    stamp = os.path.join(shard, "source.json")
+    src = {"path": os.path.abspath(dataset_path), "mtime": os.path.getmtime(dataset_path)}
+    if os.path.exists(stamp):
+        with open(stamp) as f:
+            if json.load(f) == src:
+                return cache_dir
+    shutil.rmtree(shard, ignore_errors=True)
+    os.makedirs(shard)
+    with np.load(dataset_path) as data:
+        for name in ("obs", "actions"):
+            np.save(os.path.join(shard, f"{name}.npy"), np.asarray(data[name], dtype=np.float32))
+    with open(stamp, "w") as f:
+        json.dump(src, f)
+    return cache_dir
+
+
+def run_trial(task):
+    # Proceso del pool: entrena una configuración hasta task["epochs"] (continuando su
+    # checkpoint si lo hay) con early stopping; devuelve el resumen del tramo
+    import torch
+    import torch.optim as optim
+    from training.dataset import PreparedData, split_rows
+    from training.models import Actor
+    from training.train import evaluate, make_loader, save_checkpoint, train_epoch
+
+    cfg = task["config"]
+    torch.set_num_threads(task["threads"])
+    torch.manual_seed(task["seed"])
+    data = PreparedData(task["data"])
+    train_rows, val_rows = split_rows(data, task["val_fraction"], task["seed"])
+    loader, sampler = make_loader(data, task["batch_size"], seed=task["seed"], rows=train_rows)
+    val_loader, _ = make_loader(data, task["batch_size"], seed=task["seed"], rows=val_rows)
+
+    model = Actor(obs_size=data.obs_size, hidden=cfg["hidden"])
+    optimizer = optim.Adam(model.parameters(), lr=cfg["lr"])
+    ckpt_path = os.path.join(task["out_dir"], f"{cfg['name']}.pt")
+    state = {"epoch": -1, "step": 0, "best": math.inf, "best_epoch": -1, "bad": 0,
+             "time_s": 0.0, "train_s": 0.0, "samples": 0}
+    if os.path.exists(ckpt_path):
+        ckpt = torch.load(ckpt_path, map_location="cpu")
+        model.load_state_dict(ckpt["model"])
+        optimizer.load_state_dict(ckpt["optimizer"])
+        state.update(ckpt["config"]["state"])
+    sampler.set_epoch(state["epoch"] + 1)
+
+    stopped = False
+    for epoch in range(state["epoch"] + 1, task["epochs"]):
+        t0 = time.perf_counter()
+        _, samples = train_epoch(model, optimizer, loader, task["accum"], cfg["move_weight"], cfg["kick_weight"])
+        t1 = time.perf_counter()
+        val = evaluate(model, val_loader)
+        state["train_s"] += t1 - t0
+        state["time_s"] += time.perf_counter() - t0
+        state["samples"] += samples
+        state["step"] += -(-len(sampler) // task["accum"])
+        state["epoch"] = epoch
+        if val < state["best"] - task["min_delta"]:
+            state.update(best=val, best_epoch=epoch, bad=0)
+            torch.save(model.state_dict(), os.path.join(task["out_dir"], f"{cfg['name']}.pth"))
+        else:
+            state["bad"] += 1
+        if state["bad"] >= task["patience"]:
+            stopped = True
+            break
+    save_checkpoint(ckpt_path, model, optimizer, state["epoch"], state["step"], {**cfg, "state": state})
+    return {**cfg, "val_loss": state["best"], "best_epoch": state["best_epoch"] + 1, "epochs": state["epoch"] + 1,
+            "time_s": state["time_s"], "samples_per_s": state["samples"] / state["train_s"] if state["train_s"] else 0.0,
+            "stopped": stopped or state["bad"] >= task["patience"]}
+
+
+def successive_halving(configs, base_task, parallel, min_epochs, max_epochs, eta=3):
+    results = {}
+    alive = list(configs)
+    budget = min_epochs
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=parallel, mp_context=ctx) as pool:
+        while alive:
+            t0 = time.perf_counter()
+            tasks = [{**base_task, "config": c, "epochs": budget} for c in alive]
+            for res in pool.map(run_trial, tasks):
+                res["rung_epochs"] = budget
+                results[res["name"]] = res
+            ranked = sorted(alive, key=lambda c: results[c["name"]]["val_loss"])
+            print(f"Ronda de {budget} épocas: {len(alive)} configuraciones en {time.perf_counter() - t0:.1f} s, "
+                  f"mejor {ranked[0]['name']} ({results[ranked[0]['name']]['val_loss']:.4f})")
+            if budget >= max_epochs:
+                break
+            # Pasan las mejores 1/eta que no se hayan parado solas por early stopping
+            keep = max(1, len(alive) // eta)
+            alive = [c for c in ranked[:keep] if not results[c["name"]]["stopped"]]
+            budget = min(budget * eta, max_epochs)
+    return sorted(results.values(), key=lambda r: r["val_loss"])
+
+
+def print_table(results):
+    print(f"{'#':>3} {'configuración':<36} {'val_loss':>9} {'épocas':>6} {'mejor':>5} {'tiempo_s':>9} {'muestras/s':>11}")
+    for i, r in enumerate(results, 1):
+        print(f"{i:>3} {r['name']:<36} {r['val_loss']:>9.4f} {r['epochs']:>6} {r['best_epoch']:>5} "
+              f"{r['time_s']:>9.1f} {r['samples_per_s']:>11.0f}{'  (parada)' if r['stopped'] else ''}")
+
+
+def floats(text): return [float(v) for v in text.split(",")]
+def ints(text): return [int(v) for v in text.split(",")]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Barrido de hiperparámetros del Actor en paralelo (successive halving)")
+    p.add_argument("--data", default="training_data.npz", help=".npz o directorio de shards")
+    p.add_argument("--out-dir", default="models/sweep", help="Checkpoints, pesos y resultados de cada configuración")
+    p.add_argument("--lr", type=floats, default=[3e-4, 1e-3, 3e-3])
+    p.add_argument("--hidden", type=ints, default=[64, 128, 256])
+    p.add_argument("--move-weight", type=floats, default=[1.0])
+    p.add_argument("--kick-weight", type=floats, default=[0.5, 1.0, 2.0])
+    p.add_argument("--parallel", type=int, default=None, help="Procesos del pool (por defecto, núcleos / threads)")
+    p.add_argument("--threads", type=int, default=1, help="Threads de torch por proceso")
+    p.add_argument("--batch-size", type=int, default=4096)
+    p.add_argument("--accum", type=int, default=1)
+    p.add_argument("--min-epochs", type=int, default=1, help="Épocas de la primera ronda")
+    p.add_argument("--max-epochs", type=int, default=27)
+    p.add_argument("--eta", type=int, default=3, help="En cada ronda sigue 1/eta con eta veces más épocas")
+    p.add_argument("--patience", type=int, default=3, help="Épocas sin mejorar antes de parar")
+    p.add_argument("--min-delta", type=float, default=1e-4)
+    p.add_argument("--val-fraction", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--resume", action="store_true", help="Continuar los checkpoints de un barrido anterior en --out-dir")
+    args = p.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    if not args.resume:
+        for name in os.listdir(args.out_dir):
+            if name.endswith(".pt"):
+                os.remove(os.path.join(args.out_dir, name))
+    data = shared_dataset(args.data, os.path.join(args.out_dir, "data"))
+    # PreparedData escribe targets.npy de cada shard aquí, una vez, antes de lanzar el pool
+    from training.dataset import PreparedData
+    prepared = PreparedData(data)
+    configs = make_grid(args.lr, args.hidden, args.move_weight, args.kick_weight)
+    parallel = args.parallel or max(1, (os.cpu_count() or 1) // args.threads)
+    print(f"{len(configs)} configuraciones, {len(prepared)} muestras, {parallel} procesos x {args.threads} threads")
+
+    base_task = {"data": data, "out_dir": args.out_dir, "threads": args.threads, "batch_size": args.batch_size,
+                 "accum": max(1, args.accum), "val_fraction": args.val_fraction, "patience": args.patience,
+                 "min_delta": args.min_delta, "seed": args.seed}
+    t0 = time.perf_counter()
+    results = successive_halving(configs, base_task, parallel, args.min_epochs, args.max_epochs, args.eta)
+    print(f"Barrido terminado en {time.perf_counter() - t0:.1f} s")
+    print_table(results)
+    with open(os.path.join(args.out_dir, "results.json"), "w") as f:
+        json.dump(results, f, indent=1)
+
+if __name__ == "__main__": main()
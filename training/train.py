@@ -1,25 +1,35 @@
 import torch
+import torch.nn.functional as F
 import torch.optim as optim
 from torch.utils.data import DataLoader
 import argparse
 import os
 import sys
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from training.models import Actor
-from training.dataset import SoccerDataset
+from training.dataset import SoccerDataset, ShardedSoccerDataset, ShardShuffleSampler, PreparedData, BlockBatchSampler
 
-def train(dataset_path, epochs=10, batch_size=64, lr=1e-3):
+def load_dataset(dataset_path):
+    # Un directorio de shards se abre con mmap; un .npz se carga entero como antes
+    if os.path.isdir(dataset_path):
+        dataset = ShardedSoccerDataset(dataset_path)
+        return dataset, ShardShuffleSampler(dataset)
+    return SoccerDataset(dataset_path), None
+
+def train(dataset_path, epochs=10, batch_size=64, lr=1e-3, workers=0):
     print(f"Cargando dataset desde {dataset_path}...")
-    dataset = SoccerDataset(dataset_path)
+    dataset, sampler = load_dataset(dataset_path)
     
     # Detectar tamaño de entrada automáticamente
     sample_obs = dataset[0]['obs']
     real_obs_size = sample_obs.shape[0]
     print(f"Detectado obs_size = {real_obs_size}")
 
-    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=sampler is None, sampler=sampler,
+                        num_workers=workers, persistent_workers=workers > 0)
     
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Entrenando en: {device}")
@@ -74,8 +84,120 @@ def train(dataset_path, epochs=10, batch_size=64, lr=1e-3):
     torch.save(model.state_dict(), "models/actor_v1.pth")
     print("Modelo guardado en models/actor_v1.pth")
 
+def actor_loss(outputs, target, move_weight=1.0, kick_weight=1.0):
+    # target: filas de PreparedData (dash, turn, kick_pow, kick_ang ya normalizados y la
+    # máscara de chut). Las cabezas del chut solo cuentan donde hubo chut, con una media
+    # enmascarada en lugar de indexar con la máscara booleana.
+    p_dash, p_turn, p_kick_prob, p_kick_pow, p_kick_ang = outputs
+    kick = target[:, 4:5]
+    loss_move = F.mse_loss(p_dash, target[:, 0:1]) + F.mse_loss(p_turn, target[:, 1:2])
+    loss_kick_dec = F.binary_cross_entropy(p_kick_prob, kick)
+    err = (p_kick_pow - target[:, 2:3]) ** 2 + (p_kick_ang - target[:, 3:4]) ** 2
+    loss_kick_p = (err * kick).sum() / kick.sum().clamp(min=1.0)
+    return move_weight * loss_move + kick_weight * (loss_kick_dec + loss_kick_p)
+
+def make_loader(data, batch_size, workers=0, seed=0, rows=None):
+    sampler = BlockBatchSampler(data, batch_size, seed=seed, rows=rows)
+    extra = {"persistent_workers": True, "prefetch_factor": 4} if workers > 0 else {}
+    return DataLoader(data, batch_size=None, sampler=sampler, num_workers=workers, **extra), sampler
+
+def train_epoch(model, optimizer, loader, accum=1, move_weight=1.0, kick_weight=1.0):
+    # Una época con acumulación de gradiente; devuelve (pérdida media por lote, muestras)
+    total_loss, samples, batches = 0.0, 0, 0
+    optimizer.zero_grad()
+    for i, (obs, target) in enumerate(loader):
+        loss = actor_loss(model(obs), target, move_weight, kick_weight)
+        (loss / accum).backward()
+        if (i + 1) % accum == 0:
+            optimizer.step()
+            optimizer.zero_grad()
+        total_loss += loss.item()
+        samples += len(obs)
+        batches += 1
+    if batches % accum:
+        optimizer.step()
+        optimizer.zero_grad()
+    return total_loss / max(batches, 1), samples
+
+def evaluate(model, loader):
+    # Pérdida media por muestra con los pesos por defecto (comparable entre configuraciones)
+    total, n = 0.0, 0
+    model.eval()
+    with torch.no_grad():
+        for obs, target in loader:
+            total += actor_loss(model(obs), target).item() * len(obs)
+            n += len(obs)
+    model.train()
+    return total / max(n, 1)
+
+def save_checkpoint(path, model, optimizer, epoch, step, config):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    torch.save({"model": model.state_dict(), "optimizer": optimizer.state_dict(),
+                "epoch": epoch, "step": step, "config": config}, tmp)
+    os.replace(tmp, path)
+
+def train_streaming(dataset_path, epochs=10, batch_size=4096, lr=1e-3, workers=2, threads=None, accum=1,
+                    checkpoint="models/checkpoints/actor_last.pt", checkpoint_every=1, resume=False,
+                    output="models/actor_v1.pth", seed=0):
+    # Modo para nodos sin GPU: datos preprocesados (PreparedData), lotes grandes con
+    # acumulación de gradiente (accum lotes por paso del optimizador), threads intra-op
+    # de torch para el forward/backward y workers que preparan los lotes en paralelo.
+    # Guarda un checkpoint cada checkpoint_every épocas; con resume sigue desde él.
+    torch.set_num_threads(threads or os.cpu_count())
+    torch.manual_seed(seed)
+    data = PreparedData(dataset_path)
+    print(f"Dataset {dataset_path}: {len(data)} muestras en {len(data.lengths)} bloques, obs_size = {data.obs_size}")
+    loader, sampler = make_loader(data, batch_size, workers, seed)
+
+    model = Actor(obs_size=data.obs_size)
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    config = {"batch_size": batch_size, "accum": accum, "lr": lr, "seed": seed}
+    start_epoch, step = 0, 0
+    if resume and os.path.exists(checkpoint):
+        ckpt = torch.load(checkpoint, map_location="cpu")
+        model.load_state_dict(ckpt["model"])
+        optimizer.load_state_dict(ckpt["optimizer"])
+        start_epoch, step = ckpt["epoch"] + 1, ckpt["step"]
+        print(f"Reanudando desde {checkpoint} (época {start_epoch + 1}, paso {step})")
+    sampler.set_epoch(start_epoch)
+    print(f"Entrenando en CPU: {torch.get_num_threads()} threads, {workers} workers, "
+          f"lote {batch_size} x {accum} = {batch_size * accum}")
+
+    model.train()
+    steps_per_epoch = -(-len(sampler) // accum)
+    for epoch in range(start_epoch, epochs):
+        t0 = time.perf_counter()
+        loss, samples = train_epoch(model, optimizer, loader, accum)
+        step += steps_per_epoch
+        elapsed = time.perf_counter() - t0
+        print(f"Epoch {epoch+1}/{epochs} - Loss: {loss:.4f} - {samples/elapsed:.0f} muestras/s ({elapsed:.1f} s)")
+        if checkpoint and ((epoch + 1) % checkpoint_every == 0 or epoch + 1 == epochs):
+            save_checkpoint(checkpoint, model, optimizer, epoch, step, config)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    torch.save(model.state_dict(), output)
+    print(f"Modelo guardado en {output}")
+    return model
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data", default="training_data.npz")
+    parser.add_argument("--data", default="training_data.npz", help=".npz o directorio de shards")
+    parser.add_argument("--workers", type=int, default=0, help="Workers del DataLoader")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Bucle para CPU: datos preprocesados, lotes grandes, checkpoints")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=None, help="Por defecto 64 (4096 con --streaming)")
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--threads", type=int, default=None, help="Threads intra-op de torch (por defecto, todos los núcleos)")
+    parser.add_argument("--accum", type=int, default=1, help="Lotes acumulados por paso del optimizador")
+    parser.add_argument("--checkpoint", default="models/checkpoints/actor_last.pt")
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="Épocas entre checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continuar desde --checkpoint si existe")
     args = parser.parse_args()
-    train(args.data)
\ No newline at end of file
+    if args.streaming:
+        train_streaming(args.data, epochs=args.epochs, batch_size=args.batch_size or 4096, lr=args.lr,
+                        workers=args.workers, threads=args.threads, accum=max(1, args.accum),
+                        checkpoint=args.checkpoint, checkpoint_every=max(1, args.checkpoint_every), resume=args.resume)
+    else:
+        train(args.data, epochs=args.epochs, batch_size=args.batch_size or 64, lr=args.lr, workers=args.workers)
\ No newline at end of file